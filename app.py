@@ -1,15 +1,18 @@
 import os
 from flask import Flask, send_from_directory, jsonify
 from flask_cors import CORS
-import feedparser
-import requests
 from datetime import datetime
 
+from src.services.feed_cache import init_feed_cache
+
 app = Flask(__name__)
 
 # Enable CORS for Netlify integration
 CORS(app)
 
+# Flightcast RSS is polled in the background; the podcast routes serve its snapshot
+flightcast_feed = init_feed_cache(app)
+
 @app.route("/")
 def home():
     # Serve your HTML file instead of plain text
@@ -49,28 +52,18 @@ def api_info():
 @app.route('/api/episodes', methods=['GET'])
 def api_episodes():
     """Get latest podcast episodes from RSS feed"""
-    RSS_URL = 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml'
-    
     try:
-        feed = feedparser.parse(RSS_URL)
-        episodes = []
-        
-        for entry in feed.entries[:6]:  # Latest 6 episodes
-            episodes.append({
-                'title': entry.title,
-                'description': entry.summary[:200] + '...' if len(entry.summary) > 200 else entry.summary,
-                'date': entry.published,
-                'duration': getattr(entry, 'itunes_duration', '32:07'),
-                'image': 'https://assets.flightcast.com/static/t8c97hs8oy7a2xnobsfu5p42.jpg',
-                'link': entry.link,
-                'tags': ['AI', 'Startup', 'Business']
-            })
+        snapshot = flightcast_feed.snapshot()
+        if snapshot is None:
+            raise RuntimeError('RSS feed has not been polled yet')
         
         return jsonify({
             'success': True,
-            'episodes': episodes, 
-            'total': len(feed.entries),
-            'message': 'Latest episodes from Greg\'s podcast'
+            'episodes': snapshot['episodes'], 
+            'total': snapshot['total'],
+            'message': 'Latest episodes from Greg\'s podcast',
+            'stale': snapshot['stale'],
+            'fetched_at': snapshot['fetched_at']
         })
         
     except Exception as e:
@@ -89,19 +82,15 @@ def api_episodes():
             'success': False,
             'episodes': fallback_episodes, 
             'total': 100,
-            'message': 'Using fallback episode data'
+            'message': 'Using fallback episode data',
+            'stale': True
         })
 
 @app.route('/api/podcast-stats', methods=['GET'])
 def api_podcast_stats():
     """Get podcast and overall statistics"""
-    RSS_URL = 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml'
-    
-    try:
-        feed = feedparser.parse(RSS_URL)
-        podcast_count = len(feed.entries)
-    except:
-        podcast_count = 100
+    snapshot = flightcast_feed.snapshot()
+    podcast_count = snapshot['total'] if snapshot else 100
     
     return jsonify({
         'success': True,
@@ -114,7 +103,8 @@ def api_podcast_stats():
             'industries_covered': 12
         },
         'message': 'Real-time stats for the Gregverse',
-        'last_updated': datetime.now().isoformat()
+        'last_updated': datetime.now().isoformat(),
+        'stale': snapshot['stale'] if snapshot else True
     })
 
 @app.route('/api/featured-guests', methods=['GET'])
@@ -166,31 +156,24 @@ def api_featured_guests():
 @app.route('/api/rss-health', methods=['GET'])
 def api_rss_health():
     """Check RSS feed health"""
-    RSS_URL = 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml'
-    
-    try:
-        response = requests.get(RSS_URL, timeout=10)
-        rss_status = 'healthy' if response.status_code == 200 else 'error'
-        
-        if rss_status == 'healthy':
-            feed = feedparser.parse(RSS_URL)
-            episode_count = len(feed.entries)
-            latest_episode = feed.entries[0].title if feed.entries else 'Unknown'
-        else:
-            episode_count = 0
-            latest_episode = 'Unable to fetch'
-            
-    except Exception as e:
-        rss_status = 'error'
+    # Reports the background poller; the feed itself is never fetched here
+    snapshot = flightcast_feed.snapshot()
+    if snapshot is None:
+        rss_status = 'error' if flightcast_feed.last_error else 'pending'
         episode_count = 0
-        latest_episode = 'Connection failed'
+        latest_episode = 'Unable to fetch'
+    else:
+        rss_status = 'stale' if snapshot['stale'] else 'healthy'
+        episode_count = snapshot['total']
+        latest_episode = snapshot['latest_episode']
     
     return jsonify({
         'status': 'healthy',
         'rss_feed': {
             'status': rss_status,
             'episode_count': episode_count,
-            'latest_episode': latest_episode
+            'latest_episode': latest_episode,
+            'fetched_at': snapshot['fetched_at'] if snapshot else None
         },
         'timestamp': datetime.now().isoformat()
     })
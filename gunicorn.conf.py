@@ -0,0 +1,22 @@
+"""
+GREGVERSE gunicorn settings
+Loaded automatically by gunicorn from the working directory
+"""
+
+import os
+import shutil
+
+# Metrics from every worker are merged through files in this directory.
+# It has to be set before the workers import prometheus_client.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/gregverse-metrics')
+
+def on_starting(server):
+    """Start every deploy with an empty metrics directory"""
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    """Drop live gauges of workers that went away"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
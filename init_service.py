@@ -44,17 +44,13 @@ def sync_videos():
         # Add the project root to Python path
         sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
         
-        # Import YouTube service
-        from src.services.youtube_service import YouTubeService
+        # Queue the sync in the main app's database and return its job id
+        from main import app as main_app
+        from src.routes.jobs import job_accepted
+        from src.services.jobs import enqueue
         
-        # Sync videos
-        youtube_service = YouTubeService()
-        synced_count = youtube_service.sync_videos_to_database()
-        
-        return jsonify({
-            'success': True,
-            'message': f'Synced {synced_count} videos successfully!'
-        })
+        with main_app.app_context():
+            return job_accepted(enqueue('sync_videos'))
     except Exception as e:
         return jsonify({
             'success': False,
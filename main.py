@@ -1,5 +1,6 @@
 import os
 import sys
+import click
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -15,18 +16,29 @@ from src.models.youtube_stats import YouTubeStats
 from src.routes.search import search_bp
 from src.routes.stats import stats_bp, start_background_stats_updater, init_socketio
 from src.routes.health import health_bp
+from src.routes.metrics import metrics_bp
+from src.routes.debug import debug_bp
+from src.services.health_prober import init_dependency_prober
+from src.services.sql_profiler import init_sql_profiler
+from src.services.metrics import init_metrics, record_emit, websocket_connected, websocket_disconnected
 from src.routes.podcast import podcast_bp
 from src.routes.ai_chat import ai_chat_bp
+from src.routes.jobs import jobs_bp, job_accepted
+from src.services.youtube_quota import init_youtube_quota
+from src.services.http_replay import init_http_replay
+from src.services.jobs import enqueue, init_jobs
 from src.services.youtube_service import YouTubeService
 
 def setup_websocket_events(socketio):
     """Setup WebSocket events"""
     @socketio.on('connect', namespace='/stats')
     def handle_connect():
+        websocket_connected('/stats')
         print("Client connected to stats namespace")
     
     @socketio.on('disconnect', namespace='/stats')
     def handle_disconnect():
+        websocket_disconnected('/stats')
         print("Client disconnected from stats namespace")
     
     @socketio.on('request_stats_update', namespace='/stats')
@@ -34,6 +46,7 @@ def setup_websocket_events(socketio):
         youtube_service = YouTubeService()
         stats = youtube_service.get_channel_stats()
         socketio.emit('stats_update', stats, namespace='/stats')
+        record_emit('stats_update')
 
 def create_app(config_name=None):
     """Application factory pattern for production deployment"""
@@ -52,7 +65,12 @@ def create_app(config_name=None):
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
     
     # Initialize SocketIO with gevent for Railway compatibility
-    socketio = SocketIO(app, cors_allowed_origins=app.config['CORS_ORIGINS'], async_mode='gevent')
+    socketio = SocketIO(
+        app,
+        cors_allowed_origins=app.config['CORS_ORIGINS'],
+        async_mode='gevent',
+        message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    )
     
     # Initialize database
     db.init_app(app)
@@ -61,13 +79,35 @@ def create_app(config_name=None):
     app.register_blueprint(search_bp, url_prefix='/api/search')
     app.register_blueprint(stats_bp, url_prefix='/api/stats')
     app.register_blueprint(health_bp, url_prefix='/health')
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(debug_bp, url_prefix='/debug')
     app.register_blueprint(podcast_bp, url_prefix='/api/podcast')
     app.register_blueprint(ai_chat_bp, url_prefix='/api/chat')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
     
     # Initialize WebSocket events
     setup_websocket_events(socketio)
     init_socketio(socketio)
     
+    # HTTP_REPLAY_MODE records or replays outbound HTTP (see scripts/replay_server.py)
+    init_http_replay(app)
+    
+    # YouTube quota budget and pacing from YOUTUBE_DAILY_QUOTA / YOUTUBE_QUOTA_*
+    init_youtube_quota(app)
+    
+    # Background dependency checks for /health, /health/live and /health/ready
+    init_dependency_prober(app)
+    
+    # Prometheus metrics at /metrics
+    init_metrics(app)
+    
+    # Per-request SQL profiling when SQL_PROFILER_ENABLED is set
+    init_sql_profiler(app)
+    
+    # Syncs run as resumable jobs (in worker.py, or here with JOB_RUN_IN_WEB);
+    # progress is emitted on the /jobs namespace
+    init_jobs(app, socketio)
+    
     # Create database tables
     with app.app_context():
         try:
@@ -88,12 +128,8 @@ def create_app(config_name=None):
 
     @app.route('/sync_videos_simple')
     def sync_videos_simple():
-        youtube_service = YouTubeService()
-        synced_count = youtube_service.sync_videos_to_database()
-        return jsonify({
-            'success': True,
-            'message': f'Synced {synced_count} videos successfully!'
-        })
+        # Queued instead of run inline; poll the status URL or listen for job_progress
+        return job_accepted(enqueue('sync_videos'))
     
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
@@ -166,7 +202,9 @@ def create_app(config_name=None):
                 },
                 'stats': {
                     'youtube': 'GET /api/stats/youtube',
-                    'overview': 'GET /api/stats/overview'
+                    'overview': 'GET /api/stats/overview',
+                    'history': 'GET /api/stats/history?from=&to=&points=',
+                    'forecast': 'GET /api/stats/forecast?milestone='
                 },
                 'podcast': {
                     'episodes': 'GET /api/podcast/episodes',
@@ -195,7 +233,11 @@ def create_app(config_name=None):
                 },
                 'health': {
                     'basic': 'GET /health',
-                    'detailed': 'GET /health/detailed'
+                    'detailed': 'GET /health/detailed',
+                    'live': 'GET /health/live',
+                    'ready': 'GET /health/ready',
+                    'dependencies': 'GET /health/dependencies',
+                    'metrics': 'GET /metrics'
                 },
                 'websocket': {
                     'endpoint': '/socket.io',
@@ -242,13 +284,23 @@ def create_app(config_name=None):
     
     # CLI Commands for data management
     @app.cli.command()
-    def sync_videos():
+    @click.option('--full', is_flag=True, default=None, help='Walk every upload and remove deleted videos')
+    def sync_videos(full):
         """Sync videos from YouTube API"""
         print("🚀 Starting YouTube video sync...")
         youtube_service = YouTubeService()
-        synced_count = youtube_service.sync_videos_to_database()
+        synced_count = youtube_service.sync_videos_to_database(full=full)
         print(f"✅ Synced {synced_count} videos successfully!")
     
+    @app.cli.command()
+    def refresh_views():
+        """Refresh view counts of the videos that are due, within today's budget"""
+        from src.services.view_refresh import ViewRefresher
+        print("👀 Refreshing video view counts...")
+        result = ViewRefresher().run()
+        print(f"✅ Refreshed {result['refreshed_videos']} videos ({result['changed_videos']} changed) "
+              f"for {result['quota_units']} quota units: {result['tiers']}")
+    
     @app.cli.command()
     def update_stats():
         """Update YouTube statistics"""
@@ -258,13 +310,27 @@ def create_app(config_name=None):
         print(f"✅ Updated stats: {stats['subscriber_count']:,} subscribers")
     
     @app.cli.command()
-    def sync_podcasts():
-        """Sync podcast episodes from RSS feed"""
+    def rollup_stats():
+        """Rebuild stats rollups and apply raw sample retention"""
+        from src.models.youtube_stats import YouTubeStatsRollup, StatsTrend
+        print("📈 Rebuilding YouTube stats rollups...")
+        rebuilt = YouTubeStatsRollup.rebuild()
+        pruned = YouTubeStats.prune()
+        replayed = StatsTrend.rebuild()
+        print(f"✅ Folded {rebuilt} samples into rollups, pruned {pruned} expired rows")
+        print(f"✅ Replayed {replayed} buckets into the milestone forecast")
+    
+    @app.cli.command()
+    @click.option('--full', is_flag=True, help='Read the whole feed instead of stopping at known episodes')
+    def sync_podcasts(full):
+        """Sync podcast episodes from every registered RSS feed"""
         from src.services.podcast_service import PodcastService
         print("🎙️ Starting podcast sync...")
         podcast_service = PodcastService()
-        result = podcast_service.sync_episodes()
+        result = podcast_service.sync_episodes(full_resync=full)
         print(f"✅ Synced {result['new_episodes']} new episodes, updated {result['updated_episodes']} episodes")
+        for name, feed in result['feeds'].items():
+            print(f"   {name}: {feed['status']}, {feed['new_episodes']} new in {feed['duration_ms']}ms")
     
     @app.cli.command()
     def index_content():
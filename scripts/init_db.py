@@ -14,9 +14,37 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from src.models.video import db
-from src.models.youtube_stats import YouTubeStats
+from src.models.youtube_stats import YouTubeStats, YouTubeStatsRollup
 from main import app
-from sqlalchemy import text
+from sqlalchemy import inspect, text
+
+def add_missing_columns():
+    """Add model columns that older databases lack (create_all never alters existing tables)"""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            db.session.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            print(f"✅ Added column {table.name}.{column.name}")
+    db.session.commit()
+
+def ensure_unique_index(table, name, column):
+    """Create a unique index, replacing a non-unique one of the same name"""
+    indexes = {index['name']: index for index in inspect(db.engine).get_indexes(table)}
+    if name in indexes and indexes[name]['unique']:
+        return
+    if name in indexes:
+        db.session.execute(text(f'DROP INDEX {name}'))
+    db.session.execute(text(f'CREATE UNIQUE INDEX {name} ON {table} ({column})'))
+    db.session.commit()
+    print(f"✅ Unique index {name} created")
 
 def init_database():
     """Initialize database with tables and indexes"""
@@ -28,6 +56,15 @@ def init_database():
             db.create_all()
             print("✅ Database tables created successfully")
             
+            add_missing_columns()
+            
+            # Podcast sync upserts on the feed GUID
+            try:
+                ensure_unique_index('podcast_episodes', 'ix_podcast_episodes_guid', 'guid')
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠️  Podcast GUID index warning: {e}")
+            
             # Check if we're using PostgreSQL for advanced features
             db_url = os.getenv('DATABASE_URL', '')
             if 'postgresql' in db_url:
@@ -76,6 +113,15 @@ def init_database():
                     print("✅ Published date index created")
                 except Exception as e:
                     print(f"⚠️  Published date index warning: {e}")
+                
+                # Create stats time-series index
+                try:
+                    db.session.execute(text("""
+                        CREATE INDEX IF NOT EXISTS ix_youtube_stats_updated_at ON youtube_stats (updated_at);
+                    """))
+                    print("✅ Stats time-series index created")
+                except Exception as e:
+                    print(f"⚠️  Stats index warning: {e}")
             
             else:
                 print("📝 Using SQLite - basic indexes only")
@@ -87,6 +133,9 @@ def init_database():
                     db.session.execute(text("""
                         CREATE INDEX IF NOT EXISTS videos_category_idx ON videos (category);
                     """))
+                    db.session.execute(text("""
+                        CREATE INDEX IF NOT EXISTS ix_youtube_stats_updated_at ON youtube_stats (updated_at);
+                    """))
                     print("✅ Basic indexes created for SQLite")
                 except Exception as e:
                     print(f"⚠️  Index creation warning: {e}")
@@ -117,6 +166,9 @@ def verify_database():
             stats_count = YouTubeStats.query.count()
             print(f"📊 YouTube stats table: {stats_count} records")
             
+            rollup_count = YouTubeStatsRollup.query.count()
+            print(f"📊 YouTube stats rollups table: {rollup_count} records")
+            
             print("🎉 Database verification completed!")
             
         except Exception as e:
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+GREGVERSE Offline Stub Server
+Stands in for YouTube, RSS feeds, OpenAI and Pinecone so syncs, stats and chat
+can be benchmarked without credentials or network.
+
+Responses recorded with HTTP_REPLAY_MODE=record are served when one matches the
+request; everything else is synthesized from a fixed seed. Point the app at it:
+    
+    YOUTUBE_API_BASE_URL=http://localhost:8089/youtube/v3
+    FLIGHTCAST_RSS_URL=http://localhost:8089/feeds/flightcast.xml
+    OPENAI_API_BASE=http://localhost:8089/v1
+    PINECONE_CONTROLLER_HOST=http://localhost:8089
+    PINECONE_INDEX_HOST=http://localhost:8089
+"""
+
+import os
+import sys
+import json
+import math
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, jsonify, request
+from src.services.http_replay import Recordings, injected_delay, request_signature
+
+EMBEDDING_DIMENSION = 1536
+TOPICS = [
+    'AI agent startup ideas', 'no-code SaaS in a weekend', 'ChatGPT side hustles',
+    'community-led growth', 'SEO for indie hackers', 'buying boring businesses',
+    'interview with a solo founder', 'marketing with short-form video'
+]
+GUESTS = ['Sahil Lavingia', 'Pieter Levels', 'Nathan Barry', 'Alex Hormozi', 'Nico Cerdeira']
+
+app = Flask(__name__)
+settings = argparse.Namespace(
+    latency_ms=0, jitter_ms=0, error_rate=0, videos=300, episodes=150,
+    index_name='gregverse', recordings=None, started_at=datetime.utcnow()
+)
+request_counts = Counter()
+vectors = {}
+vectors_lock = threading.Lock()
+
+def _video_id(index):
+    return f'stub{index:07d}'
+
+def _video_published(index):
+    # Newest first, one upload every 36 hours
+    return settings.started_at - timedelta(hours=36 * index)
+
+def _video_views(index):
+    """Views grow while the server runs, fastest for the newest videos"""
+    hours_live = (datetime.utcnow() - settings.started_at).total_seconds() / 3600
+    base = 5000 + (index * 7919) % 200000
+    return int(base + hours_live * 3000 / (1 + index))
+
+def _unit_vector(seed_text):
+    generator = random.Random(hashlib.sha1(seed_text.encode('utf-8')).hexdigest())
+    values = [generator.gauss(0, 1) for _ in range(EMBEDDING_DIMENSION)]
+    norm = math.sqrt(sum(value * value for value in values))
+    return [value / norm for value in values]
+
+@app.before_request
+def inject_faults():
+    request_counts[request.path.split('/')[1] or 'root'] += 1
+    if request.path.startswith('/__stub'):
+        return None
+    injected_delay(settings.latency_ms, settings.jitter_ms)
+    if settings.error_rate and random.random() < settings.error_rate:
+        request_counts['injected_errors'] += 1
+        return jsonify({'error': {'message': 'Injected failure'}}), 503, {'Retry-After': '0'}
+    
+    if settings.recordings:
+        signature = request_signature(request.method, request.full_path, request.get_data() or None)
+        record = settings.recordings.load(signature)
+        if record:
+            request_counts['recorded'] += 1
+            return Response(Recordings.body_of(record), status=record['status'], headers=record['headers'])
+    return None
+
+@app.route('/__stub/stats')
+def stub_stats():
+    return jsonify({'requests': dict(request_counts), 'vectors': len(vectors)})
+
+# YouTube Data API v3
+
+@app.route('/youtube/v3/channels')
+def youtube_channels():
+    channel_id = request.args.get('id', 'UCstub')
+    return jsonify({'items': [{
+        'id': channel_id,
+        'snippet': {'title': 'Stub Channel'},
+        'statistics': {
+            'subscriberCount': str(500000 + int((datetime.utcnow() - settings.started_at).total_seconds())),
+            'viewCount': str(sum(_video_views(index) for index in range(settings.videos))),
+            'videoCount': str(settings.videos)
+        },
+        'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + channel_id[2:]}}
+    }]})
+
+@app.route('/youtube/v3/playlistItems')
+def youtube_playlist_items():
+    start = int(request.args.get('pageToken') or 0)
+    end = min(start + int(request.args.get('maxResults', 50)), settings.videos)
+    items = []
+    for index in range(start, end):
+        topic = TOPICS[index % len(TOPICS)]
+        items.append({'snippet': {
+            'resourceId': {'kind': 'youtube#video', 'videoId': _video_id(index)},
+            'title': f'{topic.capitalize()} (part {settings.videos - index})',
+            'description': f'Greg breaks down {topic}. Episode {settings.videos - index}.',
+            'publishedAt': _video_published(index).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'thumbnails': {'high': {'url': f'https://i.ytimg.com/vi/{_video_id(index)}/hqdefault.jpg'}}
+        }})
+    page = {'items': items, 'pageInfo': {'totalResults': settings.videos, 'resultsPerPage': len(items)}}
+    if end < settings.videos:
+        page['nextPageToken'] = str(end)
+    return jsonify(page)
+
+@app.route('/youtube/v3/videos')
+def youtube_videos():
+    items = []
+    for video_id in request.args.get('id', '').split(','):
+        if not video_id.startswith('stub'):
+            continue
+        index = int(video_id[4:])
+        if index >= settings.videos:
+            continue
+        items.append({
+            'id': video_id,
+            'statistics': {'viewCount': str(_video_views(index))},
+            'contentDetails': {'duration': f'PT{10 + index % 50}M{index % 60}S'},
+            'snippet': {'tags': TOPICS[index % len(TOPICS)].split()}
+        })
+    return jsonify({'items': items})
+
+# RSS
+
+@app.route('/feeds/<name>.xml')
+def rss_feed(name):
+    items = []
+    for index in range(settings.episodes):
+        number = settings.episodes - index
+        published = settings.started_at - timedelta(days=7 * index)
+        title = f'Episode {number}: {TOPICS[index % len(TOPICS)]} with {GUESTS[index % len(GUESTS)]}'
+        items.append(
+            f'<item><title>{escape(title)}</title><guid>{name}-{number}</guid>'
+            f'<pubDate>{format_datetime(published)}</pubDate>'
+            f'<description>{escape(f"We talk about {TOPICS[index % len(TOPICS)]}, startup growth and AI.")}</description>'
+            f'<enclosure url="https://cdn.example.com/{name}/{number}.mp3" type="audio/mpeg" length="1000"/></item>'
+        )
+    body = (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f'<title>{escape(name)} (stub)</title>' + ''.join(items) + '</channel></rss>'
+    ).encode('utf-8')
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
+    return Response(body, mimetype='application/rss+xml', headers={'ETag': etag})
+
+# OpenAI
+
+@app.route('/v1/embeddings', methods=['POST'])
+def openai_embeddings():
+    payload = request.get_json(force=True)
+    inputs = payload.get('input')
+    if not isinstance(inputs, list) or (inputs and isinstance(inputs[0], int)):
+        inputs = [inputs]
+    data = [
+        {'object': 'embedding', 'index': index, 'embedding': _unit_vector(json.dumps(item))}
+        for index, item in enumerate(inputs)
+    ]
+    return jsonify({'object': 'list', 'data': data, 'model': payload.get('model'),
+                    'usage': {'prompt_tokens': len(inputs), 'total_tokens': len(inputs)}})
+
+@app.route('/v1/completions', methods=['POST'])
+def openai_completions():
+    payload = request.get_json(force=True)
+    prompt = payload.get('prompt')
+    prompts = prompt if isinstance(prompt, list) else [prompt]
+    choices = [
+        {'text': f' Stub answer drawn from {str(text).count("Source")} sources.', 'index': index,
+         'logprobs': None, 'finish_reason': 'stop'}
+        for index, text in enumerate(prompts)
+    ]
+    return jsonify({'id': 'cmpl-stub', 'object': 'text_completion', 'model': payload.get('model'),
+                    'choices': choices, 'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}})
+
+# Pinecone (controller and index share this host)
+
+@app.route('/actions/whoami')
+def pinecone_whoami():
+    return jsonify({'project_name': 'stub', 'user_label': 'stub', 'user_name': 'stub'})
+
+@app.route('/databases', methods=['GET', 'POST'])
+def pinecone_indexes():
+    if request.method == 'POST':
+        return Response('', status=201)
+    return jsonify([settings.index_name])
+
+@app.route('/databases/<name>')
+def pinecone_describe_index(name):
+    return jsonify({
+        'database': {'name': name, 'dimension': EMBEDDING_DIMENSION, 'metric': 'cosine', 'replicas': 1, 'shards': 1, 'pods': 1},
+        'status': {'ready': True, 'state': 'Ready', 'host': request.host, 'port': 443}
+    })
+
+@app.route('/vectors/upsert', methods=['POST'])
+def pinecone_upsert():
+    upserted = request.get_json(force=True).get('vectors', [])
+    with vectors_lock:
+        for vector in upserted:
+            vectors[vector['id']] = (vector['values'], vector.get('metadata') or {})
+    return jsonify({'upsertedCount': len(upserted)})
+
+@app.route('/query', methods=['POST'])
+def pinecone_query():
+    payload = request.get_json(force=True)
+    query = payload.get('vector') or []
+    with vectors_lock:
+        stored = list(vectors.items())
+    scored = sorted(
+        ((sum(a * b for a, b in zip(query, values)), vector_id, metadata) for vector_id, (values, metadata) in stored),
+        reverse=True
+    )[:payload.get('topK', 5)]
+    if not scored:
+        scored = [(0.5, f'stub-{index}', {'text': f'Greg on {topic}.', 'source': 'stub', 'title': topic})
+                  for index, topic in enumerate(TOPICS[:payload.get('topK', 5)])]
+    return jsonify({'namespace': payload.get('namespace', ''), 'matches': [
+        {'id': vector_id, 'score': score, 'values': [], 'metadata': metadata} for score, vector_id, metadata in scored
+    ]})
+
+@app.route('/describe_index_stats', methods=['GET', 'POST'])
+def pinecone_index_stats():
+    return jsonify({'namespaces': {'': {'vectorCount': len(vectors)}}, 'dimension': EMBEDDING_DIMENSION,
+                    'indexFullness': 0.0, 'totalVectorCount': len(vectors)})
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline stand-in for YouTube, RSS, OpenAI and Pinecone')
+    parser.add_argument('--port', type=int, default=int(os.getenv('STUB_PORT', 8089)))
+    parser.add_argument('--recordings', default=os.getenv('HTTP_REPLAY_DIR'), help='Serve matching recorded responses from this directory')
+    parser.add_argument('--latency-ms', type=float, default=float(os.getenv('HTTP_REPLAY_LATENCY_MS', 0)))
+    parser.add_argument('--jitter-ms', type=float, default=float(os.getenv('HTTP_REPLAY_JITTER_MS', 0)))
+    parser.add_argument('--error-rate', type=float, default=float(os.getenv('HTTP_REPLAY_ERROR_RATE', 0)), help='Share of requests answered with 503')
+    parser.add_argument('--videos', type=int, default=300, help='Videos in the stub channel')
+    parser.add_argument('--episodes', type=int, default=150, help='Episodes in each stub feed')
+    parser.add_argument('--index-name', default=os.getenv('PINECONE_INDEX_NAME', 'gregverse'))
+    parser.add_argument('--seed', type=int, default=0, help='Seed for jitter and error injection')
+    args = parser.parse_args()
+    
+    random.seed(args.seed)
+    settings.latency_ms = args.latency_ms
+    settings.jitter_ms = args.jitter_ms
+    settings.error_rate = args.error_rate
+    settings.videos = args.videos
+    settings.episodes = args.episodes
+    settings.index_name = args.index_name
+    settings.recordings = Recordings(args.recordings) if args.recordings else None
+    
+    print(f"🧪 Stub server on http://localhost:{args.port} ({args.videos} videos, {args.episodes} episodes/feed, "
+          f"{args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, {args.error_rate:.0%} errors)")
+    app.run(host='0.0.0.0', port=args.port, threaded=True)
+
+if __name__ == '__main__':
+    main()
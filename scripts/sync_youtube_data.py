@@ -7,6 +7,7 @@ Syncs all of Greg Isenberg's YouTube content to the database
 import os
 import sys
 import time
+from contextlib import nullcontext
 from datetime import datetime
 
 # Add project root to Python path
@@ -18,6 +19,8 @@ load_dotenv()
 from main import app
 from src.services.youtube_service import YouTubeService
 from src.models.video import Video, db
+from src.services.sql_profiler import profile_block
+from src.services.video_classifier import recategorize_videos
 
 def sync_all_videos():
     """Sync all videos from Greg's YouTube channel"""
@@ -26,7 +29,8 @@ def sync_all_videos():
     print("=" * 60)
     
     with app.app_context():
-        youtube_service = YouTubeService()
+        # Archive backfill: yields quota to user-facing stats calls
+        youtube_service = YouTubeService(priority='backfill')
         
         # Check API key
         if not youtube_service.api_key:
@@ -92,33 +96,14 @@ def update_live_stats():
             return False
 
 def categorize_existing_videos():
-    """Re-categorize all existing videos with improved AI"""
+    """Re-categorize all existing videos with the TF-IDF model"""
     print("\n🤖 Re-categorizing existing videos...")
     
     with app.app_context():
-        youtube_service = YouTubeService()
-        
-        videos = Video.query.filter(
-            db.or_(Video.category.is_(None), Video.category == '')
-        ).all()
-        
-        print(f"🔄 Found {len(videos)} videos to categorize...")
-        
-        categorized = 0
-        for video in videos:
-            try:
-                category = youtube_service._categorize_video(video.title, video.description)
-                video.category = category
-                categorized += 1
-                
-                if categorized % 10 == 0:
-                    print(f"   Categorized {categorized}/{len(videos)} videos...")
-                    
-            except Exception as e:
-                print(f"⚠️  Failed to categorize '{video.title[:30]}...': {e}")
-        
-        db.session.commit()
-        print(f"✅ Categorized {categorized} videos successfully!")
+        # One vectorized pass over the catalog; only changed rows are written
+        result = recategorize_videos()
+        print(f"🔄 Classified {result['videos']} videos (mean confidence {result['mean_confidence']})")
+        print(f"✅ {result['changed_categories']} videos changed category, {result['updated_rows']} rows updated")
 
 def show_sync_summary():
     """Show comprehensive sync summary"""
@@ -126,7 +111,10 @@ def show_sync_summary():
     print("🎉 GREGVERSE SYNC COMPLETE!")
     print("=" * 60)
     
-    with app.app_context():
+    # SQL_PROFILER_ENABLED=true prints the statement count and any N+1 shapes
+    profiling = profile_block('show_sync_summary') if app.config.get('SQL_PROFILER_ENABLED') else nullcontext()
+    
+    with app.app_context(), profiling:
         total_videos = Video.query.count()
         categories = Video.get_categories()
         
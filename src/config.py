@@ -21,13 +21,104 @@ class Config:
     SEARCH_RESULTS_PER_PAGE = int(os.getenv('SEARCH_RESULTS_PER_PAGE', 20))
     STATS_UPDATE_INTERVAL = int(os.getenv('STATS_UPDATE_INTERVAL', 600))
     
+    # YouTube stats time-series retention
+    STATS_RAW_RETENTION_DAYS = int(os.getenv('STATS_RAW_RETENTION_DAYS', 30))
+    STATS_HOURLY_RETENTION_DAYS = int(os.getenv('STATS_HOURLY_RETENTION_DAYS', 400))
+    STATS_PRUNE_INTERVAL = int(os.getenv('STATS_PRUNE_INTERVAL', 3600))
+    STATS_LATEST_POINTER_TTL = int(os.getenv('STATS_LATEST_POINTER_TTL', 60))
+    STATS_HISTORY_MAX_SOURCE_ROWS = int(os.getenv('STATS_HISTORY_MAX_SOURCE_ROWS', 5000))
+    STATS_TREND_HALF_LIFE_DAYS = float(os.getenv('STATS_TREND_HALF_LIFE_DAYS', 30))
+    
+    # Overview snapshot: seconds a worker trusts its in-memory copy
+    OVERVIEW_CACHE_TTL = int(os.getenv('OVERVIEW_CACHE_TTL', 5))
+    
+    # RSS feed cache: poll interval and age (seconds) after which snapshots are marked stale
+    FEED_POLL_INTERVAL = int(os.getenv('FEED_POLL_INTERVAL', 300))
+    FEED_STALE_AFTER = int(os.getenv('FEED_STALE_AFTER', 900))
+    FEED_CACHE_EPISODES = int(os.getenv('FEED_CACHE_EPISODES', 6))
+    
+    # Podcast sync: feeds polled in parallel, connections per host, per-feed timeout (seconds)
+    PODCAST_FEED_CONCURRENCY = int(os.getenv('PODCAST_FEED_CONCURRENCY', 4))
+    PODCAST_FEED_PER_HOST = int(os.getenv('PODCAST_FEED_PER_HOST', 2))
+    PODCAST_FEED_TIMEOUT = float(os.getenv('PODCAST_FEED_TIMEOUT', 15))
+    
     # YouTube API
     YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
     YOUTUBE_CHANNEL_ID = os.getenv('YOUTUBE_CHANNEL_ID', 'UCPjNBjflYl0-HQtUvOx0Ibw')
+    # Seconds between full reconciliations; other video syncs stop at the watermark
+    YOUTUBE_FULL_SYNC_INTERVAL = int(os.getenv('YOUTUBE_FULL_SYNC_INTERVAL', 86400))
+    # Overridable to point syncs at scripts/replay_server.py
+    YOUTUBE_API_BASE_URL = os.getenv('YOUTUBE_API_BASE_URL', 'https://www.googleapis.com/youtube/v3')
+    # Pooled YouTube HTTP client: retries on 429/5xx with exponential backoff, each charged to quota
+    YOUTUBE_HTTP_RETRIES = int(os.getenv('YOUTUBE_HTTP_RETRIES', 3))
+    YOUTUBE_HTTP_BACKOFF = float(os.getenv('YOUTUBE_HTTP_BACKOFF', 0.5))
+    YOUTUBE_HTTP_POOL_SIZE = int(os.getenv('YOUTUBE_HTTP_POOL_SIZE', 10))
+    # Daily quota units, plus the token bucket pacing calls (units/second and burst size)
+    YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', 10000))
+    YOUTUBE_QUOTA_RATE = float(os.getenv('YOUTUBE_QUOTA_RATE', 1.0))
+    YOUTUBE_QUOTA_BURST = int(os.getenv('YOUTUBE_QUOTA_BURST', 20))
+    
+    # Flightcast podcast RSS feed
+    FLIGHTCAST_RSS_URL = os.getenv('FLIGHTCAST_RSS_URL', 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml')
     
     # OpenAI API
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     
+    # Health probes (seconds)
+    HEALTH_PROBE_INTERVAL = int(os.getenv('HEALTH_PROBE_INTERVAL', 30))
+    HEALTH_YOUTUBE_PROBE_INTERVAL = int(os.getenv('HEALTH_YOUTUBE_PROBE_INTERVAL', 300))
+    HEALTH_PROBE_TIMEOUT = float(os.getenv('HEALTH_PROBE_TIMEOUT', 5))
+    HEALTH_PROBE_MAX_BACKOFF = int(os.getenv('HEALTH_PROBE_MAX_BACKOFF', 600))
+    HEALTH_STALE_AFTER = int(os.getenv('HEALTH_STALE_AFTER', 180))
+    HEALTH_HISTORY_SIZE = int(os.getenv('HEALTH_HISTORY_SIZE', 60))
+    
+    # Background jobs: runner threads per process. The web process only enqueues and
+    # worker.py (Procfile "worker") runs the jobs; JOB_RUN_IN_WEB runs them in-process
+    # instead, for single-process setups without a worker
+    JOB_RUNNER_CONCURRENCY = int(os.getenv('JOB_RUNNER_CONCURRENCY', 1))
+    JOB_RUN_IN_WEB = os.getenv('JOB_RUN_IN_WEB', 'False').lower() == 'true'
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 5))
+    JOB_STALE_AFTER = int(os.getenv('JOB_STALE_AFTER', 600))
+    # Succeeded and failed jobs are deleted this many days after they finish
+    JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', 14))
+    
+    # View counts: a refresh_views job every VIEW_REFRESH_INTERVAL seconds spends at most
+    # VIEW_REFRESH_DAILY_QUOTA units a day, refreshing hot and new videos most often
+    VIEW_REFRESH_INTERVAL = int(os.getenv('VIEW_REFRESH_INTERVAL', 900))
+    VIEW_REFRESH_DAILY_QUOTA = int(os.getenv('VIEW_REFRESH_DAILY_QUOTA', 500))
+    VIEW_SAMPLE_RETENTION_DAYS = int(os.getenv('VIEW_SAMPLE_RETENTION_DAYS', 30))
+    
+    # Trending: views count with weight e^(-age/TRENDING_TAU_HOURS); scores are views/hour
+    # and videos below TRENDING_MIN_SCORE are not listed (0 lists every scored video)
+    TRENDING_TAU_HOURS = float(os.getenv('TRENDING_TAU_HOURS', 24))
+    TRENDING_MIN_SCORE = float(os.getenv('TRENDING_MIN_SCORE', 1))
+    
+    # Whole-catalog recategorization with the TF-IDF model (categorize_videos job); 0 disables
+    VIDEO_CATEGORIZE_INTERVAL = int(os.getenv('VIDEO_CATEGORIZE_INTERVAL', 86400))
+    
+    # Syncs and indexing run once at a time across processes (Postgres advisory
+    # locks; lock files in SINGLE_FLIGHT_LOCK_DIR on SQLite); callers wait this long
+    SINGLE_FLIGHT_TIMEOUT = int(os.getenv('SINGLE_FLIGHT_TIMEOUT', 1800))
+    SINGLE_FLIGHT_LOCK_DIR = os.getenv('SINGLE_FLIGHT_LOCK_DIR')
+    
+    # Redis URL shared by web and worker so the worker's socket events reach clients
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    
+    # SQL profiler (debug only): X-SQL-Profile header and /debug/requests
+    SQL_PROFILER_ENABLED = os.getenv('SQL_PROFILER_ENABLED', 'False').lower() == 'true'
+    SQL_PROFILER_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_PROFILER_N_PLUS_ONE_THRESHOLD', 5))
+    SQL_PROFILER_SLOW_MS = float(os.getenv('SQL_PROFILER_SLOW_MS', 50))
+    SQL_PROFILER_EXPLAIN = os.getenv('SQL_PROFILER_EXPLAIN', 'False').lower() == 'true'
+    SQL_PROFILER_RING_SIZE = int(os.getenv('SQL_PROFILER_RING_SIZE', 100))
+    
+    # Offline runs: off, record (save every response) or replay (serve recordings, never call
+    # out) for all YouTube, RSS and OpenAI traffic; replay injects latency, jitter and 503s
+    HTTP_REPLAY_MODE = os.getenv('HTTP_REPLAY_MODE', 'off').lower()
+    HTTP_REPLAY_DIR = os.getenv('HTTP_REPLAY_DIR', 'recordings')
+    HTTP_REPLAY_LATENCY_MS = float(os.getenv('HTTP_REPLAY_LATENCY_MS', 0))
+    HTTP_REPLAY_JITTER_MS = float(os.getenv('HTTP_REPLAY_JITTER_MS', 0))
+    HTTP_REPLAY_ERROR_RATE = float(os.getenv('HTTP_REPLAY_ERROR_RATE', 0))
+    
     # Redis Configuration
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
 
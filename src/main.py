@@ -1,4 +1,4 @@
-import import os
+import os
 import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -7,8 +7,6 @@ from flask import Flask, send_from_directory, jsonify
 from flask_socketio import SocketIO
 from flask_cors import CORS
 from src.config import get_config
-import feedparser
-import requests
 from datetime import datetime
 
 # Import models and routes
@@ -18,6 +16,17 @@ try:
     from src.routes.search import search_bp
     from src.routes.stats import stats_bp, setup_websocket_events, start_background_stats_updater, init_socketio
     from src.routes.health import health_bp
+    from src.routes.metrics import metrics_bp
+    from src.routes.debug import debug_bp
+    from src.routes.jobs import jobs_bp
+    from src.services.health_prober import init_dependency_prober
+    from src.services.sql_profiler import init_sql_profiler
+    from src.services.youtube_quota import init_youtube_quota
+    from src.services.http_replay import init_http_replay
+    from src.services.jobs import init_jobs
+    from src.services.metrics import init_metrics
+    from src.services.feed_fetcher import feed_fetcher
+    from src.services.feed_cache import init_feed_cache
     from src.services.youtube_service import YouTubeService
 except ImportError as e:
     print(f"Import warning: {e}")
@@ -41,7 +50,12 @@ def create_app(config_name=None):
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
     
     # Initialize SocketIO with simple threading mode for Railway compatibility
-    socketio = SocketIO(app, cors_allowed_origins=app.config['CORS_ORIGINS'], async_mode='threading')
+    socketio = SocketIO(
+        app,
+        cors_allowed_origins=app.config['CORS_ORIGINS'],
+        async_mode='threading',
+        message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    )
     
     # Initialize database
     db.init_app(app)
@@ -50,11 +64,36 @@ def create_app(config_name=None):
     app.register_blueprint(search_bp, url_prefix='/api/search')
     app.register_blueprint(stats_bp, url_prefix='/api/stats')
     app.register_blueprint(health_bp, url_prefix='/health')
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(debug_bp, url_prefix='/debug')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
     
     # Initialize WebSocket events
     setup_websocket_events(socketio)
     init_socketio(socketio)
     
+    # HTTP_REPLAY_MODE records or replays outbound HTTP (see scripts/replay_server.py)
+    init_http_replay(app)
+    
+    # YouTube quota budget and pacing from YOUTUBE_DAILY_QUOTA / YOUTUBE_QUOTA_*
+    init_youtube_quota(app)
+    
+    # Background dependency checks for /health, /health/live and /health/ready
+    init_dependency_prober(app)
+    
+    # Prometheus metrics at /metrics
+    init_metrics(app)
+    
+    # Per-request SQL profiling when SQL_PROFILER_ENABLED is set
+    init_sql_profiler(app)
+    
+    # Syncs run as resumable jobs (in worker.py, or here with JOB_RUN_IN_WEB);
+    # progress is emitted on the /jobs namespace
+    init_jobs(app, socketio)
+    
+    # Flightcast RSS is polled in the background; the podcast routes serve its snapshot
+    flightcast_feed = init_feed_cache(app)
+    
     # Create database tables
     with app.app_context():
         try:
@@ -131,11 +170,17 @@ def create_app(config_name=None):
                 },
                 'stats': {
                     'youtube': 'GET /api/stats/youtube',
-                    'overview': 'GET /api/stats/overview'
+                    'overview': 'GET /api/stats/overview',
+                    'history': 'GET /api/stats/history?from=&to=&points=',
+                    'forecast': 'GET /api/stats/forecast?milestone='
                 },
                 'health': {
                     'basic': 'GET /health',
-                    'detailed': 'GET /health/detailed'
+                    'detailed': 'GET /health/detailed',
+                    'live': 'GET /health/live',
+                    'ready': 'GET /health/ready',
+                    'dependencies': 'GET /health/dependencies',
+                    'metrics': 'GET /metrics'
                 },
                 'podcast': {
                     'episodes': 'GET /api/episodes',
@@ -165,29 +210,21 @@ def create_app(config_name=None):
     @app.route('/api/episodes', methods=['GET'])
     def api_episodes():
         """Get latest podcast episodes from RSS feed"""
-        RSS_URL = 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml'
+        RSS_URL = flightcast_feed.url
         
         try:
-            feed = feedparser.parse(RSS_URL)
-            episodes = []
-            
-            for entry in feed.entries[:6]:  # Latest 6 episodes
-                episodes.append({
-                    'title': entry.title,
-                    'description': entry.summary[:200] + '...' if len(entry.summary) > 200 else entry.summary,
-                    'date': entry.published,
-                    'duration': getattr(entry, 'itunes_duration', '32:07'),
-                    'image': 'https://assets.flightcast.com/static/t8c97hs8oy7a2xnobsfu5p42.jpg',
-                    'link': entry.link,
-                    'tags': ['AI', 'Startup', 'Business']
-                })
+            snapshot = flightcast_feed.snapshot()
+            if snapshot is None:
+                raise RuntimeError('RSS feed has not been polled yet')
             
             return jsonify({
                 'success': True,
-                'episodes': episodes, 
-                'total': len(feed.entries),
+                'episodes': snapshot['episodes'], 
+                'total': snapshot['total'],
                 'message': 'Latest episodes from Greg\'s podcast',
-                'rss_url': RSS_URL
+                'rss_url': RSS_URL,
+                'stale': snapshot['stale'],
+                'fetched_at': snapshot['fetched_at']
             })
             
         except Exception as e:
@@ -217,19 +254,15 @@ def create_app(config_name=None):
                 'episodes': fallback_episodes, 
                 'total': 100,
                 'error': str(e),
-                'message': 'Using fallback episode data'
+                'message': 'Using fallback episode data',
+                'stale': True
             })
 
     @app.route('/api/podcast-stats', methods=['GET'])
     def api_podcast_stats():
         """Get podcast and overall statistics"""
-        RSS_URL = 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml'
-        
-        try:
-            feed = feedparser.parse(RSS_URL)
-            podcast_count = len(feed.entries)
-        except:
-            podcast_count = 100
+        snapshot = flightcast_feed.snapshot()
+        podcast_count = snapshot['total'] if snapshot else 100
         
         return jsonify({
             'success': True,
@@ -242,7 +275,8 @@ def create_app(config_name=None):
                 'industries_covered': 12
             },
             'message': 'Real-time stats for the Gregverse',
-            'last_updated': datetime.now().isoformat()
+            'last_updated': datetime.now().isoformat(),
+            'stale': snapshot['stale'] if snapshot else True
         })
 
     @app.route('/api/featured-guests', methods=['GET'])
@@ -328,24 +362,18 @@ def create_app(config_name=None):
     @app.route('/api/rss-health', methods=['GET'])
     def api_rss_health():
         """Check RSS feed health and connectivity"""
-        RSS_URL = 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml'
+        RSS_URL = flightcast_feed.url
         
-        try:
-            response = requests.get(RSS_URL, timeout=10)
-            rss_status = 'healthy' if response.status_code == 200 else 'error'
-            
-            if rss_status == 'healthy':
-                feed = feedparser.parse(RSS_URL)
-                episode_count = len(feed.entries)
-                latest_episode = feed.entries[0].title if feed.entries else 'Unknown'
-            else:
-                episode_count = 0
-                latest_episode = 'Unable to fetch'
-                
-        except Exception as e:
-            rss_status = 'error'
+        # Reports the background poller; the feed itself is never fetched here
+        snapshot = flightcast_feed.snapshot()
+        if snapshot is None:
+            rss_status = 'error' if flightcast_feed.last_error else 'pending'
             episode_count = 0
-            latest_episode = 'Connection failed'
+            latest_episode = 'Unable to fetch'
+        else:
+            rss_status = 'stale' if snapshot['stale'] else 'healthy'
+            episode_count = snapshot['total']
+            latest_episode = snapshot['latest_episode']
         
         return jsonify({
             'status': 'healthy',
@@ -353,7 +381,9 @@ def create_app(config_name=None):
                 'status': rss_status,
                 'url': RSS_URL,
                 'episode_count': episode_count,
-                'latest_episode': latest_episode
+                'latest_episode': latest_episode,
+                'fetched_at': snapshot['fetched_at'] if snapshot else None,
+                'last_error': flightcast_feed.last_error
             },
             'timestamp': datetime.now().isoformat(),
             'message': 'RSS integration health check'
@@ -401,10 +431,10 @@ def create_app(config_name=None):
     @app.cli.command()
     def test_rss():
         """Test RSS feed connectivity"""
-        RSS_URL = 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml'
+        RSS_URL = flightcast_feed.url
         print(f"🔍 Testing RSS feed: {RSS_URL}")
         try:
-            feed = feedparser.parse(RSS_URL)
+            feed = feed_fetcher.fetch(RSS_URL, 'flightcast').feed
             print(f"✅ RSS feed healthy: {len(feed.entries)} episodes found")
             print(f"📻 Latest episode: {feed.entries[0].title}")
         except Exception as e:
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from .video import db
+
+class Job(db.Model):
+    """A background job with a checkpoint it can resume from after a restart"""
+    __tablename__ = 'jobs'
+    
+    STATUSES = ('queued', 'running', 'succeeded', 'failed')
+    ACTIVE = ('queued', 'running')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False, index=True)  # e.g. sync_videos
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    params = db.Column(db.JSON)
+    checkpoint = db.Column(db.JSON)  # Handler-defined resume state, e.g. the next page token
+    progress = db.Column(db.JSON)  # Counts shown to clients
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    claimed_by = db.Column(db.String(100))  # host:pid of the runner executing the job
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'params': self.params or {},
+            'progress': self.progress or {},
+            'result': self.result,
+            'error': self.error,
+            'attempts': self.attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'claimed_by': self.claimed_by
+        }
+    
+    @classmethod
+    def find_active(cls, kind, params=None):
+        """A queued or running job of the same kind and params, so a second request joins it"""
+        for job in cls.query.filter(cls.kind == kind, cls.status.in_(cls.ACTIVE)).order_by(cls.id.asc()):
+            if (job.params or {}) == (params or {}):
+                return job
+        return None
+    
+    @classmethod
+    def claim_next(cls, worker_id, stale_after=600, kinds=None):
+        """Atomically take the oldest runnable job, or None.
+        
+        Runnable means queued, or running with a heartbeat older than
+        stale_after seconds (its runner died). Postgres skips rows another
+        runner has locked (FOR UPDATE SKIP LOCKED); every database then
+        claims with a compare-and-set UPDATE, so two runners never get the
+        same job even where row locks are unavailable (SQLite).
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=stale_after)
+        runnable = or_(
+            cls.status == 'queued',
+            (cls.status == 'running') & or_(cls.heartbeat_at.is_(None), cls.heartbeat_at < stale_before)
+        )
+        query = cls.query.filter(runnable)
+        if kinds:
+            query = query.filter(cls.kind.in_(kinds))
+        
+        for _ in range(5):
+            candidate = query.order_by(cls.id.asc()).with_for_update(skip_locked=True).first()
+            if candidate is None:
+                db.session.rollback()
+                return None
+            
+            now = datetime.utcnow()
+            claimed = cls.query.filter(
+                cls.id == candidate.id,
+                cls.status == candidate.status,
+                cls.claimed_by.is_(None) if candidate.claimed_by is None else cls.claimed_by == candidate.claimed_by,
+                cls.attempts == candidate.attempts
+            ).update({
+                'status': 'running',
+                'claimed_by': worker_id,
+                'attempts': cls.attempts + 1,
+                'started_at': db.func.coalesce(cls.started_at, now),
+                'heartbeat_at': now
+            }, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                return db.session.get(cls, candidate.id, populate_existing=True)
+        return None
+    
+    @classmethod
+    def touch(cls, job_ids):
+        """Heartbeat for jobs still being worked on"""
+        if job_ids:
+            cls.query.filter(cls.id.in_(list(job_ids))).update(
+                {'heartbeat_at': datetime.utcnow()}, synchronize_session=False
+            )
+            db.session.commit()
+    
+    @classmethod
+    def prune(cls, before):
+        """Delete succeeded and failed jobs that finished before the cutoff"""
+        deleted = cls.query.filter(
+            cls.status.notin_(cls.ACTIVE), cls.finished_at < before
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+    
+    @classmethod
+    def recent(cls, kind=None, limit=20):
+        query = cls.query
+        if kind:
+            query = query.filter_by(kind=kind)
+        return query.order_by(cls.id.desc()).limit(limit).all()
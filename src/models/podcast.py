@@ -1,11 +1,80 @@
+import re
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from .video import db
 
+class PodcastFeed(db.Model):
+    __tablename__ = 'podcast_feeds'
+    
+    # Feeds registered on first sync; lower priority wins when shows overlap
+    DEFAULT_FEEDS = [
+        {'name': 'startup_ideas', 'url': 'https://feeds.transistor.fm/the-startup-ideas-podcast', 'priority': 0},
+        {'name': 'flightcast', 'url': 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml', 'priority': 1},
+    ]
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    url = db.Column(db.String(500), unique=True, nullable=False)
+    priority = db.Column(db.Integer, default=100)
+    active = db.Column(db.Boolean, default=True)
+    last_polled_at = db.Column(db.DateTime)
+    last_success_at = db.Column(db.DateTime)
+    last_status = db.Column(db.String(20))  # ok, not_modified, error
+    last_error = db.Column(db.String(500))
+    last_duration_ms = db.Column(db.Integer)
+    consecutive_failures = db.Column(db.Integer, default=0)
+    episode_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'url': self.url,
+            'priority': self.priority,
+            'active': self.active,
+            'last_polled_at': self.last_polled_at.isoformat() if self.last_polled_at else None,
+            'last_success_at': self.last_success_at.isoformat() if self.last_success_at else None,
+            'last_status': self.last_status,
+            'last_error': self.last_error,
+            'last_duration_ms': self.last_duration_ms,
+            'consecutive_failures': self.consecutive_failures,
+            'episode_count': self.episode_count
+        }
+    
+    @classmethod
+    def get_active(cls):
+        """Active feeds in priority order, registering the defaults on first use"""
+        if not db.session.query(cls.id).first():
+            for feed in cls.DEFAULT_FEEDS:
+                db.session.add(cls(**feed))
+            db.session.commit()
+        return cls.query.filter_by(active=True).order_by(cls.priority.asc(), cls.id.asc()).all()
+    
+    def record_poll(self, status, duration_ms, error=None, episode_count=None):
+        """Store the outcome of one poll"""
+        now = datetime.utcnow()
+        self.last_polled_at = now
+        self.last_status = status
+        self.last_duration_ms = duration_ms
+        if status == 'error':
+            self.last_error = (error or '')[:500]
+            self.consecutive_failures = (self.consecutive_failures or 0) + 1
+        else:
+            self.last_error = None
+            self.last_success_at = now
+            self.consecutive_failures = 0
+        if episode_count is not None:
+            self.episode_count = episode_count
+
 class PodcastEpisode(db.Model):
     __tablename__ = 'podcast_episodes'
     
     id = db.Column(db.Integer, primary_key=True)
+    guid = db.Column(db.String(500), unique=True, index=True)  # RSS <guid>, stable across title edits
+    feed_id = db.Column(db.Integer, db.ForeignKey('podcast_feeds.id'), index=True)
+    dedup_key = db.Column(db.String(300), index=True)  # Normalized title, matches the same episode across feeds
     title = db.Column(db.String(500), nullable=False)
     description = db.Column(db.Text)
     guest = db.Column(db.String(200))
@@ -25,6 +94,8 @@ class PodcastEpisode(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'guid': self.guid,
+            'feed_id': self.feed_id,
             'title': self.title,
             'description': self.description,
             'guest': self.guest,
@@ -66,6 +137,78 @@ class PodcastEpisode(db.Model):
             page=page, per_page=per_page, error_out=False
         )
     
+    @classmethod
+    def recent_guids(cls, feed_id=None, limit=50):
+        """GUIDs of the newest stored episodes of a feed, where an incremental sync can stop"""
+        query = db.session.query(cls.guid).filter(cls.guid.isnot(None))
+        if feed_id is not None:
+            query = query.filter(cls.feed_id == feed_id)
+        rows = query.order_by(cls.published_at.desc()).limit(limit).all()
+        return {row[0] for row in rows}
+    
+    @staticmethod
+    def make_dedup_key(title):
+        """Normalize a title so the same episode published by two feeds compares equal"""
+        return re.sub(r'[^a-z0-9]+', ' ', (title or '').lower()).strip()[:300] or None
+    
+    @classmethod
+    def adopt_legacy_guids(cls, guid_by_title):
+        """Give rows stored before GUIDs existed the GUID of the feed entry with the same title"""
+        if not guid_by_title:
+            return 0
+        
+        legacy = db.session.query(cls.id, cls.title).filter(
+            cls.guid.is_(None),
+            cls.title.in_(list(guid_by_title))
+        ).all()
+        if not legacy:
+            return 0
+        
+        taken = {
+            row[0] for row in db.session.query(cls.guid).filter(
+                cls.guid.in_([guid_by_title[title] for _, title in legacy])
+            )
+        }
+        mappings = []
+        for episode_id, title in legacy:
+            guid = guid_by_title[title]
+            if guid not in taken:
+                taken.add(guid)
+                mappings.append({'id': episode_id, 'guid': guid})
+        
+        db.session.bulk_update_mappings(cls, mappings)
+        return len(mappings)
+    
+    @classmethod
+    def backfill_dedup_keys(cls):
+        """Fill dedup_key on rows stored before it existed"""
+        rows = db.session.query(cls.id, cls.title).filter(cls.dedup_key.is_(None)).all()
+        if rows:
+            db.session.bulk_update_mappings(cls, [
+                {'id': episode_id, 'dedup_key': cls.make_dedup_key(title)} for episode_id, title in rows
+            ])
+        return len(rows)
+    
+    @classmethod
+    def count_by_feed(cls):
+        """Stored episodes per feed id"""
+        rows = db.session.query(cls.feed_id, db.func.count(cls.id)).group_by(cls.feed_id).all()
+        return {feed_id: count for feed_id, count in rows}
+    
+    @classmethod
+    def feed_owners(cls, guids, dedup_keys):
+        """Which feed stored each GUID, and the (guid, feed_id) stored under each dedup key"""
+        by_guid = {}
+        by_key = {}
+        if guids:
+            by_guid = dict(db.session.query(cls.guid, cls.feed_id).filter(cls.guid.in_(list(guids))).all())
+        if dedup_keys:
+            rows = db.session.query(cls.dedup_key, cls.guid, cls.feed_id).filter(
+                cls.dedup_key.in_(list(dedup_keys))
+            ).all()
+            by_key = {row[0]: (row[1], row[2]) for row in rows}
+        return by_guid, by_key
+    
     @classmethod
     def get_guests(cls):
         """Get all unique guests"""
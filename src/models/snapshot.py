@@ -0,0 +1,27 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from .video import db
+
+class MaterializedSnapshot(db.Model):
+    __tablename__ = 'materialized_snapshots'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    payload = db.Column(db.Text, nullable=False)  # Prebuilt JSON document
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @classmethod
+    def load(cls, name):
+        """Get a snapshot by name"""
+        return db.session.get(cls, name)
+    
+    @classmethod
+    def store(cls, name, payload):
+        """Create or replace a snapshot"""
+        snapshot = db.session.get(cls, name)
+        if not snapshot:
+            snapshot = cls(name=name)
+            db.session.add(snapshot)
+        snapshot.payload = payload
+        snapshot.updated_at = datetime.utcnow()
+        db.session.commit()
+        return snapshot
@@ -0,0 +1,66 @@
+import json
+from datetime import datetime
+from .upsert import dialect_insert
+from .video import db
+
+class SyncState(db.Model):
+    __tablename__ = 'sync_state'
+    
+    key = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Text)  # JSON document
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @classmethod
+    def get(cls, key, default=None, fresh=False):
+        """Get a stored value, or default when the key was never written.
+        
+        fresh re-reads the row even if this session already loaded it, to see
+        what another process committed since.
+        """
+        state = db.session.get(cls, key, populate_existing=fresh)
+        if not state or state.value is None:
+            return default
+        return json.loads(state.value)
+    
+    @classmethod
+    def put(cls, key, value):
+        """Stage a value in the current transaction; the caller commits it with the data it describes"""
+        state = db.session.get(cls, key)
+        if not state:
+            state = cls(key=key)
+            db.session.add(state)
+        state.value = json.dumps(value)
+        state.updated_at = datetime.utcnow()
+        return state
+    
+    @classmethod
+    def advance(cls, key, value, below):
+        """Atomically store value when the key is unset or holds something below `below`, and commit.
+        
+        Stored values compare as JSON text, so they must be strings of one
+        fixed format (e.g. zero-padded timestamps). Returns True only for the
+        caller that moved the value, so concurrent processes can use it to
+        take turns.
+        """
+        table = cls.__table__
+        now = datetime.utcnow()
+        row = {'key': key, 'value': json.dumps(value), 'updated_at': now}
+        stmt = dialect_insert(table)
+        if stmt is not None:
+            stmt = stmt.values(row).on_conflict_do_update(
+                index_elements=[table.c.key],
+                set_={'value': stmt.excluded.value, 'updated_at': stmt.excluded.updated_at},
+                where=db.or_(table.c.value.is_(None), table.c.value < json.dumps(below))
+            )
+            moved = db.session.execute(stmt).rowcount
+        else:
+            moved = db.session.execute(
+                table.update().where(
+                    table.c.key == key, db.or_(table.c.value.is_(None), table.c.value < json.dumps(below))
+                ).values(value=row['value'], updated_at=now)
+            ).rowcount
+            if not moved and db.session.get(cls, key) is None:
+                db.session.execute(table.insert().values(row))
+                moved = 1
+        db.session.commit()
+        return moved == 1
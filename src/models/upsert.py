@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .video import db
+
+def dialect_insert(table):
+    """INSERT with ON CONFLICT support for this database, or None where it has none"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    return None
+
+def bulk_upsert(model, rows: Iterable[Dict], key: str, batch_size: int = 500,
+                touch: Optional[str] = 'updated_at') -> Dict[str, int]:
+    """Insert or update rows keyed on a unique column, skipping rows that did not change.
+    
+    Each batch costs two round trips: one SELECT of the stored values, then one
+    INSERT ... ON CONFLICT DO UPDATE ... WHERE <any column differs> carrying only
+    the new and changed rows. The WHERE guard keeps a concurrent writer from
+    causing a no-op update. Every row must have the same keys. A None value
+    never overwrites a stored one, so sparse rows leave missing fields alone.
+    """
+    counts = {'inserted': 0, 'changed': 0, 'unchanged': 0}
+    table = model.__table__
+    
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _upsert_batch(table, batch, key, touch, counts)
+            batch = []
+    if batch:
+        _upsert_batch(table, batch, key, touch, counts)
+    
+    return counts
+
+def _upsert_batch(table, batch: List[Dict], key: str, touch: Optional[str], counts: Dict[str, int]):
+    # ON CONFLICT may not touch the same row twice in one statement, so the last duplicate wins
+    by_key = {row[key]: row for row in batch}
+    columns = [name for name in next(iter(by_key.values())) if name != key]
+    
+    stored = {
+        row[0]: row[1:]
+        for row in db.session.execute(
+            select(table.c[key], *[table.c[name] for name in columns]).where(table.c[key].in_(list(by_key)))
+        )
+    }
+    
+    now = datetime.utcnow()
+    pending = []
+    for value, row in by_key.items():
+        current = stored.get(value)
+        if current is None:
+            counts['inserted'] += 1
+        elif any(row[name] is not None and current[i] != row[name] for i, name in enumerate(columns)):
+            counts['changed'] += 1
+        else:
+            counts['unchanged'] += 1
+            continue
+        if touch:
+            row = dict(row, **{touch: now})
+        pending.append(row)
+    
+    if not pending:
+        return
+    
+    stmt = dialect_insert(table)
+    if stmt is None:
+        _upsert_fallback(table, pending, key, stored)
+        return
+    
+    merged = {name: func.coalesce(stmt.excluded[name], table.c[name]) for name in columns}
+    set_ = dict(merged)
+    if touch:
+        set_[touch] = stmt.excluded[touch]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[key]],
+        set_=set_,
+        where=or_(*[table.c[name].is_distinct_from(merged[name]) for name in columns])
+    )
+    db.session.execute(stmt, pending)
+
+def _upsert_fallback(table, pending: List[Dict], key: str, stored: Dict):
+    """Plain INSERT/UPDATE for databases without ON CONFLICT"""
+    inserts = [row for row in pending if row[key] not in stored]
+    updates = [row for row in pending if row[key] in stored]
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+    for row in updates:
+        db.session.execute(
+            table.update().where(table.c[key] == row[key]).values(
+                {k: v for k, v in row.items() if k != key and v is not None}
+            )
+        )
@@ -1,3 +1,4 @@
+import hashlib
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from sqlalchemy import Index, text
@@ -14,9 +15,20 @@ class Video(db.Model):
     published_at = db.Column(db.DateTime)
     view_count = db.Column(db.Integer, default=0)
     category = db.Column(db.String(50), index=True)
+    category_confidence = db.Column(db.Float)  # Model probability of the category, see services/video_classifier.py
     tags = db.Column(db.JSON)  # Store as JSON array
     thumbnail_url = db.Column(db.Text)
     duration = db.Column(db.Integer)  # Duration in seconds
+    content_hash = db.Column(db.String(40))  # Hash of the synced snippet fields, see content_hash_of()
+    details_checked_at = db.Column(db.DateTime)  # Last videos.list answer covering this video, found or not
+    # View refresh scheduling, see services/view_refresh.py
+    refresh_tier = db.Column(db.String(10))  # hot, new, warm or cold
+    view_velocity = db.Column(db.Float)  # Smoothed views per day
+    views_refreshed_at = db.Column(db.DateTime)
+    # view_count as of views_refreshed_at; syncs also write view_count, so deltas are taken from this
+    refreshed_view_count = db.Column(db.Integer)
+    next_refresh_at = db.Column(db.DateTime, index=True)
+    trending_key = db.Column(db.Float, index=True)  # ln(decayed views/hour) + t/tau, see services/trending.py
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -35,15 +47,18 @@ class Video(db.Model):
             'published_at': self.published_at.isoformat() if self.published_at else None,
             'view_count': self.view_count,
             'category': self.category,
+            'category_confidence': self.category_confidence,
             'tags': self.tags or [],
             'thumbnail_url': self.thumbnail_url,
             'duration': self.duration,
+            'view_velocity': self.view_velocity,
+            'views_refreshed_at': self.views_refreshed_at.isoformat() if self.views_refreshed_at else None,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
     
     @classmethod
-    def search(cls, query, category=None, page=1, per_page=20):
+    def search(cls, query, category=None, page=1, per_page=20, sort='relevance'):
         """Search videos with full-text search and filtering"""
         search_query = cls.query
         
@@ -61,7 +76,12 @@ class Video(db.Model):
             search_query = search_query.filter(cls.category == category)
         
         # Order by relevance (title matches first, then description)
-        if query:
+        if sort == 'popular':
+            search_query = search_query.order_by(
+                db.func.coalesce(cls.view_count, 0).desc(),
+                cls.published_at.desc()
+            )
+        elif query:
             search_query = search_query.order_by(
                 cls.title.ilike(f"%{query}%").desc(),
                 cls.published_at.desc()
@@ -75,6 +95,47 @@ class Video(db.Model):
             error_out=False
         )
     
+    @staticmethod
+    def content_hash_of(title, description, thumbnail_url):
+        """Fingerprint of the fields a sync writes, so unchanged videos can be skipped"""
+        payload = '\x1f'.join([title or '', description or '', thumbnail_url or ''])
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def sync_index(cls):
+        """youtube_id -> (id, content_hash) for every stored video, in one query"""
+        rows = db.session.query(cls.youtube_id, cls.id, cls.content_hash).all()
+        return {youtube_id: (video_id, content_hash) for youtube_id, video_id, content_hash in rows}
+    
+    @classmethod
+    def missing_details_ids(cls):
+        """youtube_ids of videos never looked up with videos.list.
+        
+        A video the API does not return (private, deleted) or whose duration
+        does not parse is still marked checked, so it is not asked for again
+        on every sync.
+        """
+        return {row[0] for row in db.session.query(cls.youtube_id).filter(
+            cls.details_checked_at.is_(None), cls.duration.is_(None)
+        )}
+    
+    @classmethod
+    def due_for_view_refresh(cls, now, limit, tier_order):
+        """Videos whose view count is due, never-refreshed first, then hottest tier first"""
+        tier_rank = db.case(
+            {tier: rank for rank, tier in enumerate(tier_order)},
+            value=cls.refresh_tier,
+            else_=len(tier_order)
+        )
+        return db.session.query(
+            cls.id, cls.youtube_id, cls.published_at, cls.view_velocity, cls.views_refreshed_at,
+            cls.refreshed_view_count, cls.trending_key
+        ).filter(
+            db.or_(cls.next_refresh_at.is_(None), cls.next_refresh_at <= now)
+        ).order_by(
+            cls.next_refresh_at.is_(None).desc(), tier_rank, cls.next_refresh_at.asc()
+        ).limit(limit).all()
+    
     @classmethod
     def get_categories(cls):
         """Get all unique categories"""
@@ -96,3 +157,31 @@ class Video(db.Model):
         
         return [suggestion[0] for suggestion in suggestions]
 
+
+class VideoViewSample(db.Model):
+    """View count of a video at one refresh, with the change since the previous one"""
+    __tablename__ = 'video_view_samples'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.Integer, db.ForeignKey('videos.id', ondelete='CASCADE'), nullable=False, index=True)
+    sampled_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    view_count = db.Column(db.Integer, nullable=False)
+    delta = db.Column(db.Integer)  # None for a video's first sample
+    
+    @classmethod
+    def delete_for(cls, video_ids):
+        """Drop the samples of videos about to be deleted"""
+        return cls.query.filter(cls.video_id.in_(list(video_ids))).delete(synchronize_session=False)
+    
+    @classmethod
+    def prune(cls, before):
+        """Delete samples older than the retention window"""
+        return cls.query.filter(cls.sampled_at < before).delete(synchronize_session=False)
+    
+    @classmethod
+    def series(cls, video_id, since):
+        """[(sampled_at, view_count)] oldest first, for charts"""
+        return db.session.query(cls.sampled_at, cls.view_count).filter(
+            cls.video_id == video_id,
+            cls.sampled_at >= since
+        ).order_by(cls.sampled_at.asc()).all()
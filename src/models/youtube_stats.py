@@ -1,5 +1,8 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from .upsert import dialect_insert
 from .video import db
 
 class YouTubeStats(db.Model):
@@ -9,7 +12,11 @@ class YouTubeStats(db.Model):
     subscriber_count = db.Column(db.Integer, nullable=False)
     total_views = db.Column(db.BigInteger, nullable=False)
     video_count = db.Column(db.Integer, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    # In-memory pointer to the newest raw sample: (row id, snapshot dict, loaded at)
+    _latest = None
+    _last_prune_at = None
     
     def to_dict(self):
         return {
@@ -20,14 +27,37 @@ class YouTubeStats(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
     
+    @classmethod
+    def _pointer_is_fresh(cls):
+        """Check whether the in-memory latest pointer can be trusted"""
+        if cls._latest is None:
+            return False
+        ttl = current_app.config.get('STATS_LATEST_POINTER_TTL', 60)
+        return (datetime.utcnow() - cls._latest[2]).total_seconds() < ttl
+    
+    @classmethod
+    def _set_pointer(cls, stats):
+        cls._latest = (stats.id, stats.to_dict(), datetime.utcnow()) if stats else None
+    
     @classmethod
     def get_latest(cls):
         """Get the most recent stats"""
-        return cls.query.order_by(cls.updated_at.desc()).first()
+        if cls._pointer_is_fresh():
+            latest = db.session.get(cls, cls._latest[0])
+            if latest:
+                return latest
+        
+        # Cold start or another worker wrote a newer sample: one index seek
+        latest = cls.query.order_by(cls.updated_at.desc()).first()
+        cls._set_pointer(latest)
+        return latest
     
     @classmethod
     def get_latest_cached(cls):
         """Get latest stats as fallback data"""
+        if cls._pointer_is_fresh():
+            return dict(cls._latest[1])
+        
         latest = cls.get_latest()
         if latest:
             return latest.to_dict()
@@ -48,9 +78,429 @@ class YouTubeStats(db.Model):
         new_stats = cls(
             subscriber_count=subscriber_count,
             total_views=total_views,
-            video_count=video_count
+            video_count=video_count,
+            updated_at=datetime.utcnow()
         )
         db.session.add(new_stats)
+        YouTubeStatsRollup.record_sample(new_stats)
+        StatsTrend.observe_sample(new_stats)
         db.session.commit()
+        
+        cls._set_pointer(new_stats)
+        cls.prune_if_due()
         return new_stats
 
+    @classmethod
+    def prune_if_due(cls):
+        """Apply retention at most once per prune interval per process"""
+        interval = current_app.config.get('STATS_PRUNE_INTERVAL', 3600)
+        now = datetime.utcnow()
+        if cls._last_prune_at and (now - cls._last_prune_at).total_seconds() < interval:
+            return 0
+        cls._last_prune_at = now
+
+        try:
+            return cls.prune()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Stats retention error: {e}")
+            return 0
+    
+    @classmethod
+    def prune(cls):
+        """Delete raw samples and hourly rollups that are past their retention window"""
+        now = datetime.utcnow()
+        raw_days = current_app.config.get('STATS_RAW_RETENTION_DAYS', 30)
+        hourly_days = current_app.config.get('STATS_HOURLY_RETENTION_DAYS', 400)
+        
+        deleted = cls.query.filter(
+            cls.updated_at < now - timedelta(days=raw_days)
+        ).delete(synchronize_session=False)
+        deleted += YouTubeStatsRollup.query.filter(
+            YouTubeStatsRollup.resolution == 'hour',
+            YouTubeStatsRollup.bucket_start < now - timedelta(days=hourly_days)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+class YouTubeStatsRollup(db.Model):
+    """Min/max/last aggregates of raw stats samples per hourly or daily bucket"""
+    __tablename__ = 'youtube_stats_rollups'
+    
+    RESOLUTIONS = ('hour', 'day')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resolution = db.Column(db.String(8), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False, default=0)
+    subscriber_min = db.Column(db.Integer, nullable=False)
+    subscriber_max = db.Column(db.Integer, nullable=False)
+    subscriber_last = db.Column(db.Integer, nullable=False)
+    views_min = db.Column(db.BigInteger, nullable=False)
+    views_max = db.Column(db.BigInteger, nullable=False)
+    views_last = db.Column(db.BigInteger, nullable=False)
+    video_count_last = db.Column(db.Integer, nullable=False)
+    last_sample_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('resolution', 'bucket_start', name='youtube_stats_rollups_bucket_key'),
+    )
+    
+    def to_dict(self):
+        return {
+            'resolution': self.resolution,
+            'bucket_start': self.bucket_start.isoformat(),
+            'sample_count': self.sample_count,
+            'subscriber_count': {
+                'min': self.subscriber_min,
+                'max': self.subscriber_max,
+                'last': self.subscriber_last
+            },
+            'total_views': {
+                'min': self.views_min,
+                'max': self.views_max,
+                'last': self.views_last
+            },
+            'video_count': self.video_count_last,
+            'last_sample_at': self.last_sample_at.isoformat()
+        }
+    
+    @staticmethod
+    def bucket_for(timestamp, resolution):
+        """Truncate a timestamp to the start of its bucket"""
+        if resolution == 'hour':
+            return timestamp.replace(minute=0, second=0, microsecond=0)
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    @classmethod
+    def record_sample(cls, sample, resolutions=RESOLUTIONS):
+        """Fold a raw sample into its hourly and daily buckets (caller commits).
+        
+        One INSERT ... ON CONFLICT DO UPDATE per bucket merges the sample into
+        whatever is stored, so concurrent writers never race on a new bucket.
+        """
+        table = cls.__table__
+        for resolution in resolutions:
+            values = {
+                'resolution': resolution,
+                'bucket_start': cls.bucket_for(sample.updated_at, resolution),
+                'sample_count': 1,
+                'subscriber_min': sample.subscriber_count,
+                'subscriber_max': sample.subscriber_count,
+                'subscriber_last': sample.subscriber_count,
+                'views_min': sample.total_views,
+                'views_max': sample.total_views,
+                'views_last': sample.total_views,
+                'video_count_last': sample.video_count,
+                'last_sample_at': sample.updated_at
+            }
+            stmt = dialect_insert(table)
+            if stmt is None:
+                cls._record_sample_fallback(values)
+                continue
+            
+            new = stmt.excluded
+            # Samples can arrive out of order during a rebuild
+            newer = new.last_sample_at >= table.c.last_sample_at
+            stmt = stmt.values(values).on_conflict_do_update(
+                index_elements=[table.c.resolution, table.c.bucket_start],
+                set_={
+                    'sample_count': table.c.sample_count + 1,
+                    'subscriber_min': db.case((new.subscriber_min < table.c.subscriber_min, new.subscriber_min), else_=table.c.subscriber_min),
+                    'subscriber_max': db.case((new.subscriber_max > table.c.subscriber_max, new.subscriber_max), else_=table.c.subscriber_max),
+                    'views_min': db.case((new.views_min < table.c.views_min, new.views_min), else_=table.c.views_min),
+                    'views_max': db.case((new.views_max > table.c.views_max, new.views_max), else_=table.c.views_max),
+                    'subscriber_last': db.case((newer, new.subscriber_last), else_=table.c.subscriber_last),
+                    'views_last': db.case((newer, new.views_last), else_=table.c.views_last),
+                    'video_count_last': db.case((newer, new.video_count_last), else_=table.c.video_count_last),
+                    'last_sample_at': db.case((newer, new.last_sample_at), else_=table.c.last_sample_at)
+                }
+            )
+            db.session.execute(stmt)
+    
+    @classmethod
+    def _record_sample_fallback(cls, values):
+        """Select-then-write for databases without ON CONFLICT"""
+        rollup = cls.query.filter_by(resolution=values['resolution'], bucket_start=values['bucket_start']).first()
+        if not rollup:
+            db.session.add(cls(**values))
+            db.session.flush()
+            return
+        
+        rollup.sample_count += 1
+        rollup.subscriber_min = min(rollup.subscriber_min, values['subscriber_min'])
+        rollup.subscriber_max = max(rollup.subscriber_max, values['subscriber_max'])
+        rollup.views_min = min(rollup.views_min, values['views_min'])
+        rollup.views_max = max(rollup.views_max, values['views_max'])
+        if values['last_sample_at'] >= rollup.last_sample_at:
+            rollup.subscriber_last = values['subscriber_last']
+            rollup.views_last = values['views_last']
+            rollup.video_count_last = values['video_count_last']
+            rollup.last_sample_at = values['last_sample_at']
+        db.session.flush()
+    
+    @classmethod
+    def _first_complete_bucket(cls, earliest, resolution):
+        """Start of the first bucket holding every one of its raw samples.
+        
+        The bucket of the earliest retained sample lost its older samples to
+        pruning, so its stored rollup is kept unless there is none to keep.
+        """
+        bucket_start = cls.bucket_for(earliest, resolution)
+        if bucket_start == earliest or not cls.query.filter_by(resolution=resolution, bucket_start=bucket_start).first():
+            return bucket_start
+        if resolution == 'hour':
+            return bucket_start + timedelta(hours=1)
+        return bucket_start + timedelta(days=1)
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute rollups of every bucket the retained raw samples fully cover"""
+        earliest = YouTubeStats.query.order_by(YouTubeStats.updated_at.asc()).first()
+        if not earliest:
+            return 0
+        
+        # Older buckets, and the partly pruned one, are kept as they are
+        starts = {resolution: cls._first_complete_bucket(earliest.updated_at, resolution) for resolution in cls.RESOLUTIONS}
+        for resolution, start in starts.items():
+            cls.query.filter(
+                cls.resolution == resolution,
+                cls.bucket_start >= start
+            ).delete(synchronize_session=False)
+        
+        raw_samples = YouTubeStats.query.filter(
+            YouTubeStats.updated_at >= min(starts.values())
+        ).order_by(YouTubeStats.updated_at.asc())
+        
+        rebuilt = 0
+        for sample in raw_samples.yield_per(500):
+            cls.record_sample(sample, [resolution for resolution, start in starts.items() if sample.updated_at >= start])
+            rebuilt += 1
+        
+        db.session.commit()
+        return rebuilt
+
+class StatsTrend(db.Model):
+    """Running weighted least-squares state for one stats metric"""
+    __tablename__ = 'youtube_stats_trends'
+    
+    # Tracked metric -> rollup column used when replaying history
+    TRACKED_METRICS = {'subscriber_count': 'subscriber_last'}
+    Z_95 = 1.96
+    
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(50), unique=True, nullable=False)
+    origin_at = db.Column(db.DateTime, nullable=False)
+    origin_value = db.Column(db.BigInteger, nullable=False)
+    last_at = db.Column(db.DateTime, nullable=False)
+    last_value = db.Column(db.BigInteger, nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False, default=0)
+    # Exponentially decayed sums over x = days since origin, y = value - origin_value
+    sum_w = db.Column(db.Float, nullable=False, default=0.0)
+    sum_ww = db.Column(db.Float, nullable=False, default=0.0)
+    sum_x = db.Column(db.Float, nullable=False, default=0.0)
+    sum_y = db.Column(db.Float, nullable=False, default=0.0)
+    sum_xx = db.Column(db.Float, nullable=False, default=0.0)
+    sum_xy = db.Column(db.Float, nullable=False, default=0.0)
+    sum_yy = db.Column(db.Float, nullable=False, default=0.0)
+    
+    @classmethod
+    def observe_sample(cls, sample):
+        """Fold a raw stats sample into every tracked trend (caller commits)"""
+        for metric in cls.TRACKED_METRICS:
+            cls.observe(metric, sample.updated_at, getattr(sample, metric))
+    
+    @classmethod
+    def observe(cls, metric, timestamp, value):
+        """O(1) update of the running regression with one sample"""
+        trend = cls.query.filter_by(metric=metric).with_for_update().first()
+        if not trend:
+            trend = cls(
+                metric=metric,
+                origin_at=timestamp,
+                origin_value=value,
+                last_at=timestamp,
+                last_value=value,
+                sample_count=0,
+                sum_w=0.0, sum_ww=0.0, sum_x=0.0, sum_y=0.0,
+                sum_xx=0.0, sum_xy=0.0, sum_yy=0.0
+            )
+            db.session.add(trend)
+            weight = 1.0
+        else:
+            gap_hours = (timestamp - trend.last_at).total_seconds() / 3600
+            if gap_hours <= 0:
+                return trend
+            
+            # Decay old evidence by elapsed time, then weight the new sample by the
+            # time it covers so 10-minute samples and hourly rollups count the same
+            half_life_days = current_app.config.get('STATS_TREND_HALF_LIFE_DAYS', 30)
+            decay = 0.5 ** (gap_hours / 24 / half_life_days)
+            trend.sum_w *= decay
+            trend.sum_ww *= decay * decay
+            trend.sum_x *= decay
+            trend.sum_y *= decay
+            trend.sum_xx *= decay
+            trend.sum_xy *= decay
+            trend.sum_yy *= decay
+            weight = min(max(gap_hours, 1 / 60), 24.0)
+        
+        x = (timestamp - trend.origin_at).total_seconds() / 86400
+        y = float(value - trend.origin_value)
+        trend.sum_w += weight
+        trend.sum_ww += weight * weight
+        trend.sum_x += weight * x
+        trend.sum_y += weight * y
+        trend.sum_xx += weight * x * x
+        trend.sum_xy += weight * x * y
+        trend.sum_yy += weight * y * y
+        trend.sample_count += 1
+        trend.last_at = timestamp
+        trend.last_value = value
+        return trend
+    
+    def fit(self):
+        """Return (slope per day, slope standard error) or None if underdetermined"""
+        if self.sample_count < 3 or self.sum_w <= 0:
+            return None
+        
+        mean_x = self.sum_x / self.sum_w
+        mean_y = self.sum_y / self.sum_w
+        sxx = self.sum_xx - self.sum_w * mean_x * mean_x
+        sxy = self.sum_xy - self.sum_w * mean_x * mean_y
+        syy = self.sum_yy - self.sum_w * mean_y * mean_y
+        if sxx <= 1e-12:
+            return None
+        
+        slope = sxy / sxx
+        effective_n = self.sum_w * self.sum_w / self.sum_ww
+        residual = max(syy - slope * sxy, 0.0)
+        variance = residual / max(effective_n - 2, 1.0)
+        return slope, (variance / sxx) ** 0.5
+    
+    def forecast(self, milestone):
+        """ETA for reaching a milestone with a 95% band on the growth rate"""
+        remaining = milestone - self.last_value
+        result = {
+            'metric': self.metric,
+            'milestone': milestone,
+            'current': self.last_value,
+            'remaining': max(0, remaining),
+            'reached': remaining <= 0,
+            'growth_per_day': None,
+            'eta': None,
+            'eta_earliest': None,
+            'eta_latest': None,
+            'days_to_goal': None,
+            'confidence': 0.95,
+            'based_on_samples': self.sample_count,
+            'as_of': self.last_at.isoformat()
+        }
+        if remaining <= 0:
+            return result
+        
+        fitted = self.fit()
+        if not fitted:
+            return result
+        
+        slope, stderr = fitted
+        result['growth_per_day'] = round(slope, 2)
+        fast = slope + self.Z_95 * stderr
+        slow = slope - self.Z_95 * stderr
+        
+        def eta(rate):
+            if rate <= 0:
+                return None, None
+            days = remaining / rate
+            # Anything past a century is effectively "never" for a chart label
+            if days > 36500:
+                return None, None
+            return days, (self.last_at + timedelta(days=days)).isoformat()
+        
+        result['days_to_goal'], result['eta'] = eta(slope)
+        result['eta_earliest'] = eta(fast)[1]
+        result['eta_latest'] = eta(slow)[1]
+        if result['days_to_goal'] is not None:
+            result['days_to_goal'] = round(result['days_to_goal'], 1)
+        return result
+    
+    @classmethod
+    def get_forecasts(cls, milestones, metric='subscriber_count'):
+        """Forecast several milestones from the stored state of one metric"""
+        trend = cls.query.filter_by(metric=metric).first()
+        if not trend:
+            return []
+        return [trend.forecast(milestone) for milestone in milestones]
+    
+    @classmethod
+    def rebuild(cls):
+        """Replay rollups into fresh trend state (daily buckets, then hourly)"""
+        cls.query.delete(synchronize_session=False)
+        db.session.flush()
+        
+        first_hour = YouTubeStatsRollup.query.filter_by(resolution='hour').order_by(
+            YouTubeStatsRollup.bucket_start.asc()
+        ).first()
+        
+        daily = YouTubeStatsRollup.query.filter_by(resolution='day')
+        if first_hour:
+            daily = daily.filter(YouTubeStatsRollup.bucket_start < YouTubeStatsRollup.bucket_for(first_hour.bucket_start, 'day'))
+            hourly = YouTubeStatsRollup.query.filter_by(resolution='hour').order_by(YouTubeStatsRollup.bucket_start.asc())
+        else:
+            hourly = []
+        
+        replayed = 0
+        for rollup in list(daily.order_by(YouTubeStatsRollup.bucket_start.asc())) + list(hourly):
+            for metric, column in cls.TRACKED_METRICS.items():
+                cls.observe(metric, rollup.last_sample_at, getattr(rollup, column))
+            replayed += 1
+        
+        db.session.commit()
+        return replayed
+
+class YouTubeQuotaUsage(db.Model):
+    """YouTube Data API units spent per quota day and endpoint"""
+    __tablename__ = 'youtube_quota_usage'
+    
+    day = db.Column(db.Date, primary_key=True)  # Quota day, which resets at midnight Pacific time
+    endpoint = db.Column(db.String(50), primary_key=True)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @classmethod
+    def add(cls, day, endpoint, units):
+        """Atomically add spent units in a transaction of its own, leaving the session untouched"""
+        table = cls.__table__
+        values = {'day': day, 'endpoint': endpoint, 'units': units, 'calls': 1, 'updated_at': datetime.utcnow()}
+        
+        insert = dialect_insert(table)
+        with db.engine.begin() as conn:
+            if insert is not None:
+                stmt = insert.values(values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.day, table.c.endpoint],
+                    set_={
+                        'units': table.c.units + stmt.excluded.units,
+                        'calls': table.c.calls + 1,
+                        'updated_at': stmt.excluded.updated_at
+                    }
+                )
+                conn.execute(stmt)
+                return
+            
+            updated = conn.execute(
+                table.update()
+                .where(table.c.day == day, table.c.endpoint == endpoint)
+                .values(units=table.c.units + units, calls=table.c.calls + 1, updated_at=values['updated_at'])
+            ).rowcount
+            if not updated:
+                conn.execute(table.insert().values(values))
+    
+    @classmethod
+    def used_on(cls, day):
+        """Units spent on a quota day, per endpoint"""
+        table = cls.__table__
+        with db.engine.connect() as conn:
+            rows = conn.execute(select(table.c.endpoint, table.c.units).where(table.c.day == day)).all()
+        return {endpoint: units for endpoint, units in rows}
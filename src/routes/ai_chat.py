@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
 from ..services.ai_chat_service import AIChatService
+from ..services.jobs import enqueue
+from .jobs import job_accepted
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,16 +38,12 @@ def ask_question():
 
 @ai_chat_bp.route('/index', methods=['POST'])
 def index_content():
-    """Index content for vector search"""
+    """Queue a job indexing content for vector search (202 with the job's status URL)"""
     try:
-        data = request.get_json() or {}
-        force_reindex = data.get('force_reindex', False)
+        data = request.get_json(silent=True) or {}
+        force_reindex = bool(data.get('force_reindex', False))
         
-        # Index content
-        service = AIChatService()
-        result = service.index_content(force_reindex)
-        
-        return jsonify(result)
+        return job_accepted(enqueue('index_content', {'force_reindex': force_reindex}))
         
     except Exception as e:
         logger.error(f"Error indexing content: {str(e)}")
@@ -0,0 +1,28 @@
+from flask import Blueprint, jsonify, request
+from ..services import sql_profiler
+
+debug_bp = Blueprint('debug', __name__)
+
+@debug_bp.route('/requests', methods=['GET'])
+def recent_requests():
+    """SQL profiles of the most recent requests served by this worker"""
+    if sql_profiler.profiler is None:
+        return jsonify({'error': 'SQL profiler is disabled (set SQL_PROFILER_ENABLED=true)'}), 404
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        only_flagged = request.args.get('flagged', 'false').lower() == 'true'
+        
+        profiles = sql_profiler.profiler.recent_requests(limit if not only_flagged else None)
+        if only_flagged:
+            profiles = [p for p in profiles if p['n_plus_one'] or p['slow']][:limit]
+        
+        return jsonify({
+            'success': True,
+            'count': len(profiles),
+            'n_plus_one_threshold': sql_profiler.profiler.threshold,
+            'slow_ms': sql_profiler.profiler.slow_ms,
+            'requests': profiles
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
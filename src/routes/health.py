@@ -1,13 +1,23 @@
 from flask import Blueprint, jsonify
-from ..models.video import db, Video
-from ..models.youtube_stats import YouTubeStats
-from ..services.youtube_service import YouTubeService
+from ..services.overview_service import OverviewMaterializer
+from ..services import health_prober
+from ..services.youtube_quota import youtube_quota
 from datetime import datetime
 import os
 import sys
 
 health_bp = Blueprint('health', __name__)
 
+# Status strings reported by the legacy /health endpoint
+LEGACY_STATUS = {
+    'database': {'up': 'connected', 'down': 'disconnected'},
+    'youtube_api': {'up': 'active', 'down': 'error', 'not_configured': 'no_api_key'},
+    'redis': {'up': 'connected', 'down': 'disconnected', 'not_configured': 'not_configured'}
+}
+
+def _prober():
+    return health_prober.prober
+
 @health_bp.route('/', methods=['GET'])
 def health_check():
     """Comprehensive health check endpoint"""
@@ -19,47 +29,16 @@ def health_check():
         'message': '🔥 GREGVERSE Backend is LIVE!'
     }
     
-    # Check database connection
-    try:
-        db.session.execute('SELECT 1')
-        health_status['database'] = 'connected'
-    except Exception as e:
-        health_status['database'] = 'disconnected'
-        health_status['database_error'] = str(e)
-        health_status['status'] = 'degraded'
-    
-    # Check YouTube API
-    try:
-        youtube_service = YouTubeService()
-        if youtube_service.api_key:
-            # Quick API test
-            stats = youtube_service.get_channel_stats()
-            if stats.get('is_live', False):
-                health_status['youtube_api'] = 'active'
-            else:
-                health_status['youtube_api'] = 'degraded'
-                health_status['youtube_note'] = 'Using cached data'
-        else:
-            health_status['youtube_api'] = 'no_api_key'
-            health_status['youtube_note'] = 'API key not configured'
-    except Exception as e:
-        health_status['youtube_api'] = 'error'
-        health_status['youtube_error'] = str(e)
-        health_status['status'] = 'degraded'
-    
-    # Check Redis (if configured)
-    redis_url = os.getenv('REDIS_URL')
-    if redis_url:
-        try:
-            import redis
-            r = redis.from_url(redis_url)
-            r.ping()
-            health_status['redis'] = 'connected'
-        except Exception as e:
-            health_status['redis'] = 'disconnected'
-            health_status['redis_error'] = str(e)
-    else:
-        health_status['redis'] = 'not_configured'
+    # Answered from the dependency-status table, never by probing inline
+    prober = _prober()
+    checks = prober.snapshot() if prober else {}
+    for name, statuses in LEGACY_STATUS.items():
+        check = checks.get(name, {'status': 'unknown'})
+        health_status[name] = statuses.get(check['status'], check['status'])
+        if check.get('error'):
+            health_status[f'{name.split("_")[0]}_error'] = check['error']
+        if check['status'] == 'down' and name != 'redis':
+            health_status['status'] = 'degraded'
     
     # Overall status determination
     if health_status['database'] == 'disconnected':
@@ -72,10 +51,45 @@ def health_check():
     
     return jsonify(health_status), status_code
 
+@health_bp.route('/live', methods=['GET'])
+def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    prober = _prober()
+    return jsonify({
+        'status': 'alive',
+        'timestamp': datetime.utcnow().isoformat(),
+        'prober_heartbeat': prober.heartbeat.isoformat() if prober and prober.heartbeat else None
+    }), 200
+
+@health_bp.route('/ready', methods=['GET'])
+def readiness():
+    """Readiness probe: critical dependencies were seen up recently"""
+    prober = _prober()
+    if not prober:
+        return jsonify({'ready': False, 'blocking': ['prober'], 'timestamp': datetime.utcnow().isoformat()}), 503
+    
+    result = prober.readiness()
+    result['timestamp'] = datetime.utcnow().isoformat()
+    return jsonify(result), 200 if result['ready'] else 503
+
+@health_bp.route('/dependencies', methods=['GET'])
+def dependency_status():
+    """Dependency-status table with recent probe latency history and today's YouTube quota spend"""
+    prober = _prober()
+    return jsonify({
+        'dependencies': prober.snapshot(include_history=True) if prober else {},
+        'youtube_quota': youtube_quota.status(),
+        'prober_started_at': prober.started_at.isoformat() if prober and prober.started_at else None,
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
 @health_bp.route('/detailed', methods=['GET'])
 def detailed_health():
     """Detailed health check with system information"""
     try:
+        overview = OverviewMaterializer.get_payload()
+        content = overview.get('content', {})
+        
         detailed_info = {
             'timestamp': datetime.utcnow().isoformat(),
             'system': {
@@ -84,10 +98,12 @@ def detailed_health():
                 'debug_mode': os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
             },
             'database': {
-                'total_videos': Video.query.count(),
-                'categories': len(Video.get_categories()),
+                'total_videos': content.get('total_videos', 0),
+                'categories': content.get('categories_count', 0),
                 'latest_video': None,
-                'latest_stats_update': None
+                'latest_stats_update': None,
+                'total_episodes': overview.get('podcast', {}).get('total_episodes', 0),
+                'snapshot_updated_at': overview.get('last_updated')
             },
             'api_status': {
                 'search_endpoint': 'active',
@@ -97,17 +113,14 @@ def detailed_health():
         }
         
         # Get latest video info
-        latest_video = Video.query.order_by(Video.published_at.desc()).first()
-        if latest_video:
-            detailed_info['database']['latest_video'] = {
-                'title': latest_video.title,
-                'published_at': latest_video.published_at.isoformat() if latest_video.published_at else None
-            }
+        latest_video = content.get('latest_video') or {}
+        if latest_video.get('title'):
+            detailed_info['database']['latest_video'] = latest_video
         
         # Get latest stats update
-        latest_stats = YouTubeStats.get_latest()
-        if latest_stats:
-            detailed_info['database']['latest_stats_update'] = latest_stats.updated_at.isoformat()
+        youtube_stats = overview.get('youtube', {})
+        if not youtube_stats.get('is_fallback'):
+            detailed_info['database']['latest_stats_update'] = youtube_stats.get('updated_at')
         
         return jsonify(detailed_info)
         
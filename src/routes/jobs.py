@@ -0,0 +1,54 @@
+from flask import Blueprint, jsonify, request
+from ..models.job import Job
+from ..models.video import db
+from ..services import jobs
+import logging
+
+logger = logging.getLogger(__name__)
+jobs_bp = Blueprint('jobs', __name__)
+
+def job_accepted(job):
+    """202 response for an enqueued job, pointing at its status URL"""
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/jobs/{job.id}',
+        'job': job.to_dict()
+    }), 202
+
+@jobs_bp.route('', methods=['GET'])
+def list_jobs():
+    """Most recent jobs, optionally of one kind"""
+    try:
+        kind = request.args.get('kind') or None
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        return jsonify({'jobs': [job.to_dict() for job in Job.recent(kind, limit)]})
+    
+    except Exception as e:
+        logger.error(f"Error listing jobs: {str(e)}")
+        return jsonify({'error': 'Failed to list jobs'}), 500
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status, progress and result of one job"""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@jobs_bp.route('/<int:job_id>/retry', methods=['POST'])
+def retry_job(job_id):
+    """Re-queue a failed job; it resumes from its last checkpoint"""
+    try:
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        if job.status != 'failed':
+            return jsonify({'error': f'Only failed jobs can be retried (job is {job.status})'}), 409
+        
+        return job_accepted(jobs.retry(job))
+    
+    except Exception as e:
+        logger.error(f"Error retrying job {job_id}: {str(e)}")
+        return jsonify({'error': 'Failed to retry job'}), 500
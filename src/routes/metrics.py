@@ -0,0 +1,10 @@
+from flask import Blueprint, Response
+from ..services.metrics import render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint"""
+    payload, content_type = render_metrics()
+    return Response(payload, mimetype=content_type)
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from flask_socketio import emit
-from ..models.podcast import PodcastEpisode, StartupIdea, Tweet
+from ..models.podcast import PodcastEpisode, PodcastFeed, StartupIdea, Tweet, db
 from ..services.podcast_service import PodcastService
+from ..services.jobs import enqueue
+from .jobs import job_accepted
 import logging
 
 logger = logging.getLogger(__name__)
@@ -132,23 +133,54 @@ def get_podcast_stats():
 
 @podcast_bp.route('/sync', methods=['POST'])
 def sync_episodes():
-    """Sync episodes from RSS feed"""
+    """Queue an episode sync from the RSS feeds (?full=true re-reads them whole)"""
     try:
-        service = PodcastService()
-        result = service.sync_episodes()
-        
-        # Emit real-time update
-        emit('podcast_sync_complete', result, broadcast=True, namespace='/stats')
+        full_resync = request.args.get('full', 'false').lower() == 'true'
         
-        return jsonify({
-            'message': 'Podcast sync completed successfully',
-            'result': result
-        })
+        # podcast_sync_complete is emitted on /stats when the job finishes
+        return job_accepted(enqueue('sync_podcasts', {'full': full_resync}))
         
     except Exception as e:
         logger.error(f"Error syncing episodes: {str(e)}")
         return jsonify({'error': 'Failed to sync episodes'}), 500
 
+@podcast_bp.route('/feeds', methods=['GET'])
+def get_feeds():
+    """List registered podcast feeds with their last poll outcome"""
+    try:
+        PodcastFeed.get_active()  # registers the default feeds on a fresh database
+        feeds = PodcastFeed.query.order_by(PodcastFeed.priority.asc(), PodcastFeed.id.asc()).all()
+        return jsonify({'feeds': [feed.to_dict() for feed in feeds]})
+    
+    except Exception as e:
+        logger.error(f"Error getting podcast feeds: {str(e)}")
+        return jsonify({'error': 'Failed to fetch podcast feeds'}), 500
+
+@podcast_bp.route('/feeds', methods=['POST'])
+def add_feed():
+    """Register an RSS feed for the next podcast sync"""
+    try:
+        data = request.get_json() or {}
+        name = (data.get('name') or '').strip()
+        url = (data.get('url') or '').strip()
+        
+        if not name or not url.startswith(('http://', 'https://')):
+            return jsonify({'error': 'name and an http(s) url are required'}), 400
+        
+        if PodcastFeed.query.filter((PodcastFeed.name == name) | (PodcastFeed.url == url)).first():
+            return jsonify({'error': 'Feed already registered'}), 409
+        
+        feed = PodcastFeed(name=name, url=url, priority=int(data.get('priority', 100)))
+        db.session.add(feed)
+        db.session.commit()
+        
+        return jsonify(feed.to_dict()), 201
+    
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error adding podcast feed: {str(e)}")
+        return jsonify({'error': 'Failed to add podcast feed'}), 500
+
 # Startup Ideas Routes
 @podcast_bp.route('/startup-ideas', methods=['GET'])
 def get_startup_ideas():
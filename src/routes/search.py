@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
-from ..models.video import Video, db
-from datetime import datetime
+from ..models.video import Video, VideoViewSample, db
+from ..services.trending import trending_videos
+from datetime import datetime, timedelta
 import time
 
 search_bp = Blueprint('search', __name__)
@@ -12,6 +13,7 @@ def search_videos():
         data = request.get_json() or {}
         query = data.get('query', '').strip()
         category = data.get('category', 'all')
+        sort = data.get('sort', 'relevance')  # relevance or popular
         page = int(data.get('page', 1))
         per_page = int(data.get('per_page', 20))
         
@@ -23,7 +25,8 @@ def search_videos():
             query=query,
             category=category if category != 'all' else None,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            sort=sort
         )
         
         # Calculate search time
@@ -46,6 +49,7 @@ def search_videos():
             'meta': {
                 'query': query,
                 'category': category,
+                'sort': sort,
                 'search_time_ms': search_time,
                 'results_count': len(results)
             }
@@ -119,33 +123,66 @@ def get_categories():
             'categories': []
         }), 500
 
+# Shown until view refreshes have produced trending scores
+FALLBACK_TRENDING = [
+    'AI tools',
+    'startup ideas',
+    'no-code business',
+    'ChatGPT',
+    'entrepreneur tips',
+    'business automation',
+    'SaaS ideas',
+    'marketing strategies'
+]
+
 @search_bp.route('/trending', methods=['GET'])
 def get_trending_searches():
-    """Get trending search queries (placeholder for future analytics)"""
+    """Videos gaining views fastest (decayed views/hour), read straight off the trending index"""
     try:
-        # For now, return popular categories as trending
-        trending = [
-            'AI tools',
-            'startup ideas',
-            'no-code business',
-            'ChatGPT',
-            'entrepreneur tips',
-            'business automation',
-            'SaaS ideas',
-            'marketing strategies'
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+        now = datetime.utcnow()
+        videos = [
+            dict(video.to_dict(), views_per_hour=round(score, 2))
+            for video, score in trending_videos(limit, now)
         ]
         
         return jsonify({
-            'trending': trending,
-            'updated_at': datetime.utcnow().isoformat()
+            'trending': [video['title'] for video in videos] or FALLBACK_TRENDING,
+            'videos': videos,
+            'updated_at': now.isoformat()
         })
         
     except Exception as e:
         return jsonify({
             'trending': [],
+            'videos': [],
             'error': 'Trending data unavailable'
         })
 
+@search_bp.route('/videos/<youtube_id>/views', methods=['GET'])
+def get_view_history(youtube_id):
+    """A video's view counts over the last ?days=N (default 30) as [timestamp, views] pairs"""
+    try:
+        video = Video.query.filter_by(youtube_id=youtube_id).first()
+        if video is None:
+            return jsonify({'error': 'Video not found'}), 404
+        
+        days = min(max(int(request.args.get('days', 30)), 1), 365)
+        series = VideoViewSample.series(video.id, datetime.utcnow() - timedelta(days=days))
+        
+        return jsonify({
+            'youtube_id': youtube_id,
+            'view_count': video.view_count,
+            'view_velocity': video.view_velocity,
+            'points': [[sampled_at.isoformat(), view_count] for sampled_at, view_count in series]
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'error': True,
+            'message': 'View history unavailable'
+        }), 500
+
 @search_bp.route('/stats', methods=['GET'])
 def search_stats():
     """Get search statistics"""
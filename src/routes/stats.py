@@ -1,9 +1,12 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, make_response, current_app
 from flask_socketio import SocketIO, emit
 from ..services.youtube_service import YouTubeService
-from ..models.youtube_stats import YouTubeStats
+from ..services.overview_service import OverviewMaterializer
+from ..services.metrics import record_cache, record_emit, websocket_connected, websocket_disconnected
+from ..services.stats_history_service import StatsHistoryService, METRIC_COLUMNS, parse_timestamp
+from ..models.youtube_stats import YouTubeStats, StatsTrend
 from ..models.video import Video, db
-from datetime import datetime
+from datetime import datetime, timedelta
 import threading
 import time
 
@@ -47,43 +50,106 @@ def get_youtube_stats():
 def get_overview_stats():
     """Get comprehensive overview statistics"""
     try:
-        # YouTube stats
-        youtube_service = YouTubeService()
-        youtube_stats = youtube_service.get_channel_stats()
+        # Served from the snapshot rebuilt after every sync and stats refresh
+        return current_app.response_class(
+            OverviewMaterializer.get_response_body(),
+            mimetype='application/json'
+        )
         
-        # Database stats
-        total_videos = Video.query.count()
-        categories = Video.get_categories()
-        latest_video = Video.query.order_by(Video.published_at.desc()).first()
+    except Exception as e:
+        print(f"Overview stats error: {e}")
+        return jsonify({
+            'error': True,
+            'message': 'Overview stats temporarily unavailable'
+        }), 500
+
+@stats_bp.route('/history', methods=['GET'])
+def get_stats_history():
+    """Get a downsampled stats time series for charts"""
+    try:
+        metric = request.args.get('metric', 'subscriber_count')
+        points = int(request.args.get('points', 500))
+        if points < 1:
+            raise ValueError('points must be positive')
+        points = min(points, 5000)
+        # Open-ended ranges are pinned to the minute so repeat requests share an ETag
+        end = parse_timestamp(request.args.get('to')) or \
+            datetime.utcnow().replace(second=0, microsecond=0) + timedelta(minutes=1)
+        start = parse_timestamp(request.args.get('from')) or end - timedelta(days=30)
+    except (ValueError, OverflowError):
+        return jsonify({
+            'error': True,
+            'message': 'Invalid from, to or points parameter'
+        }), 400
+    
+    if metric not in METRIC_COLUMNS:
+        return jsonify({
+            'error': True,
+            'message': f'Unknown metric, expected one of: {", ".join(METRIC_COLUMNS)}'
+        }), 400
+    
+    if start >= end:
+        return jsonify({
+            'error': True,
+            'message': '"from" must be earlier than "to"'
+        }), 400
+    
+    try:
+        history_service = StatsHistoryService()
         
-        overview = {
-            'youtube': youtube_stats,
-            'content': {
-                'total_videos': total_videos,
-                'categories_count': len(categories),
-                'latest_video': {
-                    'title': latest_video.title if latest_video else None,
-                    'published_at': latest_video.published_at.isoformat() if latest_video and latest_video.published_at else None
-                }
-            },
-            'milestones': {
-                'subscriber_goal': 1000000,
-                'progress_percentage': youtube_stats.get('progress_to_million', 0),
-                'subscribers_to_goal': max(0, 1000000 - youtube_stats.get('subscriber_count', 0))
-            },
-            'last_updated': datetime.utcnow().isoformat()
-        }
+        # The ETag only depends on the request and the newest sample, so a
+        # revalidation is answered before any history is read
+        etag = history_service.etag_for(metric, start, end, points)
+        record_cache('stats_history_etag', etag in request.if_none_match)
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+        else:
+            response = jsonify({
+                'success': True,
+                'data': history_service.get_history(metric, start, end, points)
+            })
+        
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = 60
+        return response
+    
+    except Exception as e:
+        print(f"Stats history error: {e}")
+        return jsonify({
+            'error': True,
+            'message': 'Stats history temporarily unavailable'
+        }), 500
+
+@stats_bp.route('/forecast', methods=['GET'])
+def get_milestone_forecast():
+    """Get ETAs with confidence bands for subscriber milestones"""
+    try:
+        milestones = [int(m) for m in request.args.getlist('milestone')] or [1000000]
+    except (ValueError, OverflowError):
+        return jsonify({
+            'error': True,
+            'message': 'Milestones must be integers'
+        }), 400
+    
+    try:
+        forecasts = StatsTrend.get_forecasts(milestones[:20])
         
         return jsonify({
             'success': True,
-            'data': overview
+            'data': {
+                'forecasts': forecasts,
+                'model': 'exponentially weighted least squares',
+                'half_life_days': current_app.config.get('STATS_TREND_HALF_LIFE_DAYS', 30)
+            },
+            'timestamp': datetime.utcnow().isoformat()
         })
-        
+    
     except Exception as e:
-        print(f"Overview stats error: {e}")
+        print(f"Forecast error: {e}")
         return jsonify({
             'error': True,
-            'message': 'Overview stats temporarily unavailable'
+            'message': 'Forecast temporarily unavailable'
         }), 500
 
 # WebSocket Events
@@ -93,6 +159,7 @@ def setup_websocket_events(socketio):
     @socketio.on('connect')
     def handle_connect():
         active_connections.add(request.sid)
+        websocket_connected()
         print(f'Client connected: {request.sid}')
         
         # Send current stats immediately
@@ -104,12 +171,15 @@ def setup_websocket_events(socketio):
                 'data': current_stats,
                 'timestamp': datetime.utcnow().isoformat()
             })
+            record_emit('stats_update')
         except Exception as e:
             print(f"Error sending initial stats: {e}")
     
     @socketio.on('disconnect')
     def handle_disconnect():
-        active_connections.discard(request.sid)
+        if request.sid in active_connections:
+            active_connections.discard(request.sid)
+            websocket_disconnected()
         print(f'Client disconnected: {request.sid}')
     
     @socketio.on('request_stats_update')
@@ -124,11 +194,13 @@ def setup_websocket_events(socketio):
                 'timestamp': datetime.utcnow().isoformat(),
                 'requested': True
             })
+            record_emit('stats_update')
         except Exception as e:
             emit('stats_error', {
                 'error': 'Failed to fetch latest stats',
                 'timestamp': datetime.utcnow().isoformat()
             })
+            record_emit('stats_error')
 
 def broadcast_stats_update():
     """Broadcast stats update to all connected clients"""
@@ -145,6 +217,7 @@ def broadcast_stats_update():
             'timestamp': datetime.utcnow().isoformat(),
             'broadcast': True
         }, broadcast=True)
+        record_emit('stats_update', len(active_connections))
         
         print(f"Broadcasted stats update to {len(active_connections)} clients")
         
@@ -155,6 +228,7 @@ def broadcast_stats_update():
             'error': 'Stats update failed',
             'timestamp': datetime.utcnow().isoformat()
         }, broadcast=True)
+        record_emit('stats_error', len(active_connections))
 
 def start_background_stats_updater():
     """Start background thread for periodic stats updates"""
@@ -15,15 +15,24 @@ from langchain.schema import Document
 from langchain.prompts import PromptTemplate
 
 # Pinecone imports
+import openai
 import pinecone
+from pinecone.core.client.configuration import Configuration as PineconeApiConfiguration
 
 # Local imports
 from ..models.video import Video
 from ..models.podcast import PodcastEpisode, StartupIdea, Tweet
 from ..config import Config
+from .metrics import track_external
+from .single_flight import single_flight
+from .http_session import build_session
 
 logger = logging.getLogger(__name__)
 
+# OpenAI calls share one pooled session, which HTTP_REPLAY_MODE can record and replay;
+# OPENAI_API_BASE (read by openai itself) points them at scripts/replay_server.py
+openai.requestssession = build_session('Gregverse/1.0', retries=2)
+
 class AIChatService:
     def __init__(self):
         self.config = Config()
@@ -45,17 +54,25 @@ class AIChatService:
                 openai_api_key=os.getenv('OPENAI_API_KEY')
             )
             
-            # Initialize Pinecone
+            # Initialize Pinecone; PINECONE_CONTROLLER_HOST (read by pinecone itself) and
+            # PINECONE_INDEX_HOST point it at scripts/replay_server.py
+            pinecone_config = None
+            if os.getenv('PINECONE_INDEX_HOST'):
+                pinecone_config = PineconeApiConfiguration.get_default_copy()
+                pinecone_config.host = os.getenv('PINECONE_INDEX_HOST')
             pinecone.init(
                 api_key=os.getenv('PINECONE_API_KEY'),
-                environment=os.getenv('PINECONE_ENVIRONMENT', 'us-west1-gcp-free')
+                environment=os.getenv('PINECONE_ENVIRONMENT', 'us-west1-gcp-free'),
+                openapi_config=pinecone_config
             )
             
             # Connect to Pinecone index
             index_name = os.getenv('PINECONE_INDEX_NAME', 'gregverse')
             
             # Create index if it doesn't exist
-            if index_name not in pinecone.list_indexes():
+            with track_external('pinecone', 'list_indexes'):
+                existing_indexes = pinecone.list_indexes()
+            if index_name not in existing_indexes:
                 pinecone.create_index(
                     name=index_name,
                     dimension=1536,  # OpenAI embedding dimension
@@ -121,7 +138,8 @@ Answer with source citations:"""
                 }
             
             # Get answer from QA chain
-            result = self.qa_chain({"query": question})
+            with track_external('openai', 'retrieval_qa'):
+                result = self.qa_chain({"query": question})
             
             # Process source documents
             sources = self._process_sources(result.get('source_documents', []))
@@ -198,7 +216,12 @@ Answer with source citations:"""
             logger.error(f"Error logging interaction: {str(e)}")
     
     def index_content(self, force_reindex: bool = False) -> Dict:
-        """Index all content for vector search"""
+        """Index all content for vector search; concurrent calls share one run"""
+        # Two overlapping runs would upsert every document to Pinecone twice
+        return single_flight('index_content', lambda: self._index_content(force_reindex), {'force_reindex': force_reindex})
+    
+    def _index_content(self, force_reindex: bool) -> Dict:
+        """Build documents from every content table and add them to the vector store"""
         try:
             if not force_reindex and self._is_index_current():
                 return {
@@ -234,7 +257,8 @@ Answer with source citations:"""
             
             # Add documents to vector store
             if documents:
-                self.vectorstore.add_documents(documents)
+                with track_external('pinecone', 'upsert'):
+                    self.vectorstore.add_documents(documents)
                 self._update_index_timestamp()
             
             logger.info(f"Successfully indexed {len(documents)} documents")
@@ -361,7 +385,8 @@ Answer with source citations:"""
             # Get index stats
             index_name = os.getenv('PINECONE_INDEX_NAME', 'gregverse')
             index = pinecone.Index(index_name)
-            stats = index.describe_index_stats()
+            with track_external('pinecone', 'describe_index_stats'):
+                stats = index.describe_index_stats()
             
             return {
                 'total_vectors': stats.get('total_vector_count', 0),
@@ -0,0 +1,124 @@
+import time
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+from .feed_fetcher import FeedFetcher, FeedStream, feed_fetcher
+from .rss_stream import entry_guid, iter_items
+
+logger = logging.getLogger(__name__)
+
+class FeedPoll:
+    """Episodes read from one feed during a poll, before anything touches the database"""
+    
+    def __init__(self, feed_id: int, name: str, url: str):
+        self.feed_id = feed_id
+        self.name = name
+        self.url = url
+        self.status = 'pending'
+        self.error = None
+        self.episodes: List[Dict] = []
+        self.skipped = 0
+        self.stopped_early = False
+        self.duration = 0.0
+        self.stream: Optional[FeedStream] = None
+    
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 'not_modified'
+
+class FeedAggregator:
+    """Polls every feed in parallel, with a connection cap per host and a deadline per feed"""
+    
+    def __init__(self, build_episode: Callable, fetcher: FeedFetcher = feed_fetcher,
+                 concurrency: int = 4, per_host: int = 2, timeout: float = 15):
+        self.build_episode = build_episode
+        self.fetcher = fetcher
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+        self._slots_lock = threading.Lock()
+    
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        with self._slots_lock:
+            return self._host_slots[urlparse(url).netloc]
+    
+    def poll(self, feeds: List[Dict], known_guids: Dict[int, Set[str]], full_resync: bool = False) -> List[FeedPoll]:
+        """Fetch and parse all feeds concurrently; results keep the order of `feeds`"""
+        if not feeds:
+            return []
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.concurrency, len(feeds)), thread_name_prefix='feed-poll')
+        futures = [
+            executor.submit(self._poll_one, feed, known_guids.get(feed['id'], set()), full_resync)
+            for feed in feeds
+        ]
+        # A hung feed must not hold up the others; its thread is abandoned, not joined,
+        # and whatever it still produces is never looked at
+        done, _ = wait(futures, timeout=self.timeout * 2)
+        executor.shutdown(wait=False)
+        
+        polls = []
+        for feed, future in zip(feeds, futures):
+            if future in done:
+                polls.append(future.result())
+                continue
+            poll = FeedPoll(feed['id'], feed['name'], feed['url'])
+            poll.status = 'error'
+            poll.error = f'Timed out after {self.timeout * 2:.0f}s'
+            poll.duration = self.timeout * 2
+            logger.warning(f"Feed {poll.name} timed out")
+            polls.append(poll)
+        return polls
+    
+    def _poll_one(self, feed: Dict, known_guids: Set[str], full_resync: bool) -> FeedPoll:
+        poll = FeedPoll(feed['id'], feed['name'], feed['url'])
+        started = time.monotonic()
+        try:
+            with self._slot(poll.url):
+                with self.fetcher.stream(poll.url, poll.name, conditional=not full_resync,
+                                         timeout=self.timeout) as body:
+                    poll.stream = body
+                    if body.not_modified:
+                        poll.status = 'not_modified'
+                        return poll
+                    self._read_new_entries(poll, body, known_guids)
+            poll.status = 'ok'
+        except Exception as e:
+            poll.status = 'error'
+            poll.error = str(e)[:500]
+            poll.episodes = []
+            poll.stream = None
+            logger.error(f"Error polling feed {poll.name}: {poll.error}")
+        finally:
+            poll.duration = time.monotonic() - started
+        return poll
+    
+    def _read_new_entries(self, poll: FeedPoll, body: FeedStream, known_guids: Set[str]):
+        """Build episodes until the first stored GUID.
+        
+        Stopping there assumes the feed lists newest episodes first, so a feed
+        seen out of date order is read to the end instead.
+        """
+        newest_first = True
+        previous = None
+        for entry in iter_items(body):
+            published = entry.get('published_parsed')
+            if published and previous and published > previous:
+                newest_first = False
+            previous = published or previous
+            
+            if newest_first and entry_guid(entry) in known_guids:
+                poll.stopped_early = True
+                return
+            
+            episode = self.build_episode(entry)
+            if not episode or not episode.get('published_at'):
+                poll.skipped += 1
+                continue
+            episode['feed_id'] = poll.feed_id
+            poll.episodes.append(episode)
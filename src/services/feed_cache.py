@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from .feed_fetcher import feed_fetcher
+
+logger = logging.getLogger(__name__)
+
+# Default of the FLIGHTCAST_RSS_URL setting
+FLIGHTCAST_RSS_URL = 'https://rss.flightcast.com/ordbkg8yojpehffas7vr7qpc.xml'
+FLIGHTCAST_IMAGE = 'https://assets.flightcast.com/static/t8c97hs8oy7a2xnobsfu5p42.jpg'
+
+class FeedCache:
+    """Background-polled snapshot of a feed, so routes never fetch it on the request path"""
+    
+    def __init__(self, url: str, name: str, interval: float = 300, stale_after: float = 900,
+                 episode_limit: int = 6, max_backoff: float = 3600, redis_url: Optional[str] = None):
+        self.url = url
+        self.name = name
+        self.interval = interval
+        self.stale_after = stale_after
+        self.episode_limit = episode_limit
+        self.max_backoff = max_backoff
+        self.redis_url = redis_url
+        self.redis_key = f'gregverse:feed:{name}'
+        self.last_error = None
+        self.last_attempt_at = None
+        self.consecutive_failures = 0
+        self._snapshot = None
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start the poller thread once per process"""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name=f'feed-cache-{self.name}', daemon=True)
+            self._thread.start()
+        logger.info(f"Feed cache poller started for {self.name}")
+    
+    def _run(self):
+        # A snapshot another worker stored lets this one serve before its first poll
+        if self._snapshot is None:
+            self._snapshot = self._load_shared()
+        
+        while True:
+            delay = self.interval
+            if not self.refresh():
+                delay = min(self.interval * (2 ** self.consecutive_failures), self.max_backoff)
+            time.sleep(delay)
+    
+    def refresh(self) -> bool:
+        """Poll the feed once; on failure the previous snapshot keeps being served"""
+        self.last_attempt_at = datetime.utcnow()
+        try:
+            result = feed_fetcher.fetch(self.url, self.name)
+        except Exception as e:
+            self.consecutive_failures += 1
+            self.last_error = str(e)[:300]
+            logger.warning(f"Feed cache {self.name} refresh failed: {self.last_error}")
+            return False
+        
+        self.consecutive_failures = 0
+        self.last_error = None
+        
+        if result.not_modified and self._snapshot is not None:
+            snapshot = dict(self._snapshot, fetched_at=result.fetched_at.isoformat())
+        else:
+            snapshot = self._build_snapshot(result)
+        
+        self._snapshot = snapshot
+        self._store_shared(snapshot)
+        return True
+    
+    def _build_snapshot(self, result) -> Dict:
+        entries = result.entries
+        return {
+            'episodes': [self._episode_summary(entry) for entry in entries[:self.episode_limit]],
+            'total': len(entries),
+            'latest_episode': entries[0].get('title', 'Unknown') if entries else 'Unknown',
+            'fetched_at': result.fetched_at.isoformat()
+        }
+    
+    @staticmethod
+    def _episode_summary(entry) -> Dict:
+        summary = entry.get('summary', '')
+        return {
+            'title': entry.get('title', ''),
+            'description': summary[:200] + '...' if len(summary) > 200 else summary,
+            'date': entry.get('published'),
+            'duration': entry.get('itunes_duration', '32:07'),
+            'image': FLIGHTCAST_IMAGE,
+            'link': entry.get('link', '#'),
+            'tags': ['AI', 'Startup', 'Business']
+        }
+    
+    def _redis(self):
+        import redis
+        return redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+    
+    def _store_shared(self, snapshot: Dict):
+        if not self.redis_url:
+            return
+        try:
+            self._redis().set(self.redis_key, json.dumps(snapshot), ex=86400)
+        except Exception as e:
+            logger.warning(f"Could not store feed snapshot in Redis: {str(e)}")
+    
+    def _load_shared(self) -> Optional[Dict]:
+        if not self.redis_url:
+            return None
+        try:
+            payload = self._redis().get(self.redis_key)
+            return json.loads(payload) if payload else None
+        except Exception as e:
+            logger.warning(f"Could not load feed snapshot from Redis: {str(e)}")
+            return None
+    
+    def snapshot(self) -> Optional[Dict]:
+        """Current snapshot with staleness metadata, None until the first poll lands"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        
+        age = (datetime.utcnow() - datetime.fromisoformat(snapshot['fetched_at'])).total_seconds()
+        return dict(
+            snapshot,
+            age_seconds=round(age),
+            stale=age > self.stale_after,
+            last_error=self.last_error
+        )
+
+def init_feed_cache(app, url: Optional[str] = None, name: str = 'flightcast') -> FeedCache:
+    """Create a feed cache (FLIGHTCAST_RSS_URL by default) whose poller starts lazily on the first request"""
+    cache = FeedCache(
+        url or app.config.get('FLIGHTCAST_RSS_URL', FLIGHTCAST_RSS_URL),
+        name,
+        interval=app.config.get('FEED_POLL_INTERVAL', 300),
+        stale_after=app.config.get('FEED_STALE_AFTER', 900),
+        episode_limit=app.config.get('FEED_CACHE_EPISODES', 6),
+        redis_url=os.getenv('REDIS_URL')
+    )
+    
+    # Starting on first request keeps CLI commands from polling the feed
+    @app.before_request
+    def ensure_feed_cache_started():
+        cache.start()
+    
+    return cache
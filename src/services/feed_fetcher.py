@@ -0,0 +1,195 @@
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+import feedparser
+
+from .http_session import build_session
+from .metrics import record_feed_fetch, track_external
+
+logger = logging.getLogger(__name__)
+
+class FeedResult:
+    """Outcome of one fetch: a parsed feed, or not_modified with the last parsed copy"""
+    
+    def __init__(self, url: str, feed, status: int, not_modified: bool,
+                 body_size: int, fetched_at: datetime):
+        self.url = url
+        self.feed = feed
+        self.status = status
+        self.not_modified = not_modified
+        self.body_size = body_size
+        self.fetched_at = fetched_at
+    
+    @property
+    def entries(self):
+        return self.feed.entries if self.feed is not None else []
+
+class FeedFetcher:
+    """Shared RSS fetcher that remembers ETag/Last-Modified per URL and sends conditional GETs"""
+    
+    def __init__(self, timeout: float = 10, user_agent: str = 'Gregverse/1.0 (Podcast Aggregator)'):
+        self.timeout = timeout
+        self.user_agent = user_agent
+        # Sessions are not thread-safe, so each polling thread gets its own
+        self._sessions = threading.local()
+        # url -> {'etag', 'last_modified', 'feed', 'body_size', 'fetched_at'}
+        self._state: Dict[str, Dict] = {}
+        # url -> {'etag', 'last_modified'} for streamed ingestion, which keeps no parsed copy
+        self._stream_validators: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def session(self):
+        session = getattr(self._sessions, 'session', None)
+        if session is None:
+            # No retries: a failed poll is simply retried at the next interval
+            session = self._sessions.session = build_session(self.user_agent, retries=0)
+        return session
+    
+    def fetch(self, url: str, name: str = 'podcast', operation: str = 'fetch') -> FeedResult:
+        """Fetch and parse a feed, or reuse the last parse when the server answers 304"""
+        with self._lock:
+            state = self._state.get(url)
+        
+        # Validators are only sent while a parsed copy is held to answer a 304 with
+        headers = {}
+        if state:
+            if state['etag']:
+                headers['If-None-Match'] = state['etag']
+            if state['last_modified']:
+                headers['If-Modified-Since'] = state['last_modified']
+        
+        try:
+            with track_external('rss', operation):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            
+            if response.status_code == 304 and state:
+                # Nothing changed: no body was sent and nothing is parsed
+                record_feed_fetch(name, 'not_modified', saved=state['body_size'])
+                with self._lock:
+                    state['fetched_at'] = datetime.utcnow()
+                return FeedResult(url, state['feed'], 304, True, state['body_size'], state['fetched_at'])
+            
+            response.raise_for_status()
+            body = response.content
+            feed = feedparser.parse(body, response_headers={
+                'content-type': response.headers.get('Content-Type', 'application/rss+xml'),
+                'content-location': response.url
+            })
+        except Exception:
+            record_feed_fetch(name, 'error')
+            raise
+        
+        if feed.bozo:
+            logger.warning(f"RSS feed {url} has issues: {feed.bozo_exception}")
+        
+        fetched_at = datetime.utcnow()
+        with self._lock:
+            self._state[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'feed': feed,
+                'body_size': len(body),
+                'fetched_at': fetched_at
+            }
+        record_feed_fetch(name, 'modified', downloaded=len(body))
+        return FeedResult(url, feed, response.status_code, False, len(body), fetched_at)
+    
+    @contextmanager
+    def stream(self, url: str, name: str = 'podcast', conditional: bool = True,
+               timeout: Optional[float] = None):
+        """Conditional GET whose body is read incrementally.
+        
+        The response validators are only kept once the caller passes the stream
+        to remember() after committing its episodes, so a failed ingestion is
+        retried in full on the next poll.
+        """
+        with self._lock:
+            validators = self._stream_validators.get(url) if conditional else None
+        
+        headers = {}
+        if validators:
+            if validators['etag']:
+                headers['If-None-Match'] = validators['etag']
+            if validators['last_modified']:
+                headers['If-Modified-Since'] = validators['last_modified']
+        
+        try:
+            with track_external('rss', 'stream'):
+                response = self.session.get(url, headers=headers, timeout=timeout or self.timeout, stream=True)
+                if response.status_code != 304:
+                    response.raise_for_status()
+        except Exception:
+            record_feed_fetch(name, 'error')
+            raise
+        
+        body = FeedStream(response, url)
+        try:
+            yield body
+        except Exception:
+            record_feed_fetch(name, 'error', downloaded=body.wire_bytes)
+            raise
+        finally:
+            response.close()
+        
+        if body.not_modified:
+            record_feed_fetch(name, 'not_modified', saved=validators.get('body_size', 0))
+            return
+        
+        # Bytes never read because ingestion stopped early count as saved too
+        total = int(response.headers.get('Content-Length') or 0)
+        record_feed_fetch(name, 'modified', downloaded=body.wire_bytes,
+                          saved=max(total - body.wire_bytes, 0))
+        body.validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_size': max(total, body.wire_bytes)
+        }
+    
+    def remember(self, body: 'FeedStream'):
+        """Keep a finished stream's validators for the next conditional GET"""
+        if body.validators:
+            with self._lock:
+                self._stream_validators[body.url] = body.validators
+    
+    def forget(self, url: Optional[str] = None):
+        """Drop stored validators so the next fetch downloads the full feed"""
+        with self._lock:
+            if url is None:
+                self._state.clear()
+                self._stream_validators.clear()
+            else:
+                self._state.pop(url, None)
+                self._stream_validators.pop(url, None)
+
+class FeedStream:
+    """File-like view of a streamed response body that counts the bytes read"""
+    
+    def __init__(self, response, url: str):
+        self.url = url
+        self.not_modified = response.status_code == 304
+        self.validators = None
+        self.bytes_read = 0
+        self._raw = response.raw
+        if self._raw is not None:
+            self._raw.decode_content = True
+    
+    def read(self, size: int = -1) -> bytes:
+        if self.not_modified or self._raw is None:
+            return b''
+        chunk = self._raw.read(size if size and size > 0 else None)
+        self.bytes_read += len(chunk)
+        return chunk
+    
+    @property
+    def wire_bytes(self) -> int:
+        """Bytes received from the network, before gzip decoding"""
+        if self._raw is None or not hasattr(self._raw, 'tell'):
+            return self.bytes_read
+        return self._raw.tell()
+
+# One fetcher per process so every caller shares the validators
+feed_fetcher = FeedFetcher()
@@ -0,0 +1,244 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from ..models.video import db
+from .http_session import build_session
+from .metrics import track_external
+from .youtube_service import YOUTUBE_API_BASE_URL
+from .youtube_quota import QuotaExceeded, youtube_quota
+
+logger = logging.getLogger(__name__)
+
+# Probes must answer within their timeout, so they are never retried
+probe_session = build_session('Gregverse/1.0 (health probe; gzip)', retries=0, pool_size=2)
+
+class DependencyCheck:
+    """Status row for one dependency, updated only by its prober thread"""
+    
+    def __init__(self, name: str, probe: Callable[[float], Optional[str]], interval: float,
+                 critical: bool = False, history_size: int = 60):
+        self.name = name
+        self.probe = probe
+        self.interval = interval
+        self.critical = critical
+        self.status = 'unknown'
+        self.detail = None
+        self.error = None
+        self.latency_ms = None
+        self.last_checked = None
+        self.last_ok = None
+        self.consecutive_failures = 0
+        self.next_check_at = 0.0
+        self.history = deque(maxlen=history_size)
+        # Thread of the last probe; a hung one is given up on, not joined
+        self.pending: Optional[threading.Thread] = None
+    
+    def to_dict(self, include_history: bool = False) -> Dict:
+        data = {
+            'status': self.status,
+            'critical': self.critical,
+            'detail': self.detail,
+            'latency_ms': self.latency_ms,
+            'last_checked': self.last_checked.isoformat() if self.last_checked else None,
+            'last_ok': self.last_ok.isoformat() if self.last_ok else None,
+            'consecutive_failures': self.consecutive_failures
+        }
+        if self.error:
+            data['error'] = self.error
+        if include_history:
+            latencies = sorted(sample['latency_ms'] for sample in self.history if sample['ok'])
+            data['latency'] = {
+                'p50_ms': latencies[len(latencies) // 2] if latencies else None,
+                'p95_ms': latencies[int(len(latencies) * 0.95)] if latencies else None,
+                'max_ms': latencies[-1] if latencies else None
+            }
+            data['history'] = list(self.history)
+        return data
+
+class DependencyProber:
+    """Background threads, one per dependency, that keep a dependency-status table fresh.
+    
+    Every probe has a deadline of HEALTH_PROBE_TIMEOUT, so a hung YouTube call
+    marks only youtube_api down and never delays the database check.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.timeout = app.config.get('HEALTH_PROBE_TIMEOUT', 5)
+        self.max_backoff = app.config.get('HEALTH_PROBE_MAX_BACKOFF', 600)
+        self.stale_after = app.config.get('HEALTH_STALE_AFTER', 180)
+        self.started_at = None
+        self.heartbeat = None
+        self._threads = []
+        self._lock = threading.Lock()
+        
+        interval = app.config.get('HEALTH_PROBE_INTERVAL', 30)
+        history_size = app.config.get('HEALTH_HISTORY_SIZE', 60)
+        self.checks = {
+            'database': DependencyCheck('database', self._probe_database, interval, critical=True, history_size=history_size),
+            'youtube_api': DependencyCheck('youtube_api', self._probe_youtube,
+                                           app.config.get('HEALTH_YOUTUBE_PROBE_INTERVAL', 300), history_size=history_size),
+            'redis': DependencyCheck('redis', self._probe_redis, interval, history_size=history_size),
+        }
+    
+    def start(self):
+        """Start the prober threads once per process"""
+        with self._lock:
+            if self._threads and all(thread.is_alive() for thread in self._threads):
+                return
+            self.started_at = datetime.utcnow()
+            self._threads = [
+                threading.Thread(target=self._run, args=(check,), name=f'dependency-prober-{check.name}', daemon=True)
+                for check in self.checks.values()
+            ]
+            for thread in self._threads:
+                thread.start()
+        logger.info("Dependency prober started")
+    
+    def _run(self, check: DependencyCheck):
+        while True:
+            self.heartbeat = datetime.utcnow()
+            if check.next_check_at <= time.monotonic():
+                self._run_check(check)
+            time.sleep(1)
+    
+    def _run_check(self, check: DependencyCheck):
+        started = time.monotonic()
+        try:
+            check.detail = self._probe_with_deadline(check)
+            ok = True
+            check.error = None
+        except Exception as e:
+            ok = False
+            check.error = str(e)[:300]
+        
+        latency_ms = round((time.monotonic() - started) * 1000, 1)
+        check.latency_ms = latency_ms
+        check.last_checked = datetime.utcnow()
+        check.history.append({
+            'at': check.last_checked.isoformat(),
+            'ok': ok,
+            'latency_ms': latency_ms
+        })
+        
+        if ok:
+            check.status = 'not_configured' if check.detail == 'not_configured' else 'up'
+            check.last_ok = check.last_checked
+            check.consecutive_failures = 0
+            check.next_check_at = time.monotonic() + check.interval
+        else:
+            check.status = 'down'
+            check.consecutive_failures += 1
+            # Exponential backoff so a dead dependency is not hammered
+            backoff = min(check.interval * (2 ** (check.consecutive_failures - 1)), self.max_backoff)
+            check.next_check_at = time.monotonic() + backoff
+            logger.warning(f"Dependency {check.name} is down: {check.error}")
+    
+    def _probe_with_deadline(self, check: DependencyCheck) -> Optional[str]:
+        """Run the probe on its own daemon thread and stop waiting after the timeout"""
+        if check.pending is not None and check.pending.is_alive():
+            raise TimeoutError(f'Previous probe still running after {self.timeout:g}s')
+        
+        outcome = {}
+        def probe():
+            try:
+                outcome['detail'] = check.probe(self.timeout)
+            except Exception as e:
+                outcome['error'] = e
+        
+        check.pending = threading.Thread(target=probe, name=f'probe-{check.name}', daemon=True)
+        check.pending.start()
+        check.pending.join(self.timeout)
+        if check.pending.is_alive():
+            raise TimeoutError(f'No answer within {self.timeout:g}s')
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome.get('detail')
+    
+    def _probe_database(self, timeout: float) -> Optional[str]:
+        with self.app.app_context():
+            try:
+                if db.session.get_bind().dialect.name == 'postgresql':
+                    # Server-side limit too, so an abandoned probe does not hold a connection
+                    db.session.execute(text(f'SET LOCAL statement_timeout = {int(timeout * 1000)}'))
+                db.session.execute(text('SELECT 1'))
+            finally:
+                db.session.remove()
+        return 'connected'
+    
+    def _probe_youtube(self, timeout: float) -> Optional[str]:
+        api_key = os.getenv('YOUTUBE_API_KEY')
+        if not api_key:
+            return 'not_configured'
+        
+        # Probes yield to user-facing calls when quota runs low
+        with self.app.app_context():
+            try:
+                youtube_quota.acquire('channels.list', 'backfill')
+            except QuotaExceeded:
+                return 'quota_limited'
+        
+        # part=id is the cheapest channels.list call and nothing is written to the database
+        with track_external('youtube', 'health_probe'):
+            response = probe_session.get(
+                f"{self.app.config.get('YOUTUBE_API_BASE_URL', YOUTUBE_API_BASE_URL)}/channels",
+                params={
+                    'part': 'id',
+                    'id': os.getenv('YOUTUBE_CHANNEL_ID', 'UCGy7SkBjcIAgTiwkXEtPnYg'),
+                    'key': api_key
+                },
+                timeout=timeout
+            )
+            response.raise_for_status()
+        return 'active'
+    
+    def _probe_redis(self, timeout: float) -> Optional[str]:
+        redis_url = os.getenv('REDIS_URL')
+        if not redis_url:
+            return 'not_configured'
+        
+        import redis
+        client = redis.from_url(redis_url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        client.ping()
+        return 'connected'
+    
+    def is_fresh(self, check: DependencyCheck) -> bool:
+        if not check.last_checked:
+            return False
+        return (datetime.utcnow() - check.last_checked).total_seconds() < max(self.stale_after, check.interval * 2)
+    
+    def readiness(self) -> Dict:
+        """Ready when every critical dependency was seen up recently"""
+        blocking = [
+            name for name, check in self.checks.items()
+            if check.critical and (check.status != 'up' or not self.is_fresh(check))
+        ]
+        return {
+            'ready': not blocking,
+            'blocking': blocking,
+            'dependencies': {name: check.status for name, check in self.checks.items()}
+        }
+    
+    def snapshot(self, include_history: bool = False) -> Dict:
+        return {name: check.to_dict(include_history) for name, check in self.checks.items()}
+
+prober = None
+
+def init_dependency_prober(app):
+    """Create the prober and start it lazily on the first request"""
+    global prober
+    prober = DependencyProber(app)
+    
+    # Starting on first request keeps CLI commands from probing the YouTube API
+    @app.before_request
+    def ensure_prober_started():
+        prober.start()
+    
+    return prober
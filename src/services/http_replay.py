@@ -0,0 +1,164 @@
+import io
+import os
+import json
+import time
+import base64
+import random
+import hashlib
+import logging
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Applied from HTTP_REPLAY_* by init_http_replay(app). mode is off, record (call out and
+# save every response) or replay (serve saved responses, never call out)
+settings = {
+    'mode': 'off',
+    'directory': 'recordings',
+    'latency_ms': 0.0,
+    'jitter_ms': 0.0,
+    'error_rate': 0.0
+}
+
+# Credentials never reach a recording or its signature
+SECRET_PARAMS = {'key', 'api_key', 'access_token'}
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After')
+
+def request_signature(method: str, url: str, body: Optional[bytes] = None) -> str:
+    """Host-independent key of a request, so the stub server finds recordings made against the real APIs"""
+    parts = urlsplit(url)
+    query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if name not in SECRET_PARAMS)
+    digest = hashlib.sha1(f'{method.upper()} {parts.path} {query}'.encode('utf-8'))
+    if body:
+        digest.update(body if isinstance(body, bytes) else body.encode('utf-8'))
+    return digest.hexdigest()
+
+class Recordings:
+    """Directory of recorded responses, one JSON file per request signature"""
+    
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = directory
+    
+    @property
+    def directory(self) -> str:
+        return self._directory or settings['directory']
+    
+    def _path(self, signature: str) -> str:
+        return os.path.join(self.directory, f'{signature}.json')
+    
+    def load(self, signature: str) -> Optional[Dict]:
+        try:
+            with open(self._path(signature)) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+    
+    def save(self, signature: str, method: str, url: str, status: int, headers, body: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        parts = urlsplit(url)
+        query = [(name, value) for name, value in parse_qsl(parts.query) if name not in SECRET_PARAMS]
+        record = {
+            'method': method,
+            'host': parts.netloc,
+            'path': parts.path,
+            'query': query,
+            'status': status,
+            'headers': {name: headers[name] for name in KEPT_HEADERS if name in headers},
+            'body': base64.b64encode(body).decode('ascii')
+        }
+        with open(self._path(signature), 'w') as handle:
+            json.dump(record, handle, indent=1)
+    
+    @staticmethod
+    def body_of(record: Dict) -> bytes:
+        return base64.b64decode(record['body'])
+
+def injected_delay(latency_ms: float, jitter_ms: float):
+    if latency_ms or jitter_ms:
+        time.sleep(max(latency_ms + random.uniform(-jitter_ms, jitter_ms), 0) / 1000)
+
+def _set_body(response: requests.Response, body: bytes):
+    # Callers read either .content or .raw (the feed stream), so both must hold the body
+    response._content = body
+    response._content_consumed = True
+    response.raw = io.BytesIO(body)
+    response.raw.decode_content = True
+    response.headers['Content-Length'] = str(len(body))
+    response.headers.pop('Content-Encoding', None)
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport that records every response, or answers from recordings without network.
+    
+    Arguments left as None follow the HTTP_REPLAY_* settings at request time,
+    so sessions built at import pick up init_http_replay; with mode off it is a
+    plain HTTPAdapter. In replay mode each request waits latency_ms (+- jitter_ms) and fails with
+    a 503 at error_rate, so throughput and error handling can be measured
+    reproducibly offline. A request with no recording raises ConnectionError,
+    like an unreachable host.
+    """
+    
+    def __init__(self, mode: Optional[str] = None, recordings: Optional[Recordings] = None,
+                 latency_ms: Optional[float] = None, jitter_ms: Optional[float] = None,
+                 error_rate: Optional[float] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.recordings = recordings or Recordings()
+        self._overrides = {'mode': mode, 'latency_ms': latency_ms, 'jitter_ms': jitter_ms, 'error_rate': error_rate}
+    
+    def _setting(self, name: str):
+        value = self._overrides[name]
+        return settings[name] if value is None else value
+    
+    def send(self, request, **kwargs):
+        mode = self._setting('mode')
+        if mode not in ('record', 'replay'):
+            return super().send(request, **kwargs)
+        
+        signature = request_signature(request.method, request.url, request.body)
+        if mode == 'record':
+            response = super().send(request, **kwargs)
+            body = response.content
+            self.recordings.save(signature, request.method, request.url, response.status_code, response.headers, body)
+            _set_body(response, body)
+            return response
+        
+        injected_delay(self._setting('latency_ms'), self._setting('jitter_ms'))
+        error_rate = self._setting('error_rate')
+        if error_rate and random.random() < error_rate:
+            return self._response(request, 503, {'Retry-After': '0'}, b'{"error": "injected"}')
+        
+        record = self.recordings.load(signature)
+        if record is None:
+            raise requests.ConnectionError(f'No recording for {request.method} {request.url} in {self.recordings.directory}')
+        return self._response(request, record['status'], record['headers'], Recordings.body_of(record))
+    
+    def _response(self, request, status: int, headers: Dict, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.reason = 'Replayed'
+        response.headers = CaseInsensitiveDict(headers)
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        _set_body(response, body)
+        return response
+
+def replay_enabled() -> bool:
+    return settings['mode'] in ('record', 'replay')
+
+def init_http_replay(app):
+    """Apply the HTTP_REPLAY_* settings to every session from build_session"""
+    settings.update(
+        mode=app.config.get('HTTP_REPLAY_MODE', 'off').lower(),
+        directory=app.config.get('HTTP_REPLAY_DIR', 'recordings'),
+        latency_ms=app.config.get('HTTP_REPLAY_LATENCY_MS', 0.0),
+        jitter_ms=app.config.get('HTTP_REPLAY_JITTER_MS', 0.0),
+        error_rate=app.config.get('HTTP_REPLAY_ERROR_RATE', 0.0)
+    )
+    if replay_enabled():
+        logger.warning(f"HTTP {settings['mode']} mode: recordings in {settings['directory']}")
@@ -0,0 +1,43 @@
+import requests
+from urllib3.util.retry import Retry
+
+from .http_replay import ReplayAdapter
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def retry_delay(response, backoff: float, attempt: int) -> float:
+    """Seconds before retry number attempt (from 0): Retry-After if the server sent one, else backoff * 2^attempt"""
+    header = response.headers.get('Retry-After', '') if response is not None else ''
+    if header.isdigit():
+        return float(header)
+    return backoff * 2 ** attempt
+
+def build_session(user_agent: str, retries: int = 3, backoff: float = 0.5, pool_size: int = 10) -> requests.Session:
+    """Keep-alive session with a bounded connection pool and retries on 429/5xx.
+    
+    Retries back off exponentially (backoff, 2*backoff, ...) and honour
+    Retry-After. Only idempotent methods are retried. With HTTP_REPLAY_MODE
+    set, responses are recorded or replayed (see http_replay); the mode is
+    read per request, so it also applies to sessions built at import.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = ReplayAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': user_agent,
+        'Accept-Encoding': 'gzip'
+    })
+    return session
@@ -0,0 +1,307 @@
+import os
+import time
+import socket
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from ..models.job import Job
+from ..models.sync_state import SyncState
+from ..models.video import db
+from .metrics import record_emit
+
+logger = logging.getLogger(__name__)
+
+JOB_NAMESPACE = '/jobs'
+SCHEDULE_KEY = 'jobs:schedule:{}'
+PRUNE_KEY = 'jobs:prune'
+PRUNE_INTERVAL = 3600
+# Fixed width, so stored times compare correctly as text in SyncState.advance
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+# kind -> handler(JobContext) returning a JSON-safe result
+HANDLERS: Dict[str, Callable] = {}
+
+# kind -> (config key, default) of the interval in seconds at which runners enqueue it; 0 disables
+SCHEDULES: Dict[str, Tuple[str, int]] = {}
+
+def job_handler(kind: str, every: Optional[Tuple[str, int]] = None):
+    """Register the function that runs jobs of this kind, optionally on a schedule"""
+    def register(fn):
+        HANDLERS[kind] = fn
+        if every:
+            SCHEDULES[kind] = every
+        return fn
+    return register
+
+class JobContext:
+    """What a handler sees: its params, the checkpoint to resume from, and a way to save progress"""
+    
+    def __init__(self, job: Job, runner: 'JobRunner'):
+        self.job = job
+        self.params = dict(job.params or {})
+        self.checkpoint = job.checkpoint
+        self.runner = runner
+    
+    def save(self, checkpoint: Optional[Dict] = None, progress: Optional[Dict] = None):
+        """Persist the checkpoint and progress, then push them to clients"""
+        if checkpoint is not None:
+            # A copy, since JSON columns only notice reassignment, not in-place changes
+            self.job.checkpoint = dict(checkpoint)
+            self.checkpoint = self.job.checkpoint
+        if progress is not None:
+            self.job.progress = progress
+        self.job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+        self.runner.emit(self.job)
+    
+    def broadcast(self, event: str, data, namespace: str = '/'):
+        self.runner.broadcast(event, data, namespace)
+
+class JobRunner:
+    """Claims jobs from the jobs table and runs them on background threads.
+    
+    The dedicated worker (worker.py) runs one, and so does the web process
+    with JOB_RUN_IN_WEB; all claim through Job.claim_next, so any number of
+    runners can share the queue.
+    """
+    
+    def __init__(self, app, socketio=None, concurrency: int = 1, poll_interval: float = 5,
+                 stale_after: float = 600, worker_id: Optional[str] = None, kinds=None):
+        self.app = app
+        self.socketio = socketio
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.kinds = kinds
+        self._wakeup = threading.Event()
+        self._active = set()
+        self._threads = []
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start the runner threads and the heartbeat thread, once per process"""
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            if not self._threads:
+                heartbeat = threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True)
+                heartbeat.start()
+                self._threads.append(heartbeat)
+            while len(self._threads) < self.concurrency + 1:
+                thread = threading.Thread(target=self._loop, name=f'job-runner-{len(self._threads)}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+    
+    def submit(self, job_id: Optional[int] = None):
+        """Wake idle runner threads instead of waiting for the next poll"""
+        self._wakeup.set()
+    
+    def run_forever(self):
+        self.start()
+        logger.info(f"Job runner {self.worker_id} started with {self.concurrency} threads")
+        while True:
+            time.sleep(60)
+    
+    def _loop(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    job = Job.claim_next(self.worker_id, self.stale_after, self.kinds)
+                    if job is not None:
+                        self.run(job)
+                        continue
+            except Exception as e:
+                logger.error(f"Job runner error: {str(e)}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+    
+    def _heartbeat(self):
+        # Long phases without checkpoints still count as alive
+        while True:
+            time.sleep(max(self.stale_after / 4, 1))
+            with self._lock:
+                job_ids = set(self._active)
+            try:
+                with self.app.app_context():
+                    Job.touch(job_ids)
+                    self._enqueue_scheduled()
+            except Exception as e:
+                logger.warning(f"Job heartbeat failed: {str(e)}")
+    
+    def _enqueue_scheduled(self):
+        """Queue scheduled kinds once per interval across all runners, and prune old jobs.
+        
+        Each turn is taken by moving a SyncState timestamp forward in one
+        conditional statement, so when several runners are due at once exactly
+        one of them enqueues.
+        """
+        now = datetime.utcnow()
+        for kind, (config_key, default) in SCHEDULES.items():
+            interval = self.app.config.get(config_key, default)
+            if not interval or (self.kinds and kind not in self.kinds):
+                continue
+            due_before = (now - timedelta(seconds=interval)).strftime(TIME_FORMAT)
+            if SyncState.advance(SCHEDULE_KEY.format(kind), now.strftime(TIME_FORMAT), due_before):
+                # enqueue() returns the active job instead when one is already queued or running
+                enqueue(kind)
+        
+        if SyncState.advance(PRUNE_KEY, now.strftime(TIME_FORMAT),
+                             (now - timedelta(seconds=PRUNE_INTERVAL)).strftime(TIME_FORMAT)):
+            retention = self.app.config.get('JOB_RETENTION_DAYS', 14)
+            pruned = Job.prune(now - timedelta(days=retention))
+            if pruned:
+                logger.info(f"Pruned {pruned} finished jobs older than {retention} days")
+    
+    def run(self, job: Job):
+        """Run a claimed job to completion or failure"""
+        job_id = job.id
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            self._finish(job, 'failed', error=f'No handler for job kind {job.kind}')
+            return
+        
+        with self._lock:
+            self._active.add(job_id)
+        self.emit(job)
+        try:
+            result = handler(JobContext(job, self))
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Job {job_id} ({job.kind}) failed: {str(e)}")
+            # The checkpoint is kept, so a retry resumes where this attempt stopped
+            self._finish(db.session.get(Job, job_id), 'failed', error=str(e)[:2000])
+            return
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+        self._finish(job, 'succeeded', result=result)
+    
+    def _finish(self, job: Job, status: str, result=None, error=None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        self.emit(job)
+    
+    def emit(self, job: Job):
+        self.broadcast('job_progress', job.to_dict(), JOB_NAMESPACE)
+    
+    def broadcast(self, event: str, data, namespace: str = '/'):
+        """Emit to clients; from the worker this goes through SOCKETIO_MESSAGE_QUEUE"""
+        if not self.socketio:
+            return
+        try:
+            self.socketio.emit(event, data, namespace=namespace)
+            record_emit(event)
+        except Exception as e:
+            logger.warning(f"Could not emit {event}: {str(e)}")
+
+_runner: Optional[JobRunner] = None
+
+def enqueue(kind: str, params: Optional[Dict] = None) -> Job:
+    """Queue a job, or return the matching one that is already queued or running"""
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    
+    job = Job.find_active(kind, params)
+    if job:
+        return job
+    
+    job = Job(kind=kind, status='queued', params=params or {})
+    db.session.add(job)
+    db.session.commit()
+    if _runner:
+        _runner.submit(job.id)
+    return job
+
+def retry(job: Job) -> Job:
+    """Queue a failed job again; it resumes from its last checkpoint"""
+    job.status = 'queued'
+    job.error = None
+    job.finished_at = None
+    db.session.commit()
+    if _runner:
+        _runner.submit(job.id)
+    return job
+
+def build_runner(app, socketio=None, concurrency: Optional[int] = None, worker_id: Optional[str] = None) -> JobRunner:
+    return JobRunner(
+        app,
+        socketio,
+        concurrency=concurrency or app.config.get('JOB_RUNNER_CONCURRENCY', 1),
+        poll_interval=app.config.get('JOB_POLL_INTERVAL', 5),
+        stale_after=app.config.get('JOB_STALE_AFTER', 600),
+        worker_id=worker_id
+    )
+
+def init_jobs(app, socketio=None) -> Optional[JobRunner]:
+    """Run jobs in the web process with JOB_RUN_IN_WEB; otherwise only enqueue them for worker.py"""
+    global _runner
+    if not app.config.get('JOB_RUN_IN_WEB'):
+        return None
+    _runner = build_runner(app, socketio)
+    
+    # Starting on first request keeps CLI commands from running jobs
+    @app.before_request
+    def start_job_runner():
+        _runner.start()
+    
+    return _runner
+
+def set_runner(runner: JobRunner):
+    """Make enqueue() wake this runner (used by the worker process)"""
+    global _runner
+    _runner = runner
+
+@job_handler('sync_videos')
+def run_video_sync(context: JobContext):
+    from .youtube_service import YouTubeService
+    
+    service = YouTubeService(priority=context.params.get('priority', 'sync'))
+    
+    def save_page(state):
+        context.save(checkpoint=state, progress={
+            'pages': state['pages'],
+            'new_videos': state['new'],
+            'updated_videos': state['updated'],
+            'unchanged_videos': state['unchanged']
+        })
+    
+    service.sync_videos_to_database(
+        full=context.params.get('full'),
+        checkpoint=context.checkpoint,
+        on_checkpoint=save_page
+    )
+    if not service.last_sync['complete']:
+        # Failing keeps the checkpoint, so a retry continues from the page that broke
+        raise RuntimeError(f"Video listing stopped after {service.last_sync['pages']} pages")
+    return service.last_sync
+
+@job_handler('sync_podcasts')
+def run_podcast_sync(context: JobContext):
+    from .podcast_service import PodcastService
+    
+    result = PodcastService().sync_episodes(full_resync=bool(context.params.get('full')))
+    context.broadcast('podcast_sync_complete', result, '/stats')
+    return result
+
+@job_handler('index_content')
+def run_content_index(context: JobContext):
+    from .ai_chat_service import AIChatService
+    
+    return AIChatService().index_content(bool(context.params.get('force_reindex')))
+
+@job_handler('categorize_videos', every=('VIDEO_CATEGORIZE_INTERVAL', 86400))
+def run_video_categorization(context: JobContext):
+    from .video_classifier import recategorize_videos
+    
+    return recategorize_videos()
+
+@job_handler('refresh_views', every=('VIEW_REFRESH_INTERVAL', 900))
+def run_view_refresh(context: JobContext):
+    from .view_refresh import ViewRefresher
+    
+    return ViewRefresher().run()
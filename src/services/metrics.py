@@ -0,0 +1,242 @@
+import os
+import time
+import logging
+from contextlib import contextmanager
+
+from flask import g, request, has_request_context
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# HTTP
+REQUEST_LATENCY = Histogram(
+    'gregverse_http_request_duration_seconds',
+    'HTTP request latency',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'gregverse_http_requests_in_flight',
+    'HTTP requests currently being served',
+    ['blueprint'],
+    multiprocess_mode='livesum'
+)
+
+# Database
+DB_QUERIES_PER_REQUEST = Histogram(
+    'gregverse_db_queries_per_request',
+    'SQL statements executed per HTTP request',
+    ['blueprint', 'endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    'gregverse_db_time_per_request_seconds',
+    'Time spent in SQL per HTTP request',
+    ['blueprint', 'endpoint']
+)
+DB_QUERIES = Counter(
+    'gregverse_db_queries_total',
+    'SQL statements executed',
+    ['context']
+)
+
+# Caches
+CACHE_REQUESTS = Counter(
+    'gregverse_cache_requests_total',
+    'Cache lookups by outcome',
+    ['cache', 'result']
+)
+
+# External services
+EXTERNAL_CALL_LATENCY = Histogram(
+    'gregverse_external_call_duration_seconds',
+    'Latency of calls to external services',
+    ['service', 'operation', 'outcome'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+# YouTube quota
+YOUTUBE_QUOTA_UNITS = Counter(
+    'gregverse_youtube_quota_units_total',
+    'YouTube Data API units spent',
+    ['endpoint', 'priority']
+)
+YOUTUBE_QUOTA_DENIED = Counter(
+    'gregverse_youtube_quota_denied_total',
+    'YouTube API calls refused by the quota manager and served from cache',
+    ['endpoint', 'priority']
+)
+YOUTUBE_QUOTA_REMAINING = Gauge(
+    'gregverse_youtube_quota_remaining_units',
+    'YouTube Data API units left in the current quota day',
+    multiprocess_mode='min'
+)
+
+# RSS feeds
+FEED_FETCHES = Counter(
+    'gregverse_feed_fetches_total',
+    'RSS feed fetches by outcome',
+    ['feed', 'result']
+)
+FEED_BYTES = Counter(
+    'gregverse_feed_bytes_total',
+    'RSS bytes downloaded, and bytes saved by 304 Not Modified responses',
+    ['feed', 'kind']
+)
+FEED_SYNC_DURATION = Histogram(
+    'gregverse_feed_sync_duration_seconds',
+    'Time to fetch and parse one feed during a podcast sync',
+    ['feed', 'status'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+FEED_SYNC_EPISODES = Counter(
+    'gregverse_feed_sync_episodes_total',
+    'Episodes seen per feed during podcast syncs, by outcome',
+    ['feed', 'result']
+)
+
+# Single-flight syncs and indexing
+SINGLE_FLIGHT_CALLS = Counter(
+    'gregverse_single_flight_calls_total',
+    'Sync and index calls by outcome: ran, joined a run in this process, or reused another process\'s result',
+    ['operation', 'outcome']
+)
+
+# WebSocket
+WEBSOCKET_CONNECTIONS = Gauge(
+    'gregverse_websocket_connections',
+    'Open Socket.IO connections',
+    ['namespace'],
+    multiprocess_mode='livesum'
+)
+WEBSOCKET_EMITS = Counter(
+    'gregverse_websocket_emits_total',
+    'Socket.IO events emitted',
+    ['event']
+)
+
+def _route_labels():
+    return (request.blueprint or 'app', request.endpoint or 'unmatched')
+
+def init_metrics(app):
+    """Instrument every request of the app"""
+    
+    @app.before_request
+    def start_request_metrics():
+        blueprint, _ = _route_labels()
+        g._metrics_start = time.perf_counter()
+        g._metrics_db_queries = 0
+        g._metrics_db_time = 0.0
+        REQUESTS_IN_FLIGHT.labels(blueprint).inc()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        _finish_request(response.status_code)
+        return response
+    
+    @app.teardown_request
+    def finish_failed_request(exc):
+        # Only reached with the request still open when the error propagated past
+        # after_request (PROPAGATE_EXCEPTIONS in debug/testing) or an after_request hook raised
+        _finish_request(500)
+
+def _finish_request(status):
+    start = g.pop('_metrics_start', None)
+    if start is None:
+        return
+    
+    blueprint, endpoint = _route_labels()
+    REQUESTS_IN_FLIGHT.labels(blueprint).dec()
+    REQUEST_LATENCY.labels(blueprint, endpoint, request.method, str(status)).observe(time.perf_counter() - start)
+    DB_QUERIES_PER_REQUEST.labels(blueprint, endpoint).observe(g.get('_metrics_db_queries', 0))
+    DB_TIME_PER_REQUEST.labels(blueprint, endpoint).observe(g.get('_metrics_db_time', 0.0))
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_metrics_query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('_metrics_query_start')
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    
+    if has_request_context() and '_metrics_start' in g:
+        g._metrics_db_queries = g.get('_metrics_db_queries', 0) + 1
+        g._metrics_db_time = g.get('_metrics_db_time', 0.0) + elapsed
+        DB_QUERIES.labels('request').inc()
+    else:
+        DB_QUERIES.labels('background').inc()
+
+def record_cache(cache, hit):
+    """Count a cache lookup"""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+@contextmanager
+def track_external(service, operation):
+    """Time a call to YouTube, RSS, OpenAI or Pinecone"""
+    start = time.perf_counter()
+    outcome = 'success'
+    try:
+        yield
+    except Exception:
+        outcome = 'error'
+        raise
+    finally:
+        EXTERNAL_CALL_LATENCY.labels(service, operation, outcome).observe(time.perf_counter() - start)
+
+def record_quota(endpoint, priority, units=0, denied=False, remaining=None):
+    """Count YouTube quota spent or refused, and the units left today"""
+    if denied:
+        YOUTUBE_QUOTA_DENIED.labels(endpoint, priority).inc()
+    elif units:
+        YOUTUBE_QUOTA_UNITS.labels(endpoint, priority).inc(units)
+    if remaining is not None:
+        YOUTUBE_QUOTA_REMAINING.set(remaining)
+
+def record_feed_fetch(feed, result, downloaded=0, saved=0):
+    """Count a feed fetch ('modified', 'not_modified' or 'error') and its bytes"""
+    FEED_FETCHES.labels(feed, result).inc()
+    if downloaded:
+        FEED_BYTES.labels(feed, 'downloaded').inc(downloaded)
+    if saved:
+        FEED_BYTES.labels(feed, 'saved').inc(saved)
+
+def record_feed_sync(feed, status, seconds, counts):
+    """Record one feed's poll time and its inserted/changed/unchanged/duplicate counts"""
+    FEED_SYNC_DURATION.labels(feed, status).observe(seconds)
+    for result, count in counts.items():
+        if count:
+            FEED_SYNC_EPISODES.labels(feed, result).inc(count)
+
+def record_single_flight(operation, outcome):
+    """Count a single-flight call ('ran', 'joined' or 'reused')"""
+    SINGLE_FLIGHT_CALLS.labels(operation, outcome).inc()
+
+def record_emit(event_name, count=1):
+    """Count Socket.IO emits (one per recipient for broadcasts)"""
+    WEBSOCKET_EMITS.labels(event_name).inc(count)
+
+def websocket_connected(namespace='/'):
+    WEBSOCKET_CONNECTIONS.labels(namespace).inc()
+
+def websocket_disconnected(namespace='/'):
+    WEBSOCKET_CONNECTIONS.labels(namespace).dec()
+
+def render_metrics():
+    """Prometheus exposition, merged across gunicorn workers when multiprocess mode is on"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,135 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from flask import current_app
+
+from ..models.video import Video, db
+from ..models.youtube_stats import YouTubeStats, StatsTrend
+from ..models.podcast import PodcastEpisode
+from ..models.snapshot import MaterializedSnapshot
+from .metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_GOAL = 1000000
+
+class OverviewMaterializer:
+    """Precomputed overview shared by /api/stats/overview and /health/detailed"""
+    
+    SNAPSHOT_NAME = 'overview'
+    SECTIONS = ('youtube', 'content', 'podcast')
+    
+    # Process-wide copy of the stored snapshot: (payload dict, response body, loaded at)
+    _cached = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def refresh(cls, sections: Optional[Iterable[str]] = None) -> Dict:
+        """Recompute the given sections (all by default) and store the snapshot"""
+        sections = list(sections or cls.SECTIONS)
+        
+        with cls._lock:
+            stored = MaterializedSnapshot.load(cls.SNAPSHOT_NAME)
+            payload = json.loads(stored.payload) if stored else {}
+            
+            # A first build always needs every section
+            if not stored:
+                sections = list(cls.SECTIONS)
+            
+            for section in sections:
+                payload[section] = getattr(cls, f'_build_{section}')()
+            
+            payload['milestones'] = cls._build_milestones(payload['youtube'])
+            payload['last_updated'] = datetime.utcnow().isoformat()
+            
+            body = json.dumps({'success': True, 'data': payload})
+            MaterializedSnapshot.store(cls.SNAPSHOT_NAME, json.dumps(payload))
+            cls._cached = (payload, body, time.monotonic())
+        
+        logger.info(f"Overview snapshot refreshed: {', '.join(sections)}")
+        return payload
+    
+    @classmethod
+    def refresh_quietly(cls, sections: Optional[Iterable[str]] = None):
+        """Refresh after a sync without letting snapshot errors fail the caller"""
+        try:
+            cls.refresh(sections)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error refreshing overview snapshot: {str(e)}")
+    
+    @classmethod
+    def _load(cls):
+        ttl = current_app.config.get('OVERVIEW_CACHE_TTL', 5)
+        cached = cls._cached
+        if cached and time.monotonic() - cached[2] < ttl:
+            record_cache('overview_snapshot', True)
+            return cached
+        record_cache('overview_snapshot', False)
+        
+        # Another worker may have refreshed it since, so reload the stored copy
+        stored = MaterializedSnapshot.load(cls.SNAPSHOT_NAME)
+        if not stored:
+            cls.refresh()
+            return cls._cached
+        
+        payload = json.loads(stored.payload)
+        cls._cached = (payload, json.dumps({'success': True, 'data': payload}), time.monotonic())
+        return cls._cached
+    
+    @classmethod
+    def get_payload(cls) -> Dict:
+        """Get the snapshot as a dict"""
+        return cls._load()[0]
+    
+    @classmethod
+    def get_response_body(cls) -> str:
+        """Get the prebuilt /api/stats/overview response body"""
+        return cls._load()[1]
+    
+    @staticmethod
+    def _build_youtube() -> Dict:
+        return YouTubeStats.get_latest_cached()
+    
+    @staticmethod
+    def _build_content() -> Dict:
+        categories = Video.get_categories()
+        latest_video = Video.query.order_by(Video.published_at.desc()).first()
+        
+        return {
+            'total_videos': Video.query.count(),
+            'categories_count': len(categories),
+            'categories': categories,
+            'latest_video': {
+                'title': latest_video.title if latest_video else None,
+                'published_at': latest_video.published_at.isoformat() if latest_video and latest_video.published_at else None
+            }
+        }
+    
+    @staticmethod
+    def _build_podcast() -> Dict:
+        latest_episode = PodcastEpisode.query.order_by(
+            PodcastEpisode.published_at.desc()
+        ).first()
+        
+        return {
+            'total_episodes': PodcastEpisode.query.count(),
+            'unique_guests': len(PodcastEpisode.get_guests()),
+            'latest_episode': {
+                'title': latest_episode.title if latest_episode else None,
+                'published_at': latest_episode.published_at.isoformat() if latest_episode and latest_episode.published_at else None
+            }
+        }
+    
+    @staticmethod
+    def _build_milestones(youtube_stats: Dict) -> Dict:
+        return {
+            'subscriber_goal': SUBSCRIBER_GOAL,
+            'progress_percentage': youtube_stats.get('progress_to_million', 0),
+            'subscribers_to_goal': max(0, SUBSCRIBER_GOAL - youtube_stats.get('subscriber_count', 0)),
+            'forecast': next(iter(StatsTrend.get_forecasts([SUBSCRIBER_GOAL])), None)
+        }
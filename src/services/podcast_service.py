@@ -1,44 +1,64 @@
-import feedparser
-import requests
 from datetime import datetime
 import re
+import zlib
 import logging
+from collections import defaultdict
 from typing import List, Dict, Optional
-from ..models.podcast import PodcastEpisode, db
+from flask import current_app
+from ..models.podcast import PodcastEpisode, PodcastFeed, db
+from ..models.upsert import bulk_upsert
+from .overview_service import OverviewMaterializer
+from .feed_aggregator import FeedAggregator, FeedPoll
+from .feed_fetcher import FeedResult, feed_fetcher
+from .metrics import record_feed_sync
+from .rss_stream import entry_guid
+from .single_flight import single_flight
+from .text_extraction import extract_episode_number, extract_guest_name, extract_tags
 
 logger = logging.getLogger(__name__)
 
+HTML_TAG = re.compile(r'<[^>]+>')
+WHITESPACE = re.compile(r'\s+')
+
+def _stable_hash(text: str) -> int:
+    # hash() is salted per process, which made every sync rewrite the placeholder URLs
+    return zlib.crc32(text.encode('utf-8'))
+
 class PodcastService:
     def __init__(self):
-        self.rss_url = "https://feeds.transistor.fm/the-startup-ideas-podcast"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Gregverse/1.0 (Podcast Aggregator)'
-        })
+        self.rss_url = PodcastFeed.DEFAULT_FEEDS[0]['url']
+        self.fetcher = feed_fetcher
+        self.aggregator = FeedAggregator(
+            self._parse_episode,
+            fetcher=self.fetcher,
+            concurrency=current_app.config.get('PODCAST_FEED_CONCURRENCY', 4),
+            per_host=current_app.config.get('PODCAST_FEED_PER_HOST', 2),
+            timeout=current_app.config.get('PODCAST_FEED_TIMEOUT', 15)
+        )
     
     def fetch_episodes(self) -> List[Dict]:
         """Fetch episodes from RSS feed"""
+        result = self._fetch_feed()
+        return self._parse_entries(result.entries) if result else []
+    
+    def _fetch_feed(self) -> Optional[FeedResult]:
+        """Conditional GET of the feed, None when it can't be fetched"""
         try:
             logger.info(f"Fetching podcast episodes from {self.rss_url}")
-            
-            # Parse RSS feed
-            feed = feedparser.parse(self.rss_url)
-            
-            if feed.bozo:
-                logger.warning(f"RSS feed has issues: {feed.bozo_exception}")
-            
-            episodes = []
-            for entry in feed.entries:
-                episode_data = self._parse_episode(entry)
-                if episode_data:
-                    episodes.append(episode_data)
-            
-            logger.info(f"Successfully parsed {len(episodes)} episodes")
-            return episodes
-            
+            return self.fetcher.fetch(self.rss_url, 'startup_ideas')
         except Exception as e:
             logger.error(f"Error fetching podcast episodes: {str(e)}")
-            return []
+            return None
+    
+    def _parse_entries(self, entries) -> List[Dict]:
+        episodes = []
+        for entry in entries:
+            episode_data = self._parse_episode(entry)
+            if episode_data:
+                episodes.append(episode_data)
+        
+        logger.info(f"Successfully parsed {len(episodes)} episodes")
+        return episodes
     
     def _parse_episode(self, entry) -> Optional[Dict]:
         """Parse individual episode from RSS entry"""
@@ -83,6 +103,8 @@ class PodcastService:
             youtube_url = self._generate_youtube_url(title)
             
             return {
+                'guid': entry_guid(entry) or title,
+                'dedup_key': PodcastEpisode.make_dedup_key(title),
                 'title': title,
                 'description': self._clean_description(description),
                 'guest': guest,
@@ -101,72 +123,24 @@ class PodcastService:
             return None
     
     def _extract_episode_number(self, title: str) -> Optional[int]:
-        """Extract episode number from title"""
-        # Look for patterns like "Episode 123", "#123", "Ep 123"
-        patterns = [
-            r'Episode\s+(\d+)',
-            r'Ep\s+(\d+)',
-            r'#(\d+)',
-            r'(\d+):',  # Number followed by colon
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, title, re.IGNORECASE)
-            if match:
-                try:
-                    return int(match.group(1))
-                except ValueError:
-                    continue
-        
-        return None
+        """Extract episode number from title ("Episode 123", "Ep 123", "#123", "123:")"""
+        return extract_episode_number(title)
     
     def _extract_guest_name(self, title: str, description: str) -> Optional[str]:
         """Extract guest name from title or description"""
-        # Common patterns for guest names
-        patterns = [
-            r'with\s+([A-Z][a-z]+\s+[A-Z][a-z]+)',  # "with John Doe"
-            r'featuring\s+([A-Z][a-z]+\s+[A-Z][a-z]+)',  # "featuring Jane Smith"
-            r'guest:\s*([A-Z][a-z]+\s+[A-Z][a-z]+)',  # "guest: Bob Johnson"
-            r'interviews?\s+([A-Z][a-z]+\s+[A-Z][a-z]+)',  # "interview John Doe"
-        ]
-        
-        text = f"{title} {description}"
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                guest_name = match.group(1).strip()
-                # Filter out common false positives
-                if guest_name.lower() not in ['greg isenberg', 'startup ideas', 'the startup']:
-                    return guest_name
-        
-        return None
+        return extract_guest_name(title, description)
     
     def _extract_tags(self, description: str) -> List[str]:
-        """Extract relevant tags from description"""
-        tags = []
-        
-        # Common startup/business keywords
-        keywords = [
-            'startup', 'entrepreneur', 'business', 'saas', 'ai', 'tech',
-            'marketing', 'growth', 'funding', 'venture capital', 'vc',
-            'product', 'strategy', 'innovation', 'digital', 'ecommerce',
-            'fintech', 'healthtech', 'edtech', 'marketplace', 'platform'
-        ]
-        
-        description_lower = description.lower()
-        for keyword in keywords:
-            if keyword in description_lower:
-                tags.append(keyword)
-        
-        return list(set(tags))  # Remove duplicates
+        """Extract relevant tags from description in one pass over the text"""
+        return extract_tags(description)
     
     def _clean_description(self, description: str) -> str:
         """Clean HTML and formatting from description"""
         # Remove HTML tags
-        description = re.sub(r'<[^>]+>', '', description)
+        description = HTML_TAG.sub('', description)
         
         # Remove extra whitespace
-        description = re.sub(r'\s+', ' ', description).strip()
+        description = WHITESPACE.sub(' ', description).strip()
         
         # Limit length
         if len(description) > 1000:
@@ -177,51 +151,87 @@ class PodcastService:
     def _generate_spotify_url(self, title: str) -> Optional[str]:
         """Generate Spotify URL (placeholder - would need actual mapping)"""
         # In production, you'd maintain a mapping of episodes to Spotify URLs
-        return f"https://open.spotify.com/episode/placeholder-{hash(title) % 1000000}"
+        return f"https://open.spotify.com/episode/placeholder-{_stable_hash(title) % 1000000}"
     
     def _generate_apple_url(self, title: str) -> Optional[str]:
         """Generate Apple Podcasts URL (placeholder)"""
-        return f"https://podcasts.apple.com/podcast/placeholder-{hash(title) % 1000000}"
+        return f"https://podcasts.apple.com/podcast/placeholder-{_stable_hash(title) % 1000000}"
     
     def _generate_youtube_url(self, title: str) -> Optional[str]:
         """Generate YouTube URL (placeholder)"""
-        return f"https://youtube.com/watch?v=placeholder-{hash(title) % 1000000}"
+        return f"https://youtube.com/watch?v=placeholder-{_stable_hash(title) % 1000000}"
     
-    def sync_episodes(self) -> Dict[str, int]:
-        """Sync episodes from RSS feed to database"""
+    def sync_episodes(self, full_resync: bool = False) -> Dict:
+        """Sync episodes from every registered feed, joining a sync already in progress"""
+        return single_flight('sync_podcasts', lambda: self._sync_episodes(full_resync), {'full_resync': full_resync})
+    
+    def _sync_episodes(self, full_resync: bool) -> Dict:
+        """Sync episodes from every registered feed to the database.
+        
+        Feeds are polled in parallel and streamed newest-first; each stops at the
+        first episode whose GUID it already stored. full_resync reads every feed
+        to the end, for backfills and after changing how episodes are parsed.
+        """
         try:
-            episodes_data = self.fetch_episodes()
+            feeds = PodcastFeed.get_active()
+            known_guids = {}
+            if not full_resync:
+                # Any stored GUID is a safe stopping point, whichever feed stored it
+                newest = PodcastEpisode.recent_guids()
+                known_guids = {feed.id: newest | PodcastEpisode.recent_guids(feed.id) for feed in feeds}
             
-            new_count = 0
-            updated_count = 0
+            # Network and parsing run concurrently; the database is only touched below
+            polls = self.aggregator.poll(
+                [{'id': feed.id, 'name': feed.name, 'url': feed.url} for feed in feeds],
+                known_guids,
+                full_resync
+            )
             
-            for episode_data in episodes_data:
-                # Check if episode already exists
-                existing = PodcastEpisode.query.filter_by(
-                    title=episode_data['title']
-                ).first()
-                
-                if existing:
-                    # Update existing episode
-                    for key, value in episode_data.items():
-                        if hasattr(existing, key) and value is not None:
-                            setattr(existing, key, value)
-                    existing.updated_at = datetime.utcnow()
-                    updated_count += 1
-                else:
-                    # Create new episode
-                    episode = PodcastEpisode(**episode_data)
-                    db.session.add(episode)
-                    new_count += 1
+            PodcastEpisode.backfill_dedup_keys()
+            duplicates = self._drop_duplicates(polls)
             
+            feed_counts = {}
+            for poll in polls:
+                counts = {'inserted': 0, 'changed': 0, 'unchanged': 0, 'duplicate': duplicates[poll.feed_id]}
+                if poll.episodes:
+                    # Rows stored before GUIDs existed are matched once by title, then by GUID
+                    PodcastEpisode.adopt_legacy_guids({data['title']: data['guid'] for data in poll.episodes})
+                    counts.update(bulk_upsert(PodcastEpisode, poll.episodes, key='guid'))
+                feed_counts[poll.feed_id] = counts
+            
+            stored = PodcastEpisode.count_by_feed()
+            for feed, poll in zip(feeds, polls):
+                feed.record_poll(poll.status, int(poll.duration * 1000), poll.error, stored.get(feed.id, 0))
             db.session.commit()
             
-            logger.info(f"Podcast sync completed: {new_count} new, {updated_count} updated")
+            # Validators are kept only now, so a failed write is retried in full next time
+            for poll in polls:
+                if poll.stream is not None:
+                    self.fetcher.remember(poll.stream)
+                record_feed_sync(poll.name, poll.status, poll.duration, feed_counts[poll.feed_id])
+            
+            totals = {
+                key: sum(counts[key] for counts in feed_counts.values())
+                for key in ('inserted', 'changed', 'unchanged', 'duplicate')
+            }
+            logger.info(
+                f"Podcast sync completed: {totals['inserted']} new, {totals['changed']} updated, "
+                f"{totals['unchanged']} unchanged, {totals['duplicate']} duplicates across {len(polls)} feeds"
+            )
+            if totals['inserted'] or totals['changed']:
+                OverviewMaterializer.refresh_quietly(['podcast'])
             
             return {
-                'new_episodes': new_count,
-                'updated_episodes': updated_count,
-                'total_processed': len(episodes_data)
+                'new_episodes': totals['inserted'],
+                'updated_episodes': totals['changed'],
+                'unchanged_episodes': totals['unchanged'],
+                'duplicate_episodes': totals['duplicate'],
+                'total_processed': sum(len(poll.episodes) for poll in polls) + totals['duplicate'],
+                'not_modified': all(poll.not_modified for poll in polls),
+                'full_resync': full_resync,
+                'feeds': {
+                    poll.name: self._poll_summary(poll, feed_counts[poll.feed_id]) for poll in polls
+                }
             }
             
         except Exception as e:
@@ -229,6 +239,58 @@ class PodcastService:
             logger.error(f"Error syncing podcast episodes: {str(e)}")
             raise
     
+    def _drop_duplicates(self, polls: List[FeedPoll]) -> Dict[int, int]:
+        """Keep one copy of an episode carried by several feeds.
+        
+        Polls arrive in feed priority order, so the higher-priority feed's copy
+        wins within a sync, and an episode already stored by another feed is
+        left to that feed. Rows from before feeds were tracked are claimed by
+        the first feed that carries them.
+        """
+        episodes = [episode for poll in polls for episode in poll.episodes]
+        guid_owners, key_owners = PodcastEpisode.feed_owners(
+            {episode['guid'] for episode in episodes},
+            {episode['dedup_key'] for episode in episodes if episode['dedup_key']}
+        )
+        seen_guids = set()
+        seen_keys = set()
+        dropped = defaultdict(int)
+        
+        for poll in polls:
+            kept = []
+            for episode in poll.episodes:
+                key = episode['dedup_key']
+                guid_owner = guid_owners.get(episode['guid'])
+                key_owner = key_owners.get(key)
+                owned_elsewhere = (
+                    guid_owner not in (None, poll.feed_id)
+                    or (key_owner is not None and key_owner[0] != episode['guid'] and key_owner[1] != poll.feed_id)
+                )
+                if episode['guid'] in seen_guids or (key and key in seen_keys) or owned_elsewhere:
+                    dropped[poll.feed_id] += 1
+                    continue
+                seen_guids.add(episode['guid'])
+                if key:
+                    seen_keys.add(key)
+                kept.append(episode)
+            poll.episodes = kept
+        
+        return dropped
+    
+    @staticmethod
+    def _poll_summary(poll: FeedPoll, counts: Dict[str, int]) -> Dict:
+        return {
+            'status': poll.status,
+            'error': poll.error,
+            'duration_ms': int(poll.duration * 1000),
+            'stopped_early': poll.stopped_early,
+            'skipped': poll.skipped,
+            'new_episodes': counts['inserted'],
+            'updated_episodes': counts['changed'],
+            'unchanged_episodes': counts['unchanged'],
+            'duplicate_episodes': counts['duplicate']
+        }
+    
     def get_episode_stats(self) -> Dict:
         """Get podcast statistics"""
         try:
@@ -0,0 +1,80 @@
+import logging
+import xml.etree.ElementTree as ET
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Optional
+
+from feedparser import FeedParserDict
+
+logger = logging.getLogger(__name__)
+
+ITUNES_NS = 'http://www.itunes.com/dtds/podcast-1.0.dtd'
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+def _text(item, tag: str) -> str:
+    element = item.find(tag)
+    return (element.text or '').strip() if element is not None else ''
+
+def _item_to_entry(item) -> FeedParserDict:
+    """Map an RSS <item> to the same keys feedparser uses, so one builder handles both"""
+    entry = FeedParserDict()
+    entry['title'] = _text(item, 'title')
+    entry['description'] = _text(item, 'description') or _text(item, f'{{{ITUNES_NS}}}summary')
+    entry['summary'] = entry['description']
+    entry['link'] = _text(item, 'link')
+    entry['id'] = _text(item, 'guid')
+    entry['itunes_duration'] = _text(item, f'{{{ITUNES_NS}}}duration')
+    
+    published = _text(item, 'pubDate')
+    if published:
+        entry['published'] = published
+        try:
+            parsed = parsedate_to_datetime(published)
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc)
+            entry['published_parsed'] = parsed.timetuple()
+        except (TypeError, ValueError):
+            pass
+    
+    # FeedParserDict derives 'enclosures' from links with rel=enclosure
+    entry['links'] = [
+        FeedParserDict(
+            rel='enclosure',
+            href=enclosure.get('url'),
+            type=enclosure.get('type', ''),
+            length=enclosure.get('length')
+        )
+        for enclosure in item.findall('enclosure')
+    ]
+    return entry
+
+def iter_items(stream) -> Iterator[FeedParserDict]:
+    """Yield RSS items in document order while the body is still downloading.
+    
+    Each <item> is dropped from the tree once yielded, so memory stays flat
+    however long the feed is.
+    """
+    channel = None
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        name = _local_name(element.tag)
+        if event == 'start':
+            if name == 'channel':
+                channel = element
+            continue
+        if name == 'item':
+            yield _item_to_entry(element)
+            element.clear()
+            if channel is not None and len(channel) and channel[-1] is element:
+                channel.remove(element)
+
+def entry_guid(entry) -> Optional[str]:
+    """Stable identity of an entry: its GUID, or the enclosure/link when a feed omits it"""
+    guid = entry.get('id') or entry.get('guid')
+    if guid:
+        return guid.strip()[:500]
+    for enclosure in entry.get('enclosures') or []:
+        if enclosure.get('href'):
+            return enclosure['href'][:500]
+    return entry.get('link') or None
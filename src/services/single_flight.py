@@ -0,0 +1,201 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app
+from sqlalchemy import text
+
+from ..models.sync_state import SyncState
+from ..models.video import db
+from .metrics import record_single_flight
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are excluded
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+RESULT_KEY = 'single_flight:{}'
+LOCK_POLL_INTERVAL = 1.0
+UNSAFE_FILENAME = re.compile(r'[^\w.-]')
+
+class SingleFlightTimeout(Exception):
+    """Raised when another run of the operation outlasted SINGLE_FLIGHT_TIMEOUT"""
+
+class _Flight:
+    """A run in this process that callers with the same arguments wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+    
+    def wait(self, timeout: float):
+        if not self.done.wait(timeout):
+            raise SingleFlightTimeout(f'Gave up waiting after {timeout:.0f}s')
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class _AdvisoryLock:
+    """Session-level Postgres advisory lock, held on its own pooled connection"""
+    
+    def __init__(self, operation: str):
+        # Advisory locks take a signed 64-bit key
+        digest = hashlib.sha1(f'gregverse:{operation}'.encode('utf-8')).digest()
+        self.key = int.from_bytes(digest[:8], 'big', signed=True)
+        self.connection = None
+    
+    def try_acquire(self) -> bool:
+        connection = db.engine.connect()
+        try:
+            locked = connection.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': self.key}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not locked:
+            connection.close()
+            return False
+        self.connection = connection
+        return True
+    
+    def release(self):
+        try:
+            self.connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': self.key})
+            self.connection.commit()
+        except Exception as e:
+            # Dropping the session is the only other way to free a session-level lock
+            logger.warning(f"Could not release advisory lock {self.key}: {str(e)}")
+            self.connection.invalidate()
+        finally:
+            self.connection.close()
+            self.connection = None
+
+class _FileLock:
+    """flock() on a lock file: the stand-in for SQLite, whose processes share one host"""
+    
+    def __init__(self, operation: str, directory: str):
+        self.path = os.path.join(directory, 'gregverse-{}.lock'.format(UNSAFE_FILENAME.sub('_', operation)))
+        self.handle = None
+    
+    def try_acquire(self) -> bool:
+        handle = open(self.path, 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self.handle = handle
+        return True
+    
+    def release(self):
+        try:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+        finally:
+            self.handle.close()
+            self.handle = None
+
+class _ThreadLock:
+    """Last resort without fcntl: excludes other threads of this process only"""
+    
+    _locks: Dict[str, threading.Lock] = {}
+    
+    def __init__(self, operation: str):
+        self.lock = self._locks.setdefault(operation, threading.Lock())
+    
+    def try_acquire(self) -> bool:
+        return self.lock.acquire(blocking=False)
+    
+    def release(self):
+        self.lock.release()
+
+_flights: Dict = {}
+_flights_lock = threading.Lock()
+
+def _cross_process_lock(operation: str):
+    if db.engine.dialect.name == 'postgresql':
+        return _AdvisoryLock(operation)
+    if fcntl is not None:
+        return _FileLock(operation, current_app.config.get('SINGLE_FLIGHT_LOCK_DIR') or tempfile.gettempdir())
+    return _ThreadLock(operation)
+
+def single_flight(operation: str, fn: Callable[[], Any], variant: Optional[Dict] = None) -> Any:
+    """Run fn as the only run of this operation across threads, workers and the CLI.
+    
+    A caller arriving while a run with the same variant (the arguments that
+    change the outcome) is in progress gets that run's result instead of
+    starting another: directly within a process, and through the result
+    stored in sync_state across processes. Runs with other variants wait for
+    the lock and then run themselves. fn must return something JSON-safe.
+    """
+    flight_key = (operation, json.dumps(variant, sort_keys=True))
+    with _flights_lock:
+        flight = _flights.get(flight_key)
+        leader = flight is None
+        if leader:
+            flight = _flights[flight_key] = _Flight()
+    
+    if not leader:
+        record_single_flight(operation, 'joined')
+        logger.info(f"{operation} is already running in this process; waiting for its result")
+        return flight.wait(current_app.config.get('SINGLE_FLIGHT_TIMEOUT', 1800))
+    
+    try:
+        flight.result = _run_locked(operation, fn, variant)
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(flight_key, None)
+        flight.done.set()
+
+def _run_locked(operation: str, fn: Callable[[], Any], variant: Optional[Dict]) -> Any:
+    result_key = RESULT_KEY.format(operation)
+    lock = _cross_process_lock(operation)
+    deadline = time.monotonic() + current_app.config.get('SINGLE_FLIGHT_TIMEOUT', 1800)
+    
+    # Which run had finished when we started waiting; a different one afterwards ran meanwhile
+    finished_before = None
+    waited = False
+    while not lock.try_acquire():
+        if not waited:
+            waited = True
+            finished_before = (SyncState.get(result_key, fresh=True) or {}).get('finished_at')
+            logger.info(f"{operation} is running in another process; waiting for it")
+        if time.monotonic() > deadline:
+            raise SingleFlightTimeout(f'{operation} is still running elsewhere')
+        time.sleep(LOCK_POLL_INTERVAL)
+    
+    try:
+        if waited:
+            stored = SyncState.get(result_key, fresh=True) or {}
+            if stored.get('finished_at') != finished_before and stored.get('variant') == variant:
+                record_single_flight(operation, 'reused')
+                return stored['result']
+        
+        result = fn()
+        record_single_flight(operation, 'ran')
+        try:
+            SyncState.put(result_key, {
+                'variant': variant,
+                'result': result,
+                'finished_at': datetime.utcnow().isoformat()
+            })
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Could not store the {operation} result: {str(e)}")
+        return result
+    finally:
+        lock.release()
@@ -0,0 +1,214 @@
+import re
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_current_profile = contextvars.ContextVar('sql_profile', default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r'\(\s*(?:\?|%\([^)]*\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\([^)]*\)s|%s|:\w+))*\s*\)')
+_PLACEHOLDERS = re.compile(r'%\([^)]*\)s|%s|:\w+')
+_WHITESPACE = re.compile(r'\s+')
+
+def statement_shape(statement: str) -> str:
+    """Reduce a statement to its shape so repeated queries group together"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _LITERALS.sub('?', shape)
+    shape = _PLACEHOLDERS.sub('?', shape)
+    return _PLACEHOLDER_LISTS.sub('(?+)', shape)
+
+class QueryProfile:
+    """Every statement run while serving one request (or one profiled block)"""
+    
+    def __init__(self, label: str, slow_ms: float, explain: bool):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.started = time.perf_counter()
+        self.started_at = datetime.utcnow()
+        self.query_count = 0
+        self.total_ms = 0.0
+        self.shapes = OrderedDict()
+        self.slow = []
+    
+    def record(self, conn, statement, parameters, elapsed_ms):
+        self.query_count += 1
+        self.total_ms += elapsed_ms
+        
+        shape = statement_shape(statement)
+        entry = self.shapes.get(shape)
+        if not entry:
+            entry = self.shapes[shape] = {'shape': shape, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+        entry['count'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        
+        if elapsed_ms >= self.slow_ms:
+            slow = {
+                'statement': statement[:2000],
+                'parameters': repr(parameters)[:500],
+                'elapsed_ms': round(elapsed_ms, 2)
+            }
+            if self.explain and statement.lstrip().upper().startswith('SELECT'):
+                slow['plan'] = _explain(conn, statement, parameters)
+            self.slow.append(slow)
+    
+    def n_plus_one(self, threshold: int) -> List[Dict]:
+        """Read shapes repeated often enough to look like a per-item query loop"""
+        return [
+            {'shape': entry['shape'], 'count': entry['count'], 'total_ms': round(entry['total_ms'], 2)}
+            for entry in self.shapes.values()
+            if entry['count'] >= threshold and entry['shape'].upper().startswith('SELECT')
+        ]
+    
+    def summary(self, threshold: int) -> Dict:
+        shapes = sorted(self.shapes.values(), key=lambda e: e['total_ms'], reverse=True)
+        return {
+            'id': self.id,
+            'label': self.label,
+            'at': self.started_at.isoformat(),
+            'duration_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'queries': self.query_count,
+            'sql_time_ms': round(self.total_ms, 2),
+            'distinct_shapes': len(self.shapes),
+            'n_plus_one': self.n_plus_one(threshold),
+            'slow': self.slow,
+            'top_shapes': [
+                {**entry, 'total_ms': round(entry['total_ms'], 2), 'max_ms': round(entry['max_ms'], 2)}
+                for entry in shapes[:10]
+            ]
+        }
+    
+    def header(self, threshold: int) -> str:
+        return (
+            f"queries={self.query_count}; time_ms={self.total_ms:.1f}; "
+            f"shapes={len(self.shapes)}; n_plus_one={len(self.n_plus_one(threshold))}; "
+            f"slow={len(self.slow)}; id={self.id}"
+        )
+
+def _explain(conn, statement, parameters) -> Optional[str]:
+    """Capture a plan on a raw DB-API cursor so engine events don't fire again"""
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+
+class SQLProfiler:
+    """Per-request statement recorder with a ring buffer of recent requests"""
+    
+    def __init__(self, app):
+        self.slow_ms = app.config.get('SQL_PROFILER_SLOW_MS', 50)
+        self.threshold = app.config.get('SQL_PROFILER_N_PLUS_ONE_THRESHOLD', 5)
+        self.explain = app.config.get('SQL_PROFILER_EXPLAIN', False)
+        self.recent = deque(maxlen=app.config.get('SQL_PROFILER_RING_SIZE', 100))
+        self._lock = threading.Lock()
+    
+    def begin(self, label: str):
+        profile = QueryProfile(label, self.slow_ms, self.explain)
+        return profile, _current_profile.set(profile)
+    
+    def end(self, profile: QueryProfile, token, extra: Optional[Dict] = None) -> Dict:
+        _current_profile.reset(token)
+        summary = profile.summary(self.threshold)
+        if extra:
+            summary.update(extra)
+        with self._lock:
+            self.recent.appendleft(summary)
+        if summary['n_plus_one']:
+            logger.warning(
+                f"Possible N+1 in {profile.label}: "
+                + '; '.join(f"{e['count']}x {e['shape'][:120]}" for e in summary['n_plus_one'])
+            )
+        return summary
+    
+    def recent_requests(self, limit: Optional[int] = 50) -> List[Dict]:
+        with self._lock:
+            return list(self.recent)[:limit]
+
+profiler = None
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault('_profiler_query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = conn.info.get('_profiler_query_start')
+    if profile is None or not started:
+        return
+    profile.record(conn, statement, parameters, (time.perf_counter() - started.pop()) * 1000)
+
+def init_sql_profiler(app):
+    """Record SQL per request when SQL_PROFILER_ENABLED is set"""
+    global profiler
+    if not app.config.get('SQL_PROFILER_ENABLED'):
+        return None
+    
+    profiler = SQLProfiler(app)
+    
+    @app.before_request
+    def start_sql_profile():
+        if request.blueprint == 'debug':
+            return
+        g._sql_profile = profiler.begin(f'{request.method} {request.path}')
+    
+    @app.after_request
+    def finish_sql_profile(response):
+        started = g.pop('_sql_profile', None)
+        if started is None:
+            return response
+        profile, token = started
+        profiler.end(profile, token, {
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status': response.status_code
+        })
+        response.headers['X-SQL-Profile'] = profile.header(profiler.threshold)
+        return response
+    
+    @app.teardown_request
+    def abandon_sql_profile(exc):
+        # Flask runs after_request for handled and unhandled errors alike; a profile is
+        # still open here only when debug mode re-raised the error or a later hook failed
+        started = g.pop('_sql_profile', None)
+        if started is not None:
+            profiler.end(started[0], started[1], {'method': request.method, 'path': request.path, 'status': 500})
+    
+    logger.warning("SQL profiler enabled - every statement is being recorded")
+    return profiler
+
+@contextmanager
+def profile_block(label: str, threshold: int = 5):
+    """Profile SQL outside a request (scripts, CLI commands) and log the summary"""
+    profile = QueryProfile(label, slow_ms=float('inf'), explain=False)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+        summary = profile.summary(threshold)
+        print(f"🔎 {label}: {summary['queries']} queries in {summary['sql_time_ms']}ms")
+        for entry in summary['n_plus_one']:
+            print(f"⚠️  Possible N+1: {entry['count']}x {entry['shape'][:120]}")
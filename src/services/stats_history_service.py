@@ -0,0 +1,159 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from flask import current_app
+
+from ..models.youtube_stats import YouTubeStats, YouTubeStatsRollup
+
+logger = logging.getLogger(__name__)
+
+# Raw column and rollup column for every chartable metric
+METRIC_COLUMNS = {
+    'subscriber_count': ('subscriber_count', 'subscriber_last'),
+    'total_views': ('total_views', 'views_last'),
+    'video_count': ('video_count', 'video_count_last'),
+}
+
+EPOCH = datetime(1970, 1, 1)
+
+RESOLUTION_SECONDS = {
+    'hour': 3600,
+    'day': 86400,
+}
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling, returns indices of the kept points"""
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1][:max(threshold, 0)], dtype=np.int64)
+    
+    # First and last points are always kept, the rest is split into equal buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        
+        # Average of the next bucket is the third triangle vertex
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[a] - avg_x) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    
+    return selected
+
+class StatsHistoryService:
+    def __init__(self):
+        self.max_source_rows = current_app.config.get('STATS_HISTORY_MAX_SOURCE_ROWS', 5000)
+        self.raw_interval = current_app.config.get('STATS_UPDATE_INTERVAL', 600)
+        self.raw_retention = timedelta(days=current_app.config.get('STATS_RAW_RETENTION_DAYS', 30))
+        self.hourly_retention = timedelta(days=current_app.config.get('STATS_HOURLY_RETENTION_DAYS', 400))
+    
+    def pick_resolution(self, start: datetime, end: datetime) -> str:
+        """Pick the finest resolution that is retained for the range and fits the row budget"""
+        now = datetime.utcnow()
+        span = max((end - start).total_seconds(), 1)
+        
+        if start >= now - self.raw_retention and span / self.raw_interval <= self.max_source_rows:
+            return 'raw'
+        if start >= now - self.hourly_retention and span / RESOLUTION_SECONDS['hour'] <= self.max_source_rows:
+            return 'hour'
+        return 'day'
+    
+    def etag_for(self, metric: str, start: datetime, end: datetime, points: int) -> str:
+        """Build an ETag from the request and the newest sample, without touching the history"""
+        latest = YouTubeStats.get_latest_cached()
+        key = '|'.join([
+            metric,
+            self.pick_resolution(start, end),
+            start.isoformat(),
+            end.isoformat(),
+            str(points),
+            # The no-data fallback is stamped with the current time on every call
+            'none' if latest.get('is_fallback') else str(latest.get('updated_at')),
+        ])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    def _load_series(self, metric: str, resolution: str, start: datetime, end: datetime) -> Tuple[np.ndarray, np.ndarray]:
+        raw_column, rollup_column = METRIC_COLUMNS[metric]
+        
+        if resolution == 'raw':
+            rows = YouTubeStats.query.with_entities(
+                YouTubeStats.updated_at, getattr(YouTubeStats, raw_column)
+            ).filter(
+                YouTubeStats.updated_at >= start,
+                YouTubeStats.updated_at <= end
+            ).order_by(YouTubeStats.updated_at.asc()).all()
+        else:
+            rows = YouTubeStatsRollup.query.with_entities(
+                YouTubeStatsRollup.last_sample_at, getattr(YouTubeStatsRollup, rollup_column)
+            ).filter(
+                YouTubeStatsRollup.resolution == resolution,
+                YouTubeStatsRollup.bucket_start >= YouTubeStatsRollup.bucket_for(start, resolution),
+                YouTubeStatsRollup.bucket_start <= end
+            ).order_by(YouTubeStatsRollup.bucket_start.asc()).all()
+        
+        if not rows:
+            return np.empty(0), np.empty(0)
+        
+        x = np.fromiter(((row[0] - EPOCH).total_seconds() for row in rows), dtype=np.float64, count=len(rows))
+        y = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        return x, y
+    
+    def get_history(self, metric: str, start: datetime, end: datetime, points: int) -> Dict:
+        """Return at most `points` samples of a metric between start and end"""
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric: {metric}")
+        
+        resolution = self.pick_resolution(start, end)
+        x, y = self._load_series(metric, resolution, start, end)
+        keep = lttb(x, y, points)
+        
+        series: List[Dict] = [
+            {
+                'timestamp': (EPOCH + timedelta(seconds=float(x[i]))).isoformat(),
+                'value': int(y[i])
+            }
+            for i in keep
+        ]
+        
+        return {
+            'metric': metric,
+            'resolution': resolution,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'source_points': len(x),
+            'returned_points': len(series),
+            'points': series
+        }
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO-8601 timestamp or unix seconds into a naive UTC datetime"""
+    if not value:
+        return None
+    try:
+        return EPOCH + timedelta(seconds=float(value))
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
@@ -0,0 +1,130 @@
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+class KeywordClassifier:
+    """All keyword rules compiled into one regex, so a document is scanned once.
+    
+    Rules are (label, phrases) pairs in priority order. Phrases match whole
+    words only ("ai" no longer hits "said"), plus a plural -s/-es ("startups",
+    "businesses"), case-insensitively, with any run of whitespace between
+    words. Like an Aho-Corasick pass, every rule whose
+    phrase occurs is reported, including phrases that start another phrase.
+    """
+    
+    def __init__(self, rules: Sequence[Tuple[str, Sequence[str]]]):
+        self.labels = [label for label, _ in rules]
+        
+        phrases: Dict[Tuple[str, ...], Set[int]] = {}
+        for index, (_, keywords) in enumerate(rules):
+            for keyword in keywords:
+                phrases.setdefault(tuple(keyword.lower().split()), set()).add(index)
+        
+        # A match reports its own rules plus those of every phrase that is a word-prefix of it
+        self._rules_by_phrase = {
+            ' '.join(words): set().union(*[
+                indexes for other, indexes in phrases.items() if words[:len(other)] == other
+            ])
+            for words in phrases
+        }
+        
+        alternatives = sorted(
+            (r'\s+'.join(re.escape(word) for word in words) for words in phrases),
+            key=len,
+            reverse=True
+        )
+        # Zero-width lookahead so overlapping phrases are all seen in the same pass; the
+        # plural suffix sits outside the group so the match still names its phrase
+        self._pattern = re.compile(r'(?<!\w)(?=(' + '|'.join(alternatives) + r')(?:e?s)?(?!\w))')
+    
+    def _rule_indexes(self, text: str) -> Set[int]:
+        found = set()
+        for match in self._pattern.finditer(text.lower()):
+            found |= self._rules_by_phrase[' '.join(match.group(1).split())]
+        return found
+    
+    def match(self, text: Optional[str]) -> List[str]:
+        """Labels of every rule that matches, in rule order"""
+        if not text:
+            return []
+        return [self.labels[index] for index in sorted(self._rule_indexes(text))]
+    
+    def first(self, text: Optional[str], default: Optional[str] = None) -> Optional[str]:
+        """Label of the highest-priority rule that matches"""
+        if not text:
+            return default
+        indexes = self._rule_indexes(text)
+        return self.labels[min(indexes)] if indexes else default
+    
+    def match_many(self, texts: Iterable[Optional[str]]) -> List[List[str]]:
+        return [self.match(text) for text in texts]
+    
+    def first_many(self, texts: Iterable[Optional[str]], default: Optional[str] = None) -> List[Optional[str]]:
+        return [self.first(text, default) for text in texts]
+
+# Tags are the keywords themselves
+PODCAST_TAGS = KeywordClassifier([
+    (keyword, [keyword]) for keyword in [
+        'startup', 'entrepreneur', 'business', 'saas', 'ai', 'tech',
+        'marketing', 'growth', 'funding', 'venture capital', 'vc',
+        'product', 'strategy', 'innovation', 'digital', 'ecommerce',
+        'fintech', 'healthtech', 'edtech', 'marketplace', 'platform'
+    ]
+])
+
+DEFAULT_VIDEO_CATEGORY = 'Business Building'
+
+VIDEO_CATEGORIES = KeywordClassifier([
+    ('AI Tools', ['ai', 'artificial intelligence', 'chatgpt', 'gpt', 'claude']),
+    ('Startup Ideas', ['startup', 'business idea', 'entrepreneur']),
+    ('Interviews', ['interview', 'guest', 'conversation']),
+    ('No-Code', ['no-code', 'nocode', 'bubble', 'webflow']),
+    ('Marketing', ['marketing', 'growth', 'seo', 'social media']),
+])
+
+# Tried in order; the first pattern that matches wins
+EPISODE_NUMBER_PATTERNS = [
+    re.compile(r'Episode\s+(\d+)', re.IGNORECASE),
+    re.compile(r'Ep\s+(\d+)', re.IGNORECASE),
+    re.compile(r'#(\d+)'),
+    re.compile(r'(\d+):'),  # Number followed by colon
+]
+
+GUEST_PATTERNS = [
+    re.compile(r'with\s+([A-Z][a-z]+\s+[A-Z][a-z]+)', re.IGNORECASE),  # "with John Doe"
+    re.compile(r'featuring\s+([A-Z][a-z]+\s+[A-Z][a-z]+)', re.IGNORECASE),  # "featuring Jane Smith"
+    re.compile(r'guest:\s*([A-Z][a-z]+\s+[A-Z][a-z]+)', re.IGNORECASE),  # "guest: Bob Johnson"
+    re.compile(r'interviews?\s+([A-Z][a-z]+\s+[A-Z][a-z]+)', re.IGNORECASE),  # "interview John Doe"
+]
+
+GUEST_FALSE_POSITIVES = {'greg isenberg', 'startup ideas', 'the startup'}
+
+def extract_tags(text: Optional[str]) -> List[str]:
+    """Podcast tags found in text, in a stable order so re-syncs compare equal"""
+    return PODCAST_TAGS.match(text)
+
+def extract_episode_number(title: str) -> Optional[int]:
+    for pattern in EPISODE_NUMBER_PATTERNS:
+        match = pattern.search(title or '')
+        if match:
+            return int(match.group(1))
+    return None
+
+def extract_guest_name(title: str, description: Optional[str]) -> Optional[str]:
+    text = f"{title} {description or ''}"
+    for pattern in GUEST_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            guest_name = match.group(1).strip()
+            if guest_name.lower() not in GUEST_FALSE_POSITIVES:
+                return guest_name
+    return None
+
+def categorize_video(title: Optional[str], description: Optional[str]) -> str:
+    return VIDEO_CATEGORIES.first(f"{title or ''} {description or ''}", DEFAULT_VIDEO_CATEGORY)
+
+def categorize_videos(items: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[str]:
+    """Categories for many (title, description) pairs, for bulk syncs and re-categorization"""
+    return VIDEO_CATEGORIES.first_many(
+        (f"{title or ''} {description or ''}" for title, description in items),
+        DEFAULT_VIDEO_CATEGORY
+    )
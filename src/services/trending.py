@@ -0,0 +1,51 @@
+import math
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from flask import current_app
+
+from ..models.video import Video
+
+EPOCH = datetime(2020, 1, 1)
+
+def _tau_hours() -> float:
+    return current_app.config.get('TRENDING_TAU_HOURS', 24)
+
+def _decay_units(at: datetime) -> float:
+    return (at - EPOCH).total_seconds() / 3600 / _tau_hours()
+
+def trending_score(key: Optional[float], at: datetime) -> float:
+    """Decayed views/hour at `at` for a stored trending_key"""
+    if key is None:
+        return 0.0
+    return math.exp(key - _decay_units(at))
+
+def trending_key(previous_key: Optional[float], new_views: int, elapsed_hours: float, at: datetime) -> Optional[float]:
+    """Fold views gained over the last elapsed_hours into a video's trending_key.
+    
+    The key is ln(score) + t/TAU. Every score decays by the same factor as
+    time passes, so keys never need rewriting to stay comparable: ordering by
+    the stored key is ordering by the current score, and the top videos are
+    an index scan.
+    """
+    # Views are taken to have come in evenly since the last refresh, so a week's
+    # views counted by a weekly refresh weigh less than the same views in an hour
+    tau_hours = _tau_hours()
+    window = elapsed_hours / tau_hours
+    weight = (1 - math.exp(-window)) / window if window > 0 else 1.0
+    score = trending_score(previous_key, at) + max(new_views, 0) / tau_hours * weight
+    if score <= 0:
+        return previous_key
+    return math.log(score) + _decay_units(at)
+
+def trending_videos(limit: int = 10, now: Optional[datetime] = None) -> List[Tuple[Video, float]]:
+    """The `limit` videos with the highest current score, with that score in views/hour"""
+    now = now or datetime.utcnow()
+    min_score = current_app.config.get('TRENDING_MIN_SCORE', 1)
+    if min_score > 0:
+        listed = Video.trending_key > math.log(min_score) + _decay_units(now)
+    else:
+        # No floor: every video with views since its first refresh is listed
+        listed = Video.trending_key.isnot(None)
+    videos = Video.query.filter(listed).order_by(Video.trending_key.desc()).limit(limit).all()
+    return [(video, trending_score(video.trending_key, now)) for video in videos]
@@ -0,0 +1,200 @@
+import re
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from ..models.video import Video, db
+from .text_extraction import DEFAULT_VIDEO_CATEGORY, VIDEO_CATEGORIES
+from .overview_service import OverviewMaterializer
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r'[a-z0-9]+(?:[-+][a-z0-9]+)*')
+TITLE_WEIGHT = 2  # Title words count this many times; titles say more per word than descriptions
+WRITE_BATCH_SIZE = 500
+# A stored confidence is rewritten only when it moved more than this
+CONFIDENCE_TOLERANCE = 0.05
+
+def tokenize(title: Optional[str], description: Optional[str]) -> List[str]:
+    """Unigrams and bigrams of the title (weighted) and description"""
+    tokens = []
+    for text, weight in ((title, TITLE_WEIGHT), (description, 1)):
+        words = TOKEN.findall((text or '').lower())
+        grams = words + [f'{first} {second}' for first, second in zip(words, words[1:])]
+        tokens.extend(grams * weight)
+    return tokens
+
+class TfidfVectorizer:
+    """Sublinear TF-IDF over a vocabulary of terms seen in at least min_df documents"""
+    
+    def __init__(self, min_df: int = 2, max_features: int = 20000):
+        self.min_df = min_df
+        self.max_features = max_features
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = None
+    
+    def fit_transform(self, documents: Sequence[List[str]]) -> sparse.csr_matrix:
+        document_frequency = Counter(term for tokens in documents for term in set(tokens))
+        terms = [term for term, count in document_frequency.most_common(self.max_features) if count >= self.min_df]
+        self.vocabulary = {term: index for index, term in enumerate(sorted(terms))}
+        
+        df = np.array([document_frequency[term] for term in sorted(terms)], dtype=np.float64)
+        self.idf = np.log((1 + len(documents)) / (1 + df)) + 1
+        return self.transform(documents)
+    
+    def transform(self, documents: Sequence[List[str]]) -> sparse.csr_matrix:
+        rows, columns = [], []
+        for row, tokens in enumerate(documents):
+            for term in tokens:
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+        
+        # Duplicate (row, column) pairs are summed into term counts
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, columns)),
+            shape=(len(documents), len(self.vocabulary))
+        )
+        counts.sum_duplicates()
+        counts.data = 1 + np.log(counts.data)
+        weighted = counts.multiply(self.idf).tocsr()
+        
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ weighted
+
+class SoftmaxClassifier:
+    """Multinomial logistic regression with L2, trained by full-batch gradient descent"""
+    
+    def __init__(self, l2: float = 1e-4, learning_rate: float = 2.0, iterations: int = 300):
+        self.l2 = l2
+        self.learning_rate = learning_rate
+        self.iterations = iterations
+        self.labels: List[str] = []
+        self.weights = None
+        self.bias = None
+    
+    def fit(self, features: sparse.csr_matrix, labels: Sequence[str]) -> 'SoftmaxClassifier':
+        self.labels = sorted(set(labels))
+        index = {label: position for position, label in enumerate(self.labels)}
+        targets = np.zeros((features.shape[0], len(self.labels)))
+        targets[np.arange(features.shape[0]), [index[label] for label in labels]] = 1
+        
+        self.weights = np.zeros((features.shape[1], len(self.labels)))
+        self.bias = np.log(targets.mean(axis=0))
+        for _ in range(self.iterations):
+            error = (self.predict_proba(features) - targets) / features.shape[0]
+            self.weights -= self.learning_rate * (features.T @ error + self.l2 * self.weights)
+            self.bias -= self.learning_rate * error.sum(axis=0)
+        return self
+    
+    def predict_proba(self, features: sparse.csr_matrix) -> np.ndarray:
+        scores = features @ self.weights + self.bias
+        scores -= scores.max(axis=1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+class VideoCategorizer:
+    """TF-IDF plus softmax regression, trained on the keyword rules' labels.
+    
+    The keyword rules only see their exact phrases; the model also learns the
+    words that travel with them ("llm", "agents" next to "ai"). Each labeled
+    video is predicted by a model trained on the other folds, so a rule label
+    is only overridden when the rest of the catalog disagrees with it, and
+    confidences are honest rather than memorised. Videos no rule matched are
+    unlabeled and only get a category the model is confident about.
+    """
+    
+    def __init__(self, min_seed_documents: int = 20, folds: int = 5, min_confidence: float = 0.6, l2: float = 1e-2):
+        self.min_seed_documents = min_seed_documents
+        self.folds = folds
+        self.min_confidence = min_confidence
+        self.l2 = l2
+        self.vectorizer = TfidfVectorizer()
+    
+    def _out_of_fold(self, features: sparse.csr_matrix, seeds: List[Optional[str]], labels: List[str]) -> np.ndarray:
+        """Probabilities over `labels` for every row, never from a model that saw that row's label"""
+        labeled = np.array([index for index, seed in enumerate(seeds) if seed is not None])
+        unlabeled = np.array([index for index, seed in enumerate(seeds) if seed is None], dtype=int)
+        fold_of = np.random.default_rng(0).permutation(len(labeled)) % self.folds
+        
+        probabilities = np.zeros((len(seeds), len(labels)))
+        for fold in range(self.folds + 1):
+            # The last pass trains on every labeled row and only predicts the unlabeled ones
+            train = labeled[fold_of != fold] if fold < self.folds else labeled
+            predict = labeled[fold_of == fold] if fold < self.folds else unlabeled
+            if not len(predict):
+                continue
+            model = SoftmaxClassifier(l2=self.l2).fit(features[train], [seeds[index] for index in train])
+            # A fold may lack a rare class; its columns stay zero
+            columns = [labels.index(label) for label in model.labels]
+            probabilities[np.ix_(predict, columns)] = model.predict_proba(features[predict])
+        return probabilities
+    
+    def classify(self, items: Sequence[Tuple[Optional[str], Optional[str]]]) -> Tuple[List[str], np.ndarray]:
+        """(category, confidence) for every (title, description), in one pass over the catalog"""
+        seeds = VIDEO_CATEGORIES.first_many(f"{title or ''} {description or ''}" for title, description in items)
+        labels = sorted({seed for seed in seeds if seed is not None})
+        if sum(seed is not None for seed in seeds) < self.min_seed_documents or len(labels) < 2:
+            # Too little to learn from: the rules' answer, with no confidence behind it
+            return [seed or DEFAULT_VIDEO_CATEGORY for seed in seeds], np.full(len(items), np.nan)
+        
+        features = self.vectorizer.fit_transform([tokenize(title, description) for title, description in items])
+        probabilities = self._out_of_fold(features, seeds, labels)
+        
+        categories = []
+        confidences = np.full(len(items), np.nan)
+        for row, (seed, scores) in enumerate(zip(seeds, probabilities)):
+            best = int(scores.argmax())
+            if scores[best] >= self.min_confidence:
+                categories.append(labels[best])
+                confidences[row] = scores[best]
+            elif seed is not None:
+                # Not sure enough to overrule the keyword rule
+                categories.append(seed)
+                confidences[row] = scores[labels.index(seed)]
+            else:
+                categories.append(DEFAULT_VIDEO_CATEGORY)
+        return categories, confidences
+
+def recategorize_videos() -> Dict:
+    """Classify the whole catalog and write back only rows whose category or confidence changed"""
+    rows = db.session.query(Video.id, Video.title, Video.description, Video.category, Video.category_confidence).all()
+    if not rows:
+        return {'videos': 0, 'changed_categories': 0, 'updated_rows': 0, 'categories': {}}
+    
+    categories, confidences = VideoCategorizer().classify([(row.title, row.description) for row in rows])
+    
+    mappings = []
+    changed_categories = 0
+    for row, category, confidence in zip(rows, categories, confidences):
+        confidence = None if np.isnan(confidence) else round(float(confidence), 4)
+        category_changed = row.category != category
+        confidence_changed = (
+            (confidence is None) != (row.category_confidence is None)
+            or (confidence is not None and abs(confidence - row.category_confidence) > CONFIDENCE_TOLERANCE)
+        )
+        if category_changed or confidence_changed:
+            changed_categories += category_changed
+            mappings.append({'id': row.id, 'category': category, 'category_confidence': confidence})
+    
+    for start in range(0, len(mappings), WRITE_BATCH_SIZE):
+        db.session.bulk_update_mappings(Video, mappings[start:start + WRITE_BATCH_SIZE])
+    db.session.commit()
+    if changed_categories:
+        OverviewMaterializer.refresh_quietly(['content'])
+    
+    known = confidences[~np.isnan(confidences)]
+    logger.info(f"Recategorized {len(rows)} videos: {changed_categories} changed category, {len(mappings)} rows written")
+    return {
+        'videos': len(rows),
+        'changed_categories': changed_categories,
+        'updated_rows': len(mappings),
+        'categories': dict(Counter(categories)),
+        'mean_confidence': round(float(known.mean()), 4) if known.size else None,
+        'low_confidence': int((known < 0.5).sum())
+    }
@@ -0,0 +1,157 @@
+import math
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from flask import current_app
+
+from ..models.sync_state import SyncState
+from ..models.video import Video, VideoViewSample, db
+from .overview_service import OverviewMaterializer
+from .single_flight import single_flight
+from .trending import trending_key
+from .youtube_quota import QUOTA_TIMEZONE, QuotaManager
+from .youtube_service import YouTubeService
+
+logger = logging.getLogger(__name__)
+
+# (tier, younger than N days, or at least N views/day, refresh every N seconds);
+# a video takes the first tier it qualifies for, hottest first
+REFRESH_TIERS = (
+    ('hot', 2, 1000, 3600),
+    ('new', 14, 200, 6 * 3600),
+    ('warm', 90, 20, 24 * 3600),
+    ('cold', None, None, 7 * 24 * 3600),
+)
+TIER_NAMES = [tier[0] for tier in REFRESH_TIERS]
+COLD_INTERVAL = REFRESH_TIERS[-1][3]
+
+# Older observations of a video's views/day count half as much after this long
+VELOCITY_HALF_LIFE_DAYS = 3.0
+BATCH_SIZE = 50  # ids per videos.list call, 1 quota unit each
+BUDGET_KEY = 'youtube:view_refresh:units:{}'
+
+def refresh_tier(age_days: float, velocity: Optional[float]):
+    """(tier, refresh interval in seconds) for a video of this age and views/day"""
+    for tier, max_age, min_velocity, interval in REFRESH_TIERS:
+        if max_age is None or age_days < max_age or (velocity is not None and velocity >= min_velocity):
+            return tier, interval
+
+def smoothed_velocity(previous: Optional[float], delta: int, elapsed_days: float) -> float:
+    """Exponentially weighted views/day; the weight of the new rate grows with the time it covers"""
+    rate = max(delta, 0) / elapsed_days
+    if previous is None:
+        return rate
+    weight = 1 - 0.5 ** (elapsed_days / VELOCITY_HALF_LIFE_DAYS)
+    return previous + weight * (rate - previous)
+
+class ViewRefresher:
+    """Refreshes view counts of due videos within a daily YouTube quota budget.
+    
+    Each run gets an equal share of what is left of today's budget for the
+    runs still to come, so the budget lasts the whole quota day; unspent units
+    roll over to later runs. Within a run never-refreshed videos go first, then
+    the hottest tiers.
+    """
+    
+    def __init__(self, daily_budget: Optional[int] = None, interval: Optional[int] = None,
+                 service: Optional[YouTubeService] = None):
+        self.daily_budget = daily_budget if daily_budget is not None else current_app.config.get('VIEW_REFRESH_DAILY_QUOTA', 500)
+        self.interval = interval or current_app.config.get('VIEW_REFRESH_INTERVAL', 900)
+        self.service = service or YouTubeService(priority='backfill')
+    
+    def units_for_run(self) -> int:
+        used = SyncState.get(BUDGET_KEY.format(QuotaManager.quota_day().isoformat()), 0)
+        remaining = self.daily_budget - used
+        if remaining <= 0:
+            return 0
+        now = datetime.now(QUOTA_TIMEZONE)
+        # localize picks the UTC offset in effect at midnight, which differs from now's on DST changes
+        day_end = QUOTA_TIMEZONE.localize(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+        runs_left = max(math.ceil((day_end - now).total_seconds() / self.interval), 1)
+        return math.ceil(remaining / runs_left)
+    
+    def run(self) -> Dict:
+        return single_flight('refresh_views', self._refresh)
+    
+    def _refresh(self) -> Dict:
+        units = self.units_for_run()
+        now = datetime.utcnow()
+        due = Video.due_for_view_refresh(now, units * BATCH_SIZE, TIER_NAMES) if units else []
+        if not due:
+            return {'refreshed_videos': 0, 'changed_videos': 0, 'missing_videos': 0, 'quota_units': 0, 'tiers': {}}
+        
+        details = self.service.get_video_details([row.youtube_id for row in due])
+        if not details:
+            # Quota refused or the API is down; the same videos stay due for the next run
+            logger.warning(f"No view counts returned for {len(due)} due videos")
+            return {'refreshed_videos': 0, 'changed_videos': 0, 'missing_videos': 0, 'quota_units': 0, 'tiers': {}}
+        # Charged even for batches that failed, which keeps the budget on the safe side
+        spent = math.ceil(len(due) / BATCH_SIZE)
+        
+        mappings = []
+        samples = []
+        tiers = Counter()
+        missing = 0
+        for row in due:
+            fresh = details.get(row.youtube_id)
+            if fresh is None:
+                # Private, deleted or a failed batch: look again much later
+                missing += 1
+                mappings.append({'id': row.id, 'next_refresh_at': now + timedelta(seconds=COLD_INTERVAL)})
+                continue
+            
+            view_count = fresh['view_count']
+            velocity = row.view_velocity
+            delta = None
+            # Diffed against this refresher's own last count: a sync in between also
+            # updates view_count, and diffing against that would drop its share of the views
+            if row.views_refreshed_at is not None and row.refreshed_view_count is not None:
+                delta = view_count - row.refreshed_view_count
+                elapsed_days = max((now - row.views_refreshed_at).total_seconds() / 86400, 1 / 1440)
+                velocity = smoothed_velocity(velocity, delta, elapsed_days)
+            
+            age_days = (now - row.published_at).total_seconds() / 86400 if row.published_at else 0
+            tier, interval = refresh_tier(age_days, velocity)
+            tiers[tier] += 1
+            mapping = {
+                'id': row.id,
+                'view_count': view_count,
+                'refreshed_view_count': view_count,
+                'view_velocity': velocity,
+                'refresh_tier': tier,
+                'views_refreshed_at': now,
+                'next_refresh_at': now + timedelta(seconds=interval)
+            }
+            if delta:
+                mapping['trending_key'] = trending_key(row.trending_key, delta, elapsed_days * 24, now)
+            mappings.append(mapping)
+            if delta != 0:
+                samples.append({'video_id': row.id, 'sampled_at': now, 'view_count': view_count, 'delta': delta})
+        
+        db.session.bulk_update_mappings(Video, mappings)
+        if samples:
+            db.session.bulk_insert_mappings(VideoViewSample, samples)
+        retention = current_app.config.get('VIEW_SAMPLE_RETENTION_DAYS', 30)
+        VideoViewSample.prune(now - timedelta(days=retention))
+        
+        budget_key = BUDGET_KEY.format(QuotaManager.quota_day().isoformat())
+        SyncState.put(budget_key, SyncState.get(budget_key, 0) + spent)
+        db.session.commit()
+        
+        changed = sum(1 for sample in samples if sample['delta'])
+        logger.info(
+            f"Refreshed views of {len(due) - missing} videos ({changed} changed, {missing} missing) "
+            f"for {spent} quota units: {dict(tiers)}"
+        )
+        if changed:
+            OverviewMaterializer.refresh_quietly(['content'])
+        
+        return {
+            'refreshed_videos': len(due) - missing,
+            'changed_videos': changed,
+            'missing_videos': missing,
+            'quota_units': spent,
+            'tiers': dict(tiers)
+        }
@@ -0,0 +1,161 @@
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict
+
+import pytz
+
+from ..models.youtube_stats import YouTubeQuotaUsage
+from .metrics import record_quota
+
+logger = logging.getLogger(__name__)
+
+# Units charged per call, from the YouTube Data API v3 quota table
+ENDPOINT_COSTS = {
+    'channels.list': 1,
+    'playlistItems.list': 1,
+    'videos.list': 1,
+    'search.list': 100,
+}
+
+# Share of the daily budget (and of the burst bucket) each priority must leave for those above it
+PRIORITY_RESERVE = {
+    'interactive': 0.0,  # stats shown to users, socket connects
+    'sync': 0.1,         # scheduled video syncs
+    'backfill': 0.3,     # enrichment backfills, health probes
+}
+
+# How long a call may wait for bucket tokens before it is refused
+PRIORITY_MAX_WAIT = {
+    'interactive': 1.0,
+    'sync': 30.0,
+    'backfill': 30.0,
+}
+
+QUOTA_TIMEZONE = pytz.timezone('America/Los_Angeles')
+
+class QuotaExceeded(Exception):
+    """Raised instead of calling the API; callers fall back to cached data"""
+
+class QuotaManager:
+    """Daily YouTube quota accounting plus a token bucket that paces calls by priority.
+    
+    Usage is persisted per quota day so restarts and other workers see it; the
+    in-process view is re-read from the database every refresh_interval seconds.
+    """
+    
+    def __init__(self, daily_budget: int = 10000, rate: float = 1.0, burst: int = 20,
+                 refresh_interval: float = 60):
+        self.daily_budget = daily_budget
+        self.rate = rate
+        self.burst = burst
+        self.refresh_interval = refresh_interval
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._day = None
+        self._used: Dict[str, int] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+    
+    def configure(self, daily_budget: int, rate: float, burst: int):
+        """Replace the budget and bucket settings; the bucket starts full again"""
+        with self._lock:
+            self.daily_budget = daily_budget
+            self.rate = rate
+            self.burst = burst
+            self._tokens = float(burst)
+            self._refilled_at = time.monotonic()
+    
+    @staticmethod
+    def quota_day():
+        return datetime.now(QUOTA_TIMEZONE).date()
+    
+    def _sync_usage(self):
+        day = self.quota_day()
+        if day == self._day and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        try:
+            used = YouTubeQuotaUsage.used_on(day)
+        except Exception as e:
+            logger.warning(f"Could not load YouTube quota usage: {str(e)}")
+            used = self._used if day == self._day else {}
+        self._day = day
+        self._used = used
+        self._loaded_at = time.monotonic()
+    
+    @property
+    def used(self) -> int:
+        return sum(self._used.values())
+    
+    @property
+    def remaining(self) -> int:
+        return max(self.daily_budget - self.used, 0)
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+    
+    def acquire(self, endpoint: str, priority: str = 'sync'):
+        """Reserve the units for one call, waiting for bucket tokens if needed.
+        
+        Raises QuotaExceeded when the call would eat into the reserve kept for
+        higher priorities, or when tokens do not free up in time.
+        """
+        cost = ENDPOINT_COSTS.get(endpoint, 1)
+        reserve = PRIORITY_RESERVE.get(priority, PRIORITY_RESERVE['backfill'])
+        deadline = time.monotonic() + PRIORITY_MAX_WAIT.get(priority, 30.0)
+        
+        while True:
+            with self._lock:
+                self._sync_usage()
+                if self.remaining - cost < self.daily_budget * reserve:
+                    record_quota(endpoint, priority, denied=True, remaining=self.remaining)
+                    raise QuotaExceeded(
+                        f"YouTube quota reserved for higher priorities ({self.remaining} of {self.daily_budget} units left)"
+                    )
+                
+                self._refill()
+                if self._tokens - cost >= self.burst * reserve:
+                    self._tokens -= cost
+                    self._used[endpoint] = self._used.get(endpoint, 0) + cost
+                    day = self._day
+                    break
+                wait = (cost + self.burst * reserve - self._tokens) / self.rate
+            
+            if time.monotonic() + wait > deadline:
+                record_quota(endpoint, priority, denied=True, remaining=self.remaining)
+                raise QuotaExceeded(f"YouTube API rate limit: no {priority} capacity for {endpoint}")
+            time.sleep(wait)
+        
+        record_quota(endpoint, priority, units=cost, remaining=self.remaining)
+        try:
+            YouTubeQuotaUsage.add(day, endpoint, cost)
+        except Exception as e:
+            # Accounting must never fail the call itself
+            logger.warning(f"Could not record YouTube quota usage: {str(e)}")
+    
+    def status(self) -> Dict:
+        with self._lock:
+            self._sync_usage()
+            self._refill()
+            return {
+                'day': self._day.isoformat(),
+                'daily_budget': self.daily_budget,
+                'used': self.used,
+                'remaining': self.remaining,
+                'by_endpoint': dict(self._used),
+                'bucket_tokens': round(self._tokens, 1)
+            }
+
+youtube_quota = QuotaManager()
+
+def init_youtube_quota(app):
+    """Apply the YOUTUBE_DAILY_QUOTA / YOUTUBE_QUOTA_* settings to the shared quota manager"""
+    youtube_quota.configure(
+        daily_budget=app.config.get('YOUTUBE_DAILY_QUOTA', 10000),
+        rate=app.config.get('YOUTUBE_QUOTA_RATE', 1.0),
+        burst=app.config.get('YOUTUBE_QUOTA_BURST', 20)
+    )
+    return youtube_quota
@@ -1,15 +1,68 @@
 import os
-import requests
+import re
 import time
+import threading
+import requests
 from datetime import datetime
+from flask import current_app
 from ..models.youtube_stats import YouTubeStats
-from ..models.video import Video, db
+from ..models.video import Video, VideoViewSample, db
+from ..models.upsert import bulk_upsert
+from ..models.sync_state import SyncState
+from .overview_service import OverviewMaterializer
+from .metrics import track_external
+from .text_extraction import categorize_video, categorize_videos
+from .http_session import RETRY_STATUSES, build_session, retry_delay
+from .youtube_quota import QuotaExceeded, youtube_quota
+from .single_flight import single_flight
+
+# Default of YOUTUBE_API_BASE_URL, which can point syncs at scripts/replay_server.py
+YOUTUBE_API_BASE_URL = 'https://www.googleapis.com/youtube/v3'
+
+_youtube_session = None
+_youtube_session_lock = threading.Lock()
+
+def youtube_session():
+    """Pooled session shared by the process, built with YOUTUBE_HTTP_POOL_SIZE on first use.
+    
+    It never retries by itself: every retry is a billed call, so YouTubeService
+    retries instead and charges each attempt to the quota.
+    """
+    global _youtube_session
+    with _youtube_session_lock:
+        if _youtube_session is None:
+            # Google APIs only gzip responses for clients whose User-Agent contains "gzip"
+            _youtube_session = build_session(
+                'Gregverse/1.0 (gzip)',
+                retries=0,
+                pool_size=current_app.config.get('YOUTUBE_HTTP_POOL_SIZE', 10)
+            )
+        return _youtube_session
+
+ISO_DURATION = re.compile(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+def parse_duration(value):
+    """ISO-8601 duration from contentDetails ("PT1H2M3S") in seconds, None if unparseable"""
+    match = ISO_DURATION.match(value or '')
+    if not match:
+        return None
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
 
 class YouTubeService:
-    def __init__(self):
+    # channel_id -> uploads playlist id, shared by every instance in the process
+    _uploads_playlists = {}
+    
+    def __init__(self, priority='sync'):
         self.api_key = os.getenv('YOUTUBE_API_KEY')
         self.channel_id = os.getenv('YOUTUBE_CHANNEL_ID', 'UCGy7SkBjcIAgTiwkXEtPnYg')
-        self.base_url = 'https://www.googleapis.com/youtube/v3'
+        self.base_url = current_app.config.get('YOUTUBE_API_BASE_URL', YOUTUBE_API_BASE_URL)
+        self.session = youtube_session()
+        self.retries = current_app.config.get('YOUTUBE_HTTP_RETRIES', 3)
+        self.backoff = current_app.config.get('YOUTUBE_HTTP_BACKOFF', 0.5)
+        # Quota priority of list calls; channel stats are always 'interactive'
+        self.priority = priority
+        self.last_sync = None
         
     def get_channel_stats(self):
         """Get real-time channel statistics"""
@@ -17,7 +70,6 @@ class YouTubeService:
             print("Warning: No YouTube API key found, using cached data")
             return YouTubeStats.get_latest_cached()
         
-        url = f"{self.base_url}/channels"
         params = {
             'part': 'statistics',
             'id': self.channel_id,
@@ -25,9 +77,7 @@ class YouTubeService:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._api_get('channels.list', 'channels', params, priority='interactive').json()
             
             if 'items' not in data or not data['items']:
                 raise Exception("No channel data found")
@@ -41,6 +91,7 @@ class YouTubeService:
             
             # Save to database
             YouTubeStats.update_stats(subscriber_count, total_views, video_count)
+            OverviewMaterializer.refresh_quietly(['youtube'])
             
             return {
                 'subscriber_count': subscriber_count,
@@ -59,28 +110,66 @@ class YouTubeService:
             cached_data['error'] = str(e)
             return cached_data
     
+    def get_uploads_playlist_id(self):
+        """Uploads playlist of the channel, resolved once per channel and kept in SyncState"""
+        cached = self._uploads_playlists.get(self.channel_id)
+        if cached:
+            return cached
+        
+        key = self.UPLOADS_PLAYLIST_KEY.format(self.channel_id)
+        playlist_id = SyncState.get(key)
+        if not playlist_id:
+            params = {
+                'part': 'contentDetails',
+                'id': self.channel_id,
+                'key': self.api_key
+            }
+            data = self._api_get('channels.list', 'channels', params).json()
+            
+            playlist_id = data['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+            SyncState.put(key, playlist_id)
+            db.session.commit()
+        
+        self._uploads_playlists[self.channel_id] = playlist_id
+        return playlist_id
+    
+    def _api_get(self, endpoint, resource, params, priority=None):
+        """GET a Data API resource, charging quota for every attempt.
+        
+        429/5xx answers and connection errors are retried YOUTUBE_HTTP_RETRIES
+        times with exponential backoff (honouring Retry-After). Raises
+        HTTPError for any other error status, or when retries run out.
+        """
+        for attempt in range(self.retries + 1):
+            youtube_quota.acquire(endpoint, priority or self.priority)
+            try:
+                with track_external('youtube', endpoint):
+                    response = self.session.get(f"{self.base_url}/{resource}", params=params, timeout=10)
+                    response.raise_for_status()
+                return response
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                response = getattr(e, 'response', None)
+                retryable = response is None or response.status_code in RETRY_STATUSES
+                if not retryable or attempt == self.retries:
+                    raise
+                time.sleep(retry_delay(response, self.backoff, attempt))
+    
+    def forget_uploads_playlist_id(self):
+        self._uploads_playlists.pop(self.channel_id, None)
+        state = db.session.get(SyncState, self.UPLOADS_PLAYLIST_KEY.format(self.channel_id))
+        if state:
+            db.session.delete(state)
+            db.session.commit()
+    
     def get_channel_videos(self, max_results=50, page_token=None):
         """Get videos from the channel"""
         if not self.api_key:
             return {'videos': [], 'next_page_token': None}
         
-        # First get the uploads playlist ID
-        url = f"{self.base_url}/channels"
-        params = {
-            'part': 'contentDetails',
-            'id': self.channel_id,
-            'key': self.api_key
-        }
-        
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            uploads_playlist_id = data['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+            uploads_playlist_id = self.get_uploads_playlist_id()
             
             # Get videos from uploads playlist
-            url = f"{self.base_url}/playlistItems"
             params = {
                 'part': 'snippet',
                 'playlistId': uploads_playlist_id,
@@ -91,9 +180,13 @@ class YouTubeService:
             if page_token:
                 params['pageToken'] = page_token
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            try:
+                data = self._api_get('playlistItems.list', 'playlistItems', params).json()
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code == 404:
+                    # The cached playlist is gone; resolve it again on the next call
+                    self.forget_uploads_playlist_id()
+                raise
             
             videos = []
             for item in data.get('items', []):
@@ -114,78 +207,289 @@ class YouTubeService:
             
         except Exception as e:
             print(f"Error fetching videos: {e}")
-            return {'videos': [], 'next_page_token': None}
+            return {'videos': [], 'next_page_token': None, 'error': str(e)}
+    
+    WATERMARK_KEY = 'youtube:videos:watermark'
+    UPLOADS_PLAYLIST_KEY = 'youtube:uploads_playlist:{}'
+    FULL_SYNC_KEY = 'youtube:videos:full_sync_at'
     
-    def sync_videos_to_database(self):
-        """Sync all videos from YouTube to database"""
-        print("Starting video sync...")
-        page_token = None
-        total_synced = 0
+    def sync_videos_to_database(self, full=None, checkpoint=None, on_checkpoint=None):
+        """Sync videos from YouTube to database, one sync at a time across processes.
+        
+        A call made while a sync with the same `full` is running returns that
+        sync's count (and last_sync) instead of listing the channel again.
+        """
+        self.last_sync = single_flight(
+            'sync_videos',
+            lambda: self._sync_videos(full, checkpoint, on_checkpoint),
+            {'full': full}
+        )
+        return self.last_sync['new_videos']
+    
+    def _sync_videos(self, full, checkpoint, on_checkpoint):
+        """List the channel's uploads into the videos table and return a summary.
+        
+        The routine sync pages from the newest upload and stops at the page
+        that reaches the stored watermark. A full sync walks the whole uploads
+        playlist to pick up edits to older videos and removes videos that are
+        no longer listed; it runs when full=True, when there is no watermark
+        yet, or once YOUTUBE_FULL_SYNC_INTERVAL has passed since the last one.
+        
+        on_checkpoint receives a JSON-safe state after every committed page;
+        passing that state back as checkpoint resumes at the next page.
+        """
+        watermark = SyncState.get(self.WATERMARK_KEY)
+        if checkpoint:
+            state = dict(checkpoint)
+            print(f"Resuming video sync at page {state['pages'] + 1}...")
+        else:
+            if full is None:
+                full = watermark is None or self._full_sync_due()
+            state = {
+                'full': bool(full),
+                'page_token': None,
+                'pages': 0,
+                'new': 0,
+                'updated': 0,
+                'unchanged': 0,
+                'newest': None,
+                'seen_ids': []
+            }
+            print(f"Starting {'full' if full else 'incremental'} video sync...")
+        full = state['full']
+        complete = False
+        
+        # One query up front instead of a lookup per video
+        known = Video.sync_index()
+        stored_ids = set(known)
+        seen_ids = set(state['seen_ids'])
         
         while True:
-            result = self.get_channel_videos(max_results=50, page_token=page_token)
+            result = self.get_channel_videos(max_results=50, page_token=state['page_token'])
             videos = result['videos']
             
+            if result.get('error'):
+                break
             if not videos:
+                complete = True
                 break
             
-            for video_data in videos:
-                # Check if video already exists
-                existing_video = Video.query.filter_by(
-                    youtube_id=video_data['youtube_id']
-                ).first()
-                
-                if not existing_video:
-                    # Create new video record
-                    video = Video(
-                        youtube_id=video_data['youtube_id'],
-                        title=video_data['title'],
-                        description=video_data['description'],
-                        published_at=datetime.fromisoformat(
-                            video_data['published_at'].replace('Z', '+00:00')
-                        ),
-                        thumbnail_url=video_data['thumbnail_url'],
-                        category=self._categorize_video(
-                            video_data['title'], 
-                            video_data['description']
-                        )
-                    )
-                    db.session.add(video)
-                    total_synced += 1
-                else:
-                    # Update existing video
-                    existing_video.title = video_data['title']
-                    existing_video.description = video_data['description']
-                    existing_video.thumbnail_url = video_data['thumbnail_url']
-                    existing_video.updated_at = datetime.utcnow()
+            state['newest'] = state['newest'] or {
+                'youtube_id': videos[0]['youtube_id'],
+                'published_at': videos[0]['published_at']
+            }
+            seen_ids.update(video['youtube_id'] for video in videos)
             
+            new_rows, changed_rows = self._diff_page(videos, known)
+            if new_rows:
+                bulk_upsert(Video, new_rows, key='youtube_id')
+            if changed_rows:
+                db.session.bulk_update_mappings(Video, changed_rows)
             db.session.commit()
-            print(f"Synced {len(videos)} videos (total: {total_synced})")
             
-            page_token = result['next_page_token']
-            if not page_token:
+            state['pages'] += 1
+            state['new'] += len(new_rows)
+            state['updated'] += len(changed_rows)
+            state['unchanged'] += len(videos) - len(new_rows) - len(changed_rows)
+            state['page_token'] = result['next_page_token']
+            state['seen_ids'] = sorted(seen_ids)
+            print(f"Synced {len(videos)} videos (total: {state['new']} new, {state['updated']} updated)")
+            if on_checkpoint:
+                on_checkpoint(state)
+            
+            if not state['page_token']:
+                complete = True
+                break
+            if not full and self._reached_watermark(videos, watermark, stored_ids):
+                complete = True
+                break
+        
+        removed = 0
+        if complete:
+            # Deletions are only trusted from a listing that ran to the end
+            if full and seen_ids:
+                removed = self._remove_unlisted(stored_ids - seen_ids)
+            # Advancing the watermark after a partial walk would skip the videos it missed
+            if state['newest']:
+                SyncState.put(self.WATERMARK_KEY, state['newest'])
+            if full:
+                SyncState.put(self.FULL_SYNC_KEY, datetime.utcnow().isoformat())
+            db.session.commit()
+        
+        # Details of every listed video plus any never enriched; an incremental sync is one call
+        enriched = self.enrich_videos(seen_ids | Video.missing_details_ids())
+        
+        print(
+            f"Video sync complete ({state['pages']} pages). Total synced: {state['new']}, updated: {state['updated']}, "
+            f"unchanged: {state['unchanged']}, removed: {removed}"
+        )
+        if state['new'] or state['updated'] or removed or enriched:
+            OverviewMaterializer.refresh_quietly(['content'])
+        
+        return {
+            'full': full,
+            'complete': complete,
+            'pages': state['pages'],
+            'new_videos': state['new'],
+            'updated_videos': state['updated'],
+            'unchanged_videos': state['unchanged'],
+            'removed_videos': removed,
+            'enriched_videos': enriched
+        }
+    
+    def get_video_details(self, youtube_ids, checked=None):
+        """View count, duration and tags from videos.list, 50 ids per call (1 quota unit each).
+        
+        Ids of batches the API answered are added to `checked`, returned or not.
+        """
+        details = {}
+        if not self.api_key:
+            return details
+        
+        youtube_ids = list(youtube_ids)
+        for start in range(0, len(youtube_ids), 50):
+            batch = youtube_ids[start:start + 50]
+            params = {
+                'part': 'statistics,contentDetails,snippet',
+                'id': ','.join(batch),
+                'maxResults': 50,
+                # Parts cost the same quota; trimming fields keeps the response small
+                'fields': 'items(id,statistics/viewCount,contentDetails/duration,snippet/tags)',
+                'key': self.api_key
+            }
+            try:
+                data = self._api_get('videos.list', 'videos', params).json()
+            except QuotaExceeded as e:
+                print(f"Skipping video details: {e}")
                 break
+            except Exception as e:
+                print(f"Error fetching video details: {e}")
+                continue
             
-            # Rate limiting - YouTube API has quotas
-            time.sleep(1)
+            if checked is not None:
+                checked.update(batch)
+            for item in data.get('items', []):
+                details[item['id']] = {
+                    'view_count': int(item.get('statistics', {}).get('viewCount', 0)),
+                    'duration': parse_duration(item.get('contentDetails', {}).get('duration')),
+                    'tags': item.get('snippet', {}).get('tags') or []
+                }
+        
+        return details
+    
+    def enrich_videos(self, youtube_ids):
+        """Write view counts, durations and tags for the given videos, skipping unchanged rows"""
+        # Sorted so the same videos always form the same batches (and replay from the same recordings)
+        youtube_ids = sorted(youtube_ids)
+        if not youtube_ids or not self.api_key:
+            return 0
+        
+        checked = set()
+        details = self.get_video_details(youtube_ids, checked)
+        if not checked:
+            return 0
+        
+        # Only videos that still lack details need the marker; the rest were checked before
+        stored = db.session.query(
+            Video.id, Video.youtube_id, Video.view_count, Video.duration, Video.tags, Video.details_checked_at
+        ).filter(Video.youtube_id.in_(list(checked))).all()
+        
+        now = datetime.utcnow()
+        mappings = []
+        changed = 0
+        for video_id, youtube_id, view_count, duration, tags, details_checked_at in stored:
+            fresh = details.get(youtube_id)
+            if fresh and (view_count, duration, tags) != (fresh['view_count'], fresh['duration'], fresh['tags']):
+                changed += 1
+                mappings.append(dict(fresh, id=video_id, details_checked_at=now))
+            elif details_checked_at is None:
+                mappings.append({'id': video_id, 'details_checked_at': now})
+        
+        if mappings:
+            db.session.bulk_update_mappings(Video, mappings)
+            db.session.commit()
+        print(f"Enriched {len(details)} videos ({changed} changed) in {(len(youtube_ids) + 49) // 50} videos.list calls")
+        return changed
+    
+    def _full_sync_due(self):
+        last_full = SyncState.get(self.FULL_SYNC_KEY)
+        if not last_full:
+            return True
+        interval = current_app.config.get('YOUTUBE_FULL_SYNC_INTERVAL', 86400)
+        return (datetime.utcnow() - datetime.fromisoformat(last_full)).total_seconds() >= interval
+    
+    @staticmethod
+    def _reached_watermark(videos, watermark, stored_ids):
+        """True once a page holds the watermark video or an older video already stored.
         
-        print(f"Video sync complete. Total synced: {total_synced}")
-        return total_synced
+        The uploads playlist lists newest first, so everything past this page
+        was seen by an earlier sync. The published_at check keeps a deleted
+        watermark video from forcing a walk to the end.
+        """
+        if not watermark:
+            return False
+        for video in videos:
+            if video['youtube_id'] == watermark['youtube_id']:
+                return True
+            if video['youtube_id'] in stored_ids and video['published_at'] <= watermark['published_at']:
+                return True
+        return False
+    
+    def _remove_unlisted(self, missing_ids):
+        """Delete videos that a complete listing no longer contains"""
+        if not missing_ids:
+            return 0
+        doomed = Video.query.filter(Video.youtube_id.in_(list(missing_ids)))
+        VideoViewSample.delete_for([row.id for row in doomed.with_entities(Video.id)])
+        removed = doomed.delete(synchronize_session=False)
+        print(f"Removed {removed} videos no longer on the channel")
+        return removed
+    
+    def _diff_page(self, videos, known):
+        """Split a page into rows to insert and rows whose content hash changed"""
+        new_rows = []
+        changed_rows = []
+        new_videos = []
+        now = datetime.utcnow()
+        
+        for video_data in videos:
+            content_hash = Video.content_hash_of(
+                video_data['title'], video_data['description'], video_data['thumbnail_url']
+            )
+            stored = known.get(video_data['youtube_id'])
+            
+            if stored is None:
+                new_videos.append(video_data)
+                new_rows.append({
+                    'youtube_id': video_data['youtube_id'],
+                    'title': video_data['title'],
+                    'description': video_data['description'],
+                    'published_at': datetime.fromisoformat(
+                        video_data['published_at'].replace('Z', '+00:00')
+                    ),
+                    'thumbnail_url': video_data['thumbnail_url'],
+                    'content_hash': content_hash
+                })
+                # A video listed twice in one sync is inserted once
+                known[video_data['youtube_id']] = (None, content_hash)
+            elif stored[1] != content_hash and stored[0] is not None:
+                changed_rows.append({
+                    'id': stored[0],
+                    'title': video_data['title'],
+                    'description': video_data['description'],
+                    'thumbnail_url': video_data['thumbnail_url'],
+                    'content_hash': content_hash,
+                    'updated_at': now
+                })
+                known[video_data['youtube_id']] = (stored[0], content_hash)
+        
+        categories = categorize_videos((video['title'], video['description']) for video in new_videos)
+        for row, category in zip(new_rows, categories):
+            row['category'] = category
+        
+        return new_rows, changed_rows
     
     def _categorize_video(self, title, description):
         """Simple categorization based on keywords"""
-        content = (title + ' ' + (description or '')).lower()
-        
-        if any(keyword in content for keyword in ['ai', 'artificial intelligence', 'chatgpt', 'gpt', 'claude']):
-            return 'AI Tools'
-        elif any(keyword in content for keyword in ['startup', 'business idea', 'entrepreneur']):
-            return 'Startup Ideas'
-        elif any(keyword in content for keyword in ['interview', 'guest', 'conversation']):
-            return 'Interviews'
-        elif any(keyword in content for keyword in ['no-code', 'nocode', 'bubble', 'webflow']):
-            return 'No-Code'
-        elif any(keyword in content for keyword in ['marketing', 'growth', 'seo', 'social media']):
-            return 'Marketing'
-        else:
-            return 'Business Building'
+        return categorize_video(title, description)
 
@@ -1,23 +1,20 @@
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 import os
 import sys
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.services.youtube_service import YouTubeService
+from src.routes.jobs import job_accepted
+from src.services.jobs import enqueue
 from main import app
 
 @app.route('/admin/sync_videos', methods=['GET'])
 def sync_videos_route():
-    """Sync videos from YouTube API"""
+    """Queue a YouTube video sync (?full=true walks every upload)"""
     try:
-        youtube_service = YouTubeService()
-        synced_count = youtube_service.sync_videos_to_database()
-        return jsonify({
-            'success': True,
-            'message': f'Synced {synced_count} videos successfully!'
-        })
+        params = {'full': True} if request.args.get('full', 'false').lower() == 'true' else {}
+        return job_accepted(enqueue('sync_videos', params))
     except Exception as e:
         return jsonify({
             'success': False,
@@ -0,0 +1,50 @@
+import os
+import sys
+import atexit
+import logging
+import argparse
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Job and quota metrics go to the directory the web process serves /metrics from
+# (see gunicorn.conf.py); it has to be set before prometheus_client is imported
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/gregverse-metrics')
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+from flask_socketio import SocketIO
+from main import app
+from src.services.jobs import HANDLERS, build_runner, set_runner
+
+def main():
+    """Run queued jobs (video and podcast syncs, categorization, indexing) outside the web process.
+    
+    The web service only enqueues (unless JOB_RUN_IN_WEB is set). Set
+    SOCKETIO_MESSAGE_QUEUE on both so job_progress events reach web clients.
+    Several workers can share the queue; each job is claimed by exactly one.
+    """
+    parser = argparse.ArgumentParser(description='Gregverse background job worker')
+    parser.add_argument('--concurrency', type=int, default=None, help='Runner threads (default JOB_RUNNER_CONCURRENCY)')
+    parser.add_argument('--kind', action='append', choices=sorted(HANDLERS), help='Only run jobs of this kind (repeatable)')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    message_queue = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    emitter = SocketIO(message_queue=message_queue) if message_queue else None
+    if emitter is None:
+        print("⚠️ SOCKETIO_MESSAGE_QUEUE not set; job progress is only visible through /api/jobs")
+    
+    # Drop this process's live gauges from the merged metrics when it exits
+    from prometheus_client import multiprocess
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
+    
+    runner = build_runner(app, emitter, concurrency=args.concurrency)
+    runner.kinds = args.kind
+    set_runner(runner)
+    
+    print(f"🔧 Job worker {runner.worker_id} running {runner.concurrency} thread(s)")
+    runner.run_forever()
+
+if __name__ == '__main__':
+    main()